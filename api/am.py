@@ -1,10 +1,13 @@
 from typing import List, Dict, Optional
 import json
+import logging
 import os
 import re
 from .base import GameAPIAdapter, APIRegistry
 from utils.scraper import WebScraper
 
+logger = logging.getLogger(__name__)
+
 class AdoptMeAdapter(GameAPIAdapter):
     def __init__(self):
         super().__init__('am')
@@ -23,23 +26,20 @@ class AdoptMeAdapter(GameAPIAdapter):
             pass
         return self.values_url or self.default_values_url
         
-    async def fetch_items(self) -> List[Dict]:
-        cached = self._get_cached('items')
-        if cached:
-            return cached
-        
+    async def _load_items(self) -> List[Dict]:
         items = []
         
         items = self._load_fallback()
         if items:
-            print(f"AM: Loaded {len(items)} items from fallback data")
+            logger.info(f"AM: Loaded {len(items)} items from fallback data")
         
         try:
             session = await self.get_session()
             url = await self._get_current_url()
             scraped_items = await WebScraper.scrape_items(
                 session, url, self.game_name,
-                rarity_list=self.rarity_list
+                rarity_list=self.rarity_list,
+                revalidator=self.revalidator
             )
             
             junk_keywords = ['logo', 'menu', 'toggle', 'search', 'filter', 'nav', 'footer', 'header', 'sidebar', 'discord', 'twitter']
@@ -58,9 +58,9 @@ class AdoptMeAdapter(GameAPIAdapter):
                         'mega_neon': 'mega' in name_lower
                     }
                 items = valid_scraped
-                print(f"AM: Fetched {len(items)} items from {url}")
+                logger.info(f"AM: Fetched {len(items)} items from {url}")
         except Exception as e:
-            print(f"AM: Scraping failed (using fallback): {e}")
+            logger.warning(f"AM: Scraping failed (using fallback): {e}")
         
         if items:
             self._set_cached('items', items)
@@ -82,13 +82,6 @@ class AdoptMeAdapter(GameAPIAdapter):
         items = await self.fetch_items()
         return {item['id']: item['icon_url'] for item in items if item.get('icon_url')}
     
-    async def health_check(self) -> bool:
-        try:
-            items = await self.fetch_items()
-            return len(items) > 0
-        except:
-            return False
-    
     def normalize_item(self, item: Dict) -> Dict:
         return item
     
@@ -1,59 +1,110 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Callable, Awaitable
 import aiohttp
 import asyncio
 import logging
+import os
+import time
 from datetime import datetime, timedelta
 
+from utils.cache import SingleFlight, estimate_size, register_cache
+from utils.http_client import Revalidator, http_client
+from utils.scraper import WebScraper
+
 logger = logging.getLogger(__name__)
 
 class GameAPIAdapter(ABC):
     def __init__(self, game_name: str):
         self.game_name = game_name
-        self.session: Optional[aiohttp.ClientSession] = None
         self._cache: Dict[str, Any] = {}
         self._cache_expiry: Dict[str, datetime] = {}
         self._cache_ttl = timedelta(minutes=30)
+        self._inflight = SingleFlight()
+        self.stale_while_revalidate = bool(int(os.getenv('ADAPTER_STALE_WHILE_REVALIDATE', 0)))
+        self._cache_stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'evictions': 0, 'stale_hits': 0}
+        register_cache(f"adapter:{game_name}", self.cache_stats)
+        # Survives clear_cache() so a forced refresh can still get a 304.
+        self.revalidator = Revalidator()
         self._rate_limit_remaining = 100
         self._rate_limit_reset = datetime.now()
         self.default_values_url: str = ''
         self.values_url: str = ''
+        self.probe_method = 'HEAD'
         
     async def get_session(self) -> aiohttp.ClientSession:
-        if self.session is None or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
-        return self.session
+        return await http_client.session()
     
     async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        # The session is shared; http_client.close() tears it down at shutdown.
+        pass
     
-    def _get_cached(self, key: str) -> Optional[Any]:
+    def _is_fresh(self, key: str) -> bool:
+        return datetime.now() < self._cache_expiry.get(key, datetime.min)
+    
+    def _get_cached(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        # Expired values are kept until overwritten so stale_while_revalidate
+        # can serve them; the key set is a fixed handful per adapter.
         if key in self._cache:
-            if datetime.now() < self._cache_expiry.get(key, datetime.min):
+            if self._is_fresh(key):
+                self._cache_stats['hits'] += 1
+                return self._cache[key]
+            if allow_stale and self._cache[key]:
+                # A served value is a hit, as in Cache.cached; stale_hits
+                # counts how many of those were past their TTL.
+                self._cache_stats['hits'] += 1
+                self._cache_stats['stale_hits'] += 1
                 return self._cache[key]
-            else:
-                del self._cache[key]
-                if key in self._cache_expiry:
-                    del self._cache_expiry[key]
+        self._cache_stats['misses'] += 1
         return None
     
     def _set_cached(self, key: str, value: Any, ttl: Optional[timedelta] = None):
         self._cache[key] = value
         self._cache_expiry[key] = datetime.now() + (ttl or self._cache_ttl)
     
-    async def _request(self, url: str, method: str = 'GET', **kwargs) -> Optional[Dict]:
+    def clear_cache(self):
+        self._cache_stats['evictions'] += len(self._cache)
+        self._cache.clear()
+        self._cache_expiry.clear()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(self._cache_stats)
+        result['entries'] = len(self._cache)
+        result['bytes'] = estimate_size(self._cache)
+        result.update(self._inflight.stats())
+        return result
+    
+    async def _request(self, url: str, method: str = 'GET',
+                       parse: Optional[Callable[[Any], Any]] = None, **kwargs) -> Optional[Any]:
+        """Fetch JSON from url, returning parse(json) when parse is given.
+        
+        GETs are conditional: a 304 returns the result stored from the last
+        200 for the URL, so the body is neither downloaded nor parsed again.
+        """
+        conditional = method == 'GET'
+        if conditional:
+            kwargs['headers'] = {**kwargs.get('headers', {}), **self.revalidator.headers(url)}
         try:
             session = await self.get_session()
             async with session.request(method, url, **kwargs) as response:
+                if response.status == 304 and conditional:
+                    return self.revalidator.not_modified(url, response.headers)
+                
                 if response.status == 429:
                     retry_after = int(response.headers.get('Retry-After', 60))
                     logger.warning(f"{self.game_name} API rate limited. Retry after {retry_after}s")
                     return None
                     
                 if response.status == 200:
-                    return await response.json()
+                    body = await response.read()
+                    started = time.perf_counter()
+                    data = await response.json()
+                    if parse is not None:
+                        data = parse(data)
+                    if conditional:
+                        self.revalidator.store(url, response.headers, data,
+                                               response.content_length or len(body),
+                                               (time.perf_counter() - started) * 1000)
+                    return data
                 else:
                     logger.error(f"{self.game_name} API error: {response.status}")
                     return None
@@ -67,8 +118,17 @@ class GameAPIAdapter(ABC):
             logger.error(f"{self.game_name} API unexpected error: {e}")
             return None
     
-    @abstractmethod
     async def fetch_items(self) -> List[Dict]:
+        """Return the item list, coalescing concurrent refreshes into one load."""
+        cached = self._get_cached('items', allow_stale=self.stale_while_revalidate)
+        if cached:
+            if not self._is_fresh('items'):
+                self._inflight.refresh('items', self._load_items)
+            return cached
+        return await self._inflight.do('items', self._load_items)
+    
+    @abstractmethod
+    async def _load_items(self) -> List[Dict]:
         pass
     
     @abstractmethod
@@ -83,9 +143,39 @@ class GameAPIAdapter(ABC):
     async def fetch_icons(self) -> Dict[str, str]:
         pass
     
-    @abstractmethod
+    async def _get_current_url(self) -> str:
+        return self.values_url or self.default_values_url
+    
+    async def probe_url(self) -> str:
+        """URL answered cheaply when the source is up; the values page by default."""
+        return await self._get_current_url()
+    
+    async def probe(self, timeout: float = 10) -> Dict[str, Any]:
+        """Check the source is reachable without downloading its data.
+        
+        Sends probe_method (HEAD unless an adapter has a small endpoint to
+        GET) and reports 'ok', 'status', 'ms' and 'error'. A 405 still proves
+        the server is answering.
+        """
+        started = time.perf_counter()
+        status, error = None, None
+        try:
+            url = await self.probe_url()
+            session = await self.get_session()
+            async with session.request(self.probe_method, url, headers=WebScraper.HEADERS,
+                                       timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                status = response.status
+        except asyncio.TimeoutError:
+            error = f"timed out after {timeout:g}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        ok = status is not None and (status < 400 or status == 405)
+        if status is not None and not ok:
+            error = f"HTTP {status}"
+        return {'ok': ok, 'status': status, 'ms': (time.perf_counter() - started) * 1000, 'error': error}
+    
     async def health_check(self) -> bool:
-        pass
+        return (await self.probe())['ok']
     
     def normalize_item(self, item: Dict) -> Dict:
         return {
@@ -106,6 +196,8 @@ class GameAPIAdapter(ABC):
 
 class APIRegistry:
     _adapters: Dict[str, GameAPIAdapter] = {}
+    refresh_concurrency = int(os.getenv('ADAPTER_REFRESH_CONCURRENCY', 3))
+    refresh_timeout = float(os.getenv('ADAPTER_REFRESH_TIMEOUT', 90))
     
     @classmethod
     def register(cls, game: str, adapter: GameAPIAdapter):
@@ -124,9 +216,64 @@ class APIRegistry:
         for adapter in cls._adapters.values():
             await adapter.close()
     
+    @classmethod
+    async def _run_all(cls, work: Callable[[GameAPIAdapter], Awaitable[Any]],
+                       timeout: float, concurrency: int) -> Dict[str, Dict[str, Any]]:
+        """Run work(adapter) for every adapter concurrently.
+        
+        At most `concurrency` adapters run at once and each gets `timeout`
+        seconds, so one slow site cannot hold up the rest. Every game reports
+        'result', 'error' (None on success) and 'ms' of wall time.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def run(game: str, adapter: GameAPIAdapter):
+            async with semaphore:
+                started = time.perf_counter()
+                result, error = None, None
+                try:
+                    result = await asyncio.wait_for(work(adapter), timeout)
+                except asyncio.TimeoutError:
+                    error = f"timed out after {timeout:g}s"
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if error:
+                    logger.warning(f"{game} adapter failed after {elapsed_ms:.0f}ms: {error}")
+                return game, {'result': result, 'error': error, 'ms': elapsed_ms}
+        
+        return dict(await asyncio.gather(*(run(game, adapter) for game, adapter in cls._adapters.items())))
+    
+    @classmethod
+    async def refresh_all(cls, save: Optional[Callable[[List[Dict]], Awaitable[int]]] = None,
+                          concurrency: Optional[int] = None,
+                          timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Drop every adapter's cache and re-fetch all games concurrently.
+        
+        save(items), if given, runs inside the same per-game timeout and its
+        return value is reported as 'saved'; 'items' is the fetched count.
+        'bytes', 'bytes_saved', 'parse_ms_saved' and 'not_modified' come from
+        the adapter's revalidator over this refresh.
+        """
+        async def refresh(adapter: GameAPIAdapter) -> Dict[str, Any]:
+            before = adapter.revalidator.stats()
+            adapter.clear_cache()
+            items = await adapter.fetch_items()
+            saved = await save(items) if save and items else 0
+            after = adapter.revalidator.stats()
+            result: Dict[str, Any] = {'items': len(items or []), 'saved': saved}
+            for field in ('bytes', 'bytes_saved', 'parse_ms_saved', 'not_modified'):
+                result[field] = after[field] - before[field]
+            return result
+        
+        return await cls._run_all(
+            refresh,
+            timeout if timeout is not None else cls.refresh_timeout,
+            concurrency if concurrency is not None else cls.refresh_concurrency
+        )
+    
     @classmethod
     async def health_check_all(cls) -> Dict[str, bool]:
-        results = {}
-        for game, adapter in cls._adapters.items():
-            results[game] = await adapter.health_check()
-        return results
+        from .health import health_monitor
+        results = await health_monitor.check_all()
+        return {game: result['ok'] for game, result in results.items()}
@@ -0,0 +1,108 @@
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+import asyncio
+import os
+import time
+
+from utils.cache import SingleFlight
+from .base import APIRegistry, GameAPIAdapter
+
+
+class HealthMonitor:
+    """Cached adapter health built from cheap probes.
+
+    Each game's result combines adapter.probe() (a HEAD or small GET) with
+    the age of the adapter's last successful fetch, and is reused for
+    `interval` seconds so /owner status never waits on a source it checked
+    recently. The last `window` probe latencies per game feed percentiles.
+
+    Each probe is bounded by `timeout`, at most `concurrency` probes run at
+    once, and check_all gives every game `deadline` seconds overall,
+    including time spent waiting for a probe slot.
+    """
+
+    def __init__(self, interval: float = 60, timeout: float = 10, window: int = 50,
+                 concurrency: int = 3, deadline: float = 20):
+        self.interval = interval
+        self.timeout = timeout
+        self.window = window
+        self.deadline = deadline
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._flight = SingleFlight()
+        self._stats: Dict[str, int] = {'probes': 0, 'cached': 0, 'failures': 0, 'timeouts': 0}
+
+    async def _probe(self, game: str, adapter: GameAPIAdapter) -> Dict[str, Any]:
+        async with self._semaphore:
+            result = await adapter.probe(self.timeout)
+        self._stats['probes'] += 1
+        if result['status'] is not None:
+            latencies = self._latencies.get(game)
+            if latencies is None:
+                latencies = self._latencies[game] = deque(maxlen=self.window)
+            latencies.append(result['ms'])
+        if not result['ok']:
+            self._stats['failures'] += 1
+        result['checked_at'] = time.monotonic()
+        self._results[game] = result
+        return result
+
+    async def check(self, game: str, adapter: GameAPIAdapter, force: bool = False) -> Dict[str, Any]:
+        """Return the game's health, probing only if the cached result expired.
+
+        Adds 'last_success_age' (seconds, None if never) and the latency
+        percentiles to the probe result.
+        """
+        result = self._results.get(game)
+        if not force and result is not None and time.monotonic() - result['checked_at'] < self.interval:
+            self._stats['cached'] += 1
+        else:
+            result = await self._flight.do(game, lambda: self._probe(game, adapter))
+        return self._report(game, adapter, result)
+
+    def _report(self, game: str, adapter: GameAPIAdapter, result: Dict[str, Any]) -> Dict[str, Any]:
+        last_success = adapter.revalidator.last_success
+        report = dict(result)
+        report['last_success_age'] = time.time() - last_success if last_success is not None else None
+        report.update(self.percentiles(game))
+        return report
+
+    async def _check_within_deadline(self, game: str, adapter: GameAPIAdapter, force: bool) -> Dict[str, Any]:
+        try:
+            return await asyncio.wait_for(self.check(game, adapter, force), self.deadline)
+        except asyncio.TimeoutError:
+            # The shared probe keeps running and caches its result for the next check.
+            self._stats['timeouts'] += 1
+            result = {'ok': False, 'status': None, 'ms': self.deadline * 1000,
+                      'error': f"timed out after {self.deadline:g}s"}
+            return self._report(game, adapter, result)
+
+    async def check_all(self, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        games = list(APIRegistry.all().items())
+        results = await asyncio.gather(*(self._check_within_deadline(game, adapter, force) for game, adapter in games))
+        return {game: result for (game, _), result in zip(games, results)}
+
+    def percentiles(self, game: str) -> Dict[str, Optional[float]]:
+        samples = sorted(self._latencies.get(game, ()))
+        if not samples:
+            return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+        # Nearest-rank over the recent window.
+        return {
+            f'p{pct}_ms': samples[min(len(samples) - 1, (len(samples) * pct + 99) // 100 - 1)]
+            for pct in (50, 95, 99)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(self._stats)
+        result['games'] = len(self._results)
+        return result
+
+
+health_monitor = HealthMonitor(
+    interval=float(os.getenv('ADAPTER_HEALTH_INTERVAL', 60)),
+    timeout=float(os.getenv('ADAPTER_PROBE_TIMEOUT', 10)),
+    window=int(os.getenv('ADAPTER_HEALTH_WINDOW', 50)),
+    concurrency=int(os.getenv('ADAPTER_HEALTH_CONCURRENCY', 3)),
+    deadline=float(os.getenv('ADAPTER_HEALTH_TIMEOUT', 20)),
+)
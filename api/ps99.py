@@ -1,10 +1,13 @@
 from typing import List, Dict, Optional
 import json
+import logging
 import os
 import re
 from .base import GameAPIAdapter, APIRegistry
 from utils.scraper import WebScraper
 
+logger = logging.getLogger(__name__)
+
 class PS99Adapter(GameAPIAdapter):
     def __init__(self):
         super().__init__('ps99')
@@ -16,6 +19,7 @@ class PS99Adapter(GameAPIAdapter):
         self._items_data: List[Dict] = []
         self._rap_data: Dict[str, float] = {}
         self.rarity_list = ['Titanic', 'Huge', 'Legendary', 'Epic', 'Rare', 'Uncommon', 'Common']
+        self.probe_method = 'GET'
         
     async def _get_current_url(self) -> str:
         try:
@@ -27,6 +31,32 @@ class PS99Adapter(GameAPIAdapter):
             pass
         return self.values_url or self.default_values_url
     
+    async def probe_url(self) -> str:
+        # The collection index is a few hundred bytes; the data lives here too.
+        return f'{self.base_url}/collections'
+    
+    @staticmethod
+    def _parse_rap(data: Dict) -> Dict[str, float]:
+        rap_dict = {}
+        if data and 'data' in data:
+            for item in data['data']:
+                config = item.get('configData', {})
+                pet_id = config.get('id', str(item.get('_id', '')))
+                rap_value = item.get('value', 0)
+                if pet_id and rap_value:
+                    rap_dict[pet_id.lower()] = float(rap_value)
+                    variants = []
+                    if config.get('pt'):
+                        variants.append(('pt', config.get('pt')))
+                    if config.get('sh'):
+                        variants.append(('sh', config.get('sh')))
+                    key_base = pet_id.lower()
+                    for var_type, var_val in variants:
+                        if var_val:
+                            variant_key = f"{key_base}_{var_type}"
+                            rap_dict[variant_key] = float(rap_value)
+        return rap_dict
+    
     async def _fetch_rap_data(self) -> Dict[str, float]:
         cached = self._get_cached('rap_data')
         if cached:
@@ -34,30 +64,13 @@ class PS99Adapter(GameAPIAdapter):
         
         rap_dict = {}
         try:
-            data = await self._request(self.rap_url)
-            if data and 'data' in data:
-                for item in data['data']:
-                    config = item.get('configData', {})
-                    pet_id = config.get('id', str(item.get('_id', '')))
-                    rap_value = item.get('value', 0)
-                    if pet_id and rap_value:
-                        rap_dict[pet_id.lower()] = float(rap_value)
-                        variants = []
-                        if config.get('pt'):
-                            variants.append(('pt', config.get('pt')))
-                        if config.get('sh'):
-                            variants.append(('sh', config.get('sh')))
-                        key_base = pet_id.lower()
-                        for var_type, var_val in variants:
-                            if var_val:
-                                variant_key = f"{key_base}_{var_type}"
-                                rap_dict[variant_key] = float(rap_value)
-                
+            rap_dict = await self._request(self.rap_url, parse=self._parse_rap) or {}
+            if rap_dict:
                 self._set_cached('rap_data', rap_dict)
                 self._rap_data = rap_dict
-                print(f"PS99: Fetched RAP data for {len(rap_dict)} items")
+                logger.info(f"PS99: Fetched RAP data for {len(rap_dict)} items")
         except Exception as e:
-            print(f"Error fetching PS99 RAP data: {e}")
+            logger.error(f"Error fetching PS99 RAP data: {e}")
         
         return rap_dict
     
@@ -72,7 +85,8 @@ class PS99Adapter(GameAPIAdapter):
             url = await self._get_current_url()
             items = await WebScraper.scrape_items(
                 session, url, self.game_name,
-                rarity_list=self.rarity_list
+                rarity_list=self.rarity_list,
+                revalidator=self.revalidator
             )
             
             for item in items:
@@ -89,69 +103,68 @@ class PS99Adapter(GameAPIAdapter):
             if items:
                 self._set_cached('items_from_site', items)
                 self._items_data = items
-                print(f"PS99: Fetched {len(items)} items from {url}")
+                logger.info(f"PS99: Fetched {len(items)} items from {url}")
             
             return items
         except Exception as e:
-            print(f"Error fetching PS99 values: {e}")
+            logger.error(f"Error fetching PS99 values: {e}")
             return []
     
+    def _parse_collection(self, data: Dict) -> List[Dict]:
+        items = []
+        if data and 'data' in data:
+            for item in data['data']:
+                config = item.get('configData', {})
+                name = config.get('name', '') or item.get('configName', 'Unknown')
+                pet_id = name.lower() if name else ''
+                
+                huge = config.get('huge', False)
+                titanic = config.get('titanic', False)
+                
+                rarity = 'Common'
+                if titanic:
+                    rarity = 'Titanic'
+                elif huge:
+                    rarity = 'Huge'
+                elif config.get('legendary'):
+                    rarity = 'Legendary'
+                elif config.get('epic'):
+                    rarity = 'Epic'
+                elif config.get('rare'):
+                    rarity = 'Rare'
+                
+                thumbnail = config.get('thumbnail', '')
+                if thumbnail and not thumbnail.startswith('http'):
+                    thumbnail = f'https://biggamesapi.io/image/{thumbnail}'
+                
+                items.append({
+                    'id': pet_id,
+                    'name': name,
+                    'normalized_name': self._normalize_name(name),
+                    'rarity': rarity,
+                    'icon_url': thumbnail,
+                    'value': float(item.get('value', 0)),
+                    'tradeable': config.get('tradeable', True),
+                    'game': self.game_name,
+                    'metadata': {
+                        'huge': huge,
+                        'titanic': titanic,
+                        'golden': config.get('golden', False),
+                        'rainbow': config.get('rainbow', False),
+                        'shiny': config.get('shiny', False)
+                    }
+                })
+        return items
+    
     async def _fetch_from_biggames_api(self) -> List[Dict]:
         try:
-            data = await self._request(f'{self.base_url}/collection/Pets')
-            if data and 'data' in data:
-                items = []
-                for item in data['data']:
-                    config = item.get('configData', {})
-                    name = config.get('name', '') or item.get('configName', 'Unknown')
-                    pet_id = name.lower() if name else ''
-                    
-                    huge = config.get('huge', False)
-                    titanic = config.get('titanic', False)
-                    
-                    rarity = 'Common'
-                    if titanic:
-                        rarity = 'Titanic'
-                    elif huge:
-                        rarity = 'Huge'
-                    elif config.get('legendary'):
-                        rarity = 'Legendary'
-                    elif config.get('epic'):
-                        rarity = 'Epic'
-                    elif config.get('rare'):
-                        rarity = 'Rare'
-                    
-                    thumbnail = config.get('thumbnail', '')
-                    if thumbnail and not thumbnail.startswith('http'):
-                        thumbnail = f'https://biggamesapi.io/image/{thumbnail}'
-                    
-                    items.append({
-                        'id': pet_id,
-                        'name': name,
-                        'normalized_name': self._normalize_name(name),
-                        'rarity': rarity,
-                        'icon_url': thumbnail,
-                        'value': float(item.get('value', 0)),
-                        'tradeable': config.get('tradeable', True),
-                        'game': self.game_name,
-                        'metadata': {
-                            'huge': huge,
-                            'titanic': titanic,
-                            'golden': config.get('golden', False),
-                            'rainbow': config.get('rainbow', False),
-                            'shiny': config.get('shiny', False)
-                        }
-                    })
-                return items
+            items = await self._request(f'{self.base_url}/collection/Pets', parse=self._parse_collection)
+            return items or []
         except Exception as e:
-            print(f"Error fetching from BigGames API: {e}")
+            logger.error(f"Error fetching from BigGames API: {e}")
         return []
         
-    async def fetch_items(self) -> List[Dict]:
-        cached = self._get_cached('items')
-        if cached:
-            return cached
-        
+    async def _load_items(self) -> List[Dict]:
         rap_data = await self._fetch_rap_data()
         
         items = await self._fetch_from_biggames_api()
@@ -163,6 +176,8 @@ class PS99Adapter(GameAPIAdapter):
             items = self._load_fallback()
         
         if items and rap_data:
+            # Parsed lists are reused on a 304, so merge RAP into copies.
+            merged = []
             for item in items:
                 item_id = item.get('id', '').lower()
                 item_name = item.get('name', '').lower()
@@ -170,12 +185,12 @@ class PS99Adapter(GameAPIAdapter):
                 
                 rap_value = rap_data.get(item_name) or rap_data.get(item_id) or rap_data.get(normalized_name, 0)
                 
-                if 'metadata' not in item:
-                    item['metadata'] = {}
-                item['metadata']['rap'] = rap_value
+                item = {**item, 'metadata': {**item.get('metadata', {}), 'rap': rap_value}}
                 
                 if not item.get('value') and rap_value:
                     item['value'] = rap_value
+                merged.append(item)
+            items = merged
         
         if items:
             self._set_cached('items', items)
@@ -198,13 +213,6 @@ class PS99Adapter(GameAPIAdapter):
         items = await self.fetch_items()
         return {item['id']: item['icon_url'] for item in items if item.get('icon_url')}
     
-    async def health_check(self) -> bool:
-        try:
-            items = await self.fetch_items()
-            return len(items) > 0
-        except:
-            return False
-    
     def normalize_item(self, item: Dict) -> Dict:
         return item
     
@@ -231,7 +239,7 @@ class PS99Adapter(GameAPIAdapter):
                         })
                     return items
             except Exception as e:
-                print(f"Error loading PS99 fallback: {e}")
+                logger.error(f"Error loading PS99 fallback: {e}")
         return []
 
 def setup():
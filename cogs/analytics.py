@@ -1,10 +1,9 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiosqlite
 from datetime import datetime, timedelta
 
-from utils.database import DATABASE_PATH
+from utils.db_pool import db_pool
 
 class AnalyticsCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -12,7 +11,7 @@ class AnalyticsCog(commands.Cog):
     
     @app_commands.command(name="server_stats", description="View server trading statistics")
     async def server_stats(self, interaction: discord.Interaction):
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_pool.reader() as db:
             async with db.execute('SELECT COUNT(*) FROM trades') as cursor:
                 row = await cursor.fetchone()
                 total_trades = row[0] if row else 0
@@ -66,8 +65,7 @@ class AnalyticsCog(commands.Cog):
         app_commands.Choice(name="Total Value Traded", value="total_value_traded")
     ])
     async def leaderboard(self, interaction: discord.Interaction, metric: str = "total_trades"):
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            db.row_factory = aiosqlite.Row
+        async with db_pool.reader() as db:
             async with db.execute(f'''
                 SELECT discord_id, {metric}, trust_tier 
                 FROM users 
@@ -114,9 +112,7 @@ class AnalyticsCog(commands.Cog):
     
     @app_commands.command(name="activity", description="View recent trading activity")
     async def activity(self, interaction: discord.Interaction):
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            db.row_factory = aiosqlite.Row
-            
+        async with db_pool.reader() as db:
             async with db.execute('''
                 SELECT * FROM trades 
                 ORDER BY updated_at DESC 
@@ -124,11 +120,13 @@ class AnalyticsCog(commands.Cog):
             ''') as cursor:
                 recent_trades = list(await cursor.fetchall())
             
-            today = datetime.utcnow().date().isoformat()
+            # A range on the raw column can use idx_trades_created; DATE(created_at)
+            # would have to be computed for every trade.
+            today = datetime.utcnow().date()
             async with db.execute('''
                 SELECT COUNT(*) FROM trades 
-                WHERE DATE(created_at) = ?
-            ''', (today,)) as cursor:
+                WHERE created_at >= ? AND created_at < ?
+            ''', (today.isoformat(), (today + timedelta(days=1)).isoformat())) as cursor:
                 row = await cursor.fetchone()
                 today_count = row[0] if row else 0
         
@@ -3,10 +3,10 @@ from discord import app_commands
 from discord.ext import commands, tasks
 from typing import Optional
 import json
-import aiosqlite
 from datetime import datetime, timedelta
 
-from utils.database import DATABASE_PATH, log_audit
+from utils.database import log_audit
+from utils.db_pool import db_pool
 from utils.resolver import item_resolver
 from utils.rate_limit import rate_limiter
 from ui.embeds import GAME_NAMES, GAME_COLORS
@@ -24,8 +24,7 @@ class AuctionsCog(commands.Cog):
     async def check_auctions(self):
         now = datetime.utcnow().isoformat()
         
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            db.row_factory = aiosqlite.Row
+        async with db_pool.reader() as db:
             async with db.execute(
                 "SELECT * FROM auctions WHERE status = 'active' AND ends_at <= ?",
                 (now,)
@@ -40,15 +39,14 @@ class AuctionsCog(commands.Cog):
         await self.bot.wait_until_ready()
     
     async def _get_auction(self, auction_id: str) -> Optional[dict]:
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            db.row_factory = aiosqlite.Row
+        async with db_pool.reader() as db:
             async with db.execute("SELECT * FROM auctions WHERE id = ?", (auction_id,)) as cursor:
                 row = await cursor.fetchone()
                 return dict(row) if row else None
     
     async def _create_auction(self, auction_id: str, seller_id: int, game: str, item: dict,
                               starting_bid: int, ends_at: str, channel_id: Optional[int]) -> None:
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_pool.writer() as db:
             await db.execute('''
                 INSERT INTO auctions (id, seller_id, game, item_data, starting_bid, ends_at, channel_id)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -60,12 +58,12 @@ class AuctionsCog(commands.Cog):
             return
         fields = ', '.join(f'{k} = ?' for k in kwargs.keys())
         values = list(kwargs.values()) + [auction_id]
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_pool.writer() as db:
             await db.execute(f'UPDATE auctions SET {fields} WHERE id = ?', values)
             await db.commit()
     
     async def _add_bid(self, auction_id: str, user_id: int, amount: int) -> None:
-        async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db_pool.writer() as db:
             await db.execute('''
                 INSERT INTO auction_bids (auction_id, user_id, amount)
                 VALUES (?, ?, ?)
@@ -73,8 +71,7 @@ class AuctionsCog(commands.Cog):
             await db.commit()
     
     async def _get_auction_bids(self, auction_id: str, limit: int = 5):
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            db.row_factory = aiosqlite.Row
+        async with db_pool.reader() as db:
             async with db.execute(
                 "SELECT * FROM auction_bids WHERE auction_id = ? ORDER BY timestamp DESC LIMIT ?",
                 (auction_id, limit)
@@ -211,8 +208,7 @@ class AuctionsCog(commands.Cog):
         app_commands.Choice(name="Steal a Brainrot", value="sab")
     ])
     async def auction_list(self, interaction: discord.Interaction, game: str = "all"):
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            db.row_factory = aiosqlite.Row
+        async with db_pool.reader() as db:
             if game == "all":
                 async with db.execute("SELECT * FROM auctions WHERE status = 'active' ORDER BY ends_at ASC LIMIT 10") as cursor:
                     auctions = [dict(row) for row in await cursor.fetchall()]
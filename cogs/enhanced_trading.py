@@ -22,6 +22,7 @@ from utils.database_v2 import (
 from utils.resolver import item_resolver
 from utils.trust_engine import trust_engine
 from utils.rate_limit import rate_limiter
+from utils.user_resolver import user_resolver
 from ui.embeds import GAME_NAMES, GAME_COLORS
 from ui.trade_builder import TradeBuilderView, format_value, RARITY_EMOJIS
 from ui.enhanced_embeds import EnhancedTradeEmbed, WishlistEmbed, LeaderboardEmbed, LFFTEmbed
@@ -369,8 +370,7 @@ class EnhancedTradingCog(commands.Cog):
         item_list = [i.strip() for i in items.split(',') if i.strip()]
         
         resolved_items = []
-        for item_name in item_list:
-            resolved = await item_resolver.resolve_item(game, item_name)
+        for item_name, resolved in zip(item_list, await item_resolver.resolve_items(game, item_list)):
             if resolved:
                 resolved_items.append({
                     'id': resolved['id'],
@@ -428,8 +428,7 @@ class EnhancedTradingCog(commands.Cog):
         item_list = [i.strip() for i in items.split(',') if i.strip()]
         
         resolved_items = []
-        for item_name in item_list:
-            resolved = await item_resolver.resolve_item(game, item_name)
+        for item_name, resolved in zip(item_list, await item_resolver.resolve_items(game, item_list)):
             if resolved:
                 resolved_items.append({
                     'id': resolved['id'],
@@ -508,11 +507,13 @@ class EnhancedTradingCog(commands.Cog):
             return
         
         embeds = []
+        users = await user_resolver.get_many(self.bot, (post['user_id'] for post in posts[:5]))
         for post in posts[:5]:
+            user = users.get(post['user_id'])
+            if not user:
+                continue
             try:
-                user = await self.bot.fetch_user(post['user_id'])
-                embed = LFFTEmbed.create_post(post, user)
-                embeds.append(embed)
+                embeds.append(LFFTEmbed.create_post(post, user))
             except:
                 continue
         
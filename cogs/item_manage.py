@@ -6,9 +6,10 @@ import json
 import logging
 
 from utils.database import (
-    upsert_item, get_item, search_items as db_search_items, delete_item, 
+    upsert_item, get_item, delete_item, 
     get_all_items_for_game, update_item_field, init_database
 )
+from utils.autocomplete import item_autocomplete
 
 logger = logging.getLogger('ItemManage')
 
@@ -109,10 +110,7 @@ class ItemManageCog(commands.Cog):
             return []
 
         try:
-            if not current:
-                items = await get_all_items_for_game(game, limit=25)
-            else:
-                items = await db_search_items(game, current, limit=25)
+            items = await item_autocomplete.complete(game, current or '', interaction.user.id)
             
             return [
                 app_commands.Choice(
@@ -5,10 +5,9 @@ from typing import Optional
 import json
 
 from utils.database import (
-    get_user, update_user, get_trade, update_trade,
-    add_trade_history, log_audit
+    update_user, get_trade, log_audit, transition_trade
 )
-from utils.trust_engine import trust_engine
+from utils.user_resolver import user_resolver
 
 class ModerationCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -89,42 +88,36 @@ class ModerationCog(commands.Cog):
             await interaction.response.send_message("Only disputed trades can be force resolved.", ephemeral=True)
             return
         
+        reputation = {}
         if resolution == 'completed':
-            await update_trade(trade_id, status='completed')
-            
-            if trade['requester_id']:
-                req_data = await get_user(trade['requester_id'])
-                if req_data:
-                    updates = trust_engine.update_reputation(req_data, 'trade_completed')
-                    await update_user(trade['requester_id'], **updates)
-            
-            if trade['target_id']:
-                tgt_data = await get_user(trade['target_id'])
-                if tgt_data:
-                    updates = trust_engine.update_reputation(tgt_data, 'trade_completed')
-                    await update_user(trade['target_id'], **updates)
-                    
-        elif resolution == 'cancelled':
-            await update_trade(trade_id, status='cancelled')
-            
+            status = 'completed'
+            reputation = {
+                trade['requester_id']: 'trade_completed',
+                trade['target_id']: 'trade_completed'
+            }
         elif resolution == 'requester_fault':
-            await update_trade(trade_id, status='cancelled')
-            if trade['requester_id']:
-                req_data = await get_user(trade['requester_id'])
-                if req_data:
-                    updates = trust_engine.update_reputation(req_data, 'scam_detected')
-                    await update_user(trade['requester_id'], **updates)
-                    
+            status = 'cancelled'
+            reputation = {trade['requester_id']: 'scam_detected'}
         elif resolution == 'target_fault':
-            await update_trade(trade_id, status='cancelled')
-            if trade['target_id']:
-                tgt_data = await get_user(trade['target_id'])
-                if tgt_data:
-                    updates = trust_engine.update_reputation(tgt_data, 'scam_detected')
-                    await update_user(trade['target_id'], **updates)
+            status = 'cancelled'
+            reputation = {trade['target_id']: 'scam_detected'}
+        else:
+            status = 'cancelled'
         
-        await add_trade_history(trade_id, f'force_resolved_{resolution}', interaction.user.id)
-        await log_audit('force_resolve', interaction.user.id, trade_id, resolution)
+        resolved = await transition_trade(
+            trade_id, f'force_resolved_{resolution}', interaction.user.id,
+            from_status=('disputed',),
+            reputation=reputation,
+            audit=('force_resolve', interaction.user.id, trade_id, resolution),
+            status=status
+        )
+        
+        if not resolved:
+            await interaction.response.send_message(
+                f"Trade #{trade_id} is no longer disputed; it was not changed.",
+                ephemeral=True
+            )
+            return
         
         await interaction.response.send_message(
             f"Trade #{trade_id} has been resolved as: {resolution}",
@@ -205,17 +198,20 @@ class ModerationCog(commands.Cog):
     @is_moderator()
     @app_commands.describe(trade_id="The trade ID to replay")
     async def replay_trade(self, interaction: discord.Interaction, trade_id: int):
-        import aiosqlite
-        from utils.database import DATABASE_PATH
+        from utils.db_pool import db_pool
+        from utils.write_behind import write_behind
+        
+        # Flushing queued history can wait on the writer; acknowledge first.
+        await interaction.response.defer(ephemeral=True)
         
         trade = await get_trade(trade_id)
         
         if not trade:
-            await interaction.response.send_message("Trade not found.", ephemeral=True)
+            await interaction.followup.send("Trade not found.", ephemeral=True)
             return
         
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            db.row_factory = aiosqlite.Row
+        await write_behind.flush()
+        async with db_pool.reader() as db:
             async with db.execute(
                 "SELECT * FROM trade_history WHERE trade_id = ? ORDER BY timestamp ASC",
                 (trade_id,)
@@ -227,17 +223,14 @@ class ModerationCog(commands.Cog):
             color=0x9B59B6
         )
         
-        requester = await self.bot.fetch_user(trade['requester_id'])
-        target = None
-        if trade['target_id']:
-            try:
-                target = await self.bot.fetch_user(trade['target_id'])
-            except:
-                pass
+        # Mentions only need the id; the shown events' actors are resolved in one wave.
+        shown = history[:15]
+        users = await user_resolver.get_many(self.bot, (event['actor_id'] for event in shown))
+        target_text = f"<@{trade['target_id']}>" if trade['target_id'] else 'N/A'
         
         embed.add_field(
             name="Participants",
-            value=f"Requester: {requester.mention}\nTarget: {target.mention if target else 'N/A'}",
+            value=f"Requester: <@{trade['requester_id']}>\nTarget: {target_text}",
             inline=False
         )
         
@@ -260,24 +253,21 @@ class ModerationCog(commands.Cog):
                 'force_resolved': '⚖️'
             }
             
-            for event in history:
+            for event in shown:
                 action = event['action']
                 emoji = action_emojis.get(action.split('_')[0], '📋')
                 timestamp = event['timestamp'][:16] if event['timestamp'] else 'Unknown'
                 
                 actor_text = ""
                 if event['actor_id'] and event['actor_id'] != 0:
-                    try:
-                        actor = await self.bot.fetch_user(event['actor_id'])
-                        actor_text = f" by {actor.display_name}"
-                    except:
-                        actor_text = f" by User {event['actor_id']}"
+                    actor = users.get(event['actor_id'])
+                    actor_text = f" by {actor.display_name}" if actor else f" by User {event['actor_id']}"
                 
                 timeline_text.append(f"{emoji} **{action.replace('_', ' ').title()}**{actor_text}\n   `{timestamp}`")
             
-            timeline_display = "\n".join(timeline_text[:15])
-            if len(timeline_text) > 15:
-                timeline_display += f"\n... and {len(timeline_text) - 15} more events"
+            timeline_display = "\n".join(timeline_text)
+            if len(history) > len(shown):
+                timeline_display += f"\n... and {len(history) - len(shown)} more events"
             
             embed.add_field(name="Timeline", value=timeline_display, inline=False)
         else:
@@ -292,7 +282,7 @@ class ModerationCog(commands.Cog):
         
         embed.set_footer(text=f"Created: {trade['created_at'][:16]}")
         
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 
 async def setup(bot: commands.Bot):
@@ -4,9 +4,16 @@ from discord.ext import commands
 from typing import Optional
 import json
 import os
+import time
 
 from api.base import APIRegistry
+from api.health import health_monitor
 from utils.database import init_database, bulk_upsert_items, get_item_count
+from utils.db_pool import db_pool
+from utils.write_behind import write_behind
+from utils.resolver import item_resolver
+from utils.cache import cache_metrics
+from utils.http_client import http_client
 
 
 def is_owner():
@@ -65,6 +72,8 @@ class OwnerCog(commands.Cog):
     @owner_group.command(name="status", description="View bot status")
     @is_owner()
     async def bot_status(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        
         embed = discord.Embed(
             title="Bot Status",
             color=0x2ECC71
@@ -78,33 +87,118 @@ class OwnerCog(commands.Cog):
         total_items = await get_item_count()
         embed.add_field(name="Items in DB", value=str(total_items), inline=True)
         
+        pool = db_pool.stats()
+        embed.add_field(
+            name="DB Pool",
+            value=(
+                f"Readers: {pool['readers_idle']}/{pool['readers']} idle\n"
+                f"Reads: {pool['reader_checkouts']} (avg wait {pool['reader_wait_avg_ms']:.1f}ms)\n"
+                f"Writes: {pool['writer_checkouts']} (avg wait {pool['writer_wait_avg_ms']:.1f}ms, "
+                f"max {pool['writer_wait_max_ms']:.0f}ms)\n"
+                f"Journal: {pool['journal_mode']} (WAL {pool['wal_bytes'] / 1024:.0f} KB)\n"
+                f"Checkpoints: {pool['checkpoints']} (last {pool['last_checkpoint_mode'] or 'n/a'}, "
+                f"{pool['last_checkpoint_ms']:.1f}ms)"
+            ),
+            inline=False
+        )
+        
+        queue = write_behind.stats()
+        embed.add_field(
+            name="Write Queue",
+            value=(
+                f"Pending: {queue['pending']}/{queue['max_size']}\n"
+                f"Written: {queue['written']} in {queue['batches']} batches "
+                f"(last {queue['last_flush_ms']:.1f}ms)\n"
+                f"Retries: {queue['retries']} | Dropped: {queue['failed']} | "
+                f"Backpressure waits: {queue['backpressure_waits']}"
+            ),
+            inline=False
+        )
+        
+        resolver = item_resolver.stats()
+        embed.add_field(
+            name="Item Resolver",
+            value=(
+                f"Exact: {resolver['exact']} | Alias: {resolver['alias']} | Fuzzy: {resolver['fuzzy']}\n"
+                f"Miss: {resolver['miss']} | Cached miss: {resolver['negative_hit']} "
+                f"({resolver['negative_entries']} remembered)"
+            ),
+            inline=False
+        )
+        
+        embed.add_field(name="Caches", value=self._format_cache_table(), inline=False)
+        
+        hosts = http_client.stats()['hosts']
+        if hosts:
+            http_text = "\n".join(
+                f"{host}: {h['requests']} req, {h['connections_created']} new / "
+                f"{h['connections_reused']} reused conn, avg {h['avg_ms']:.0f}ms, {h['errors']} err"
+                for host, h in sorted(hosts.items(), key=lambda x: -x[1]['requests'])[:8]
+            )
+            embed.add_field(name="HTTP", value=http_text[:1024], inline=False)
+        
         cogs_loaded = list(self.bot.cogs.keys())
         embed.add_field(name="Cogs Loaded", value=", ".join(cogs_loaded) or "None", inline=False)
         
-        api_status = await APIRegistry.health_check_all()
-        api_text = "\n".join([f"{'✅' if v else '❌'} {k.upper()}" for k, v in api_status.items()])
-        embed.add_field(name="API Status", value=api_text or "No APIs", inline=False)
+        api_status = await health_monitor.check_all()
+        embed.add_field(name="API Status", value=self._format_health(api_status) or "No APIs", inline=False)
         
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+    
+    @staticmethod
+    def _format_health(results) -> str:
+        lines = []
+        for game, h in results.items():
+            probe = f"{h['status'] or h['error']} in {h['ms']:.0f}ms"
+            if h['p50_ms'] is not None:
+                probe += f" (p50 {h['p50_ms']:.0f} / p95 {h['p95_ms']:.0f} / p99 {h['p99_ms']:.0f}ms)"
+            age = h['last_success_age']
+            if age is None:
+                fetched = "never fetched"
+            elif age < 3600:
+                fetched = f"fetched {age / 60:.0f}m ago"
+            else:
+                fetched = f"fetched {age / 3600:.1f}h ago"
+            lines.append(f"{'✅' if h['ok'] else '❌'} {game.upper()}: {probe}, {fetched}")
+        return "\n".join(lines)[:1024]
+    
+    @staticmethod
+    def _format_cache_table() -> str:
+        rows = ["cache              hit%  evict  entries     KB  load ms"]
+        for name, m in cache_metrics().items():
+            lookups = m['hits'] + m['misses']
+            hit_rate = f"{100 * m['hits'] / lookups:.0f}" if lookups else "-"
+            load = f"{m['load_ms_avg']:.0f}" if m['loads'] else "-"
+            rows.append(
+                f"{name[:18]:<18} {hit_rate:>4} {m['evictions']:>6} {m['entries']:>8} "
+                f"{m['bytes'] / 1024:>6.0f} {load:>8}"
+            )
+        return "```\n" + "\n".join(rows)[:1000] + "\n```"
     
     @owner_group.command(name="refresh_cache", description="Refresh all item caches and save to database")
     @is_owner()
     async def refresh_cache(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         
+        started = time.perf_counter()
+        results = await APIRegistry.refresh_all(save=lambda items: bulk_upsert_items(items, source='api'))
+        total_s = time.perf_counter() - started
+        
         refreshed = []
-        for game, adapter in APIRegistry.all().items():
-            try:
-                adapter._cache.clear()
-                adapter._cache_expiry.clear()
-                items = await adapter.fetch_items()
-                if items:
-                    count = await bulk_upsert_items(items, source='api')
-                    refreshed.append(f"✅ {game.upper()}: {count} items saved to database")
-                else:
-                    refreshed.append(f"⚠️ {game.upper()}: No items fetched")
-            except Exception as e:
-                refreshed.append(f"❌ {game.upper()}: {str(e)[:50]}")
+        for game, outcome in results.items():
+            took = f"({outcome['ms'] / 1000:.1f}s)"
+            if outcome['result']:
+                result = outcome['result']
+                took = (f"({outcome['ms'] / 1000:.1f}s, {result['bytes'] / 1024:.0f} KB down, "
+                        f"{result['not_modified']} unchanged: {result['bytes_saved'] / 1024:.0f} KB "
+                        f"and {result['parse_ms_saved']:.0f}ms parse saved)")
+            if outcome['error']:
+                refreshed.append(f"❌ {game.upper()}: {outcome['error'][:50]} {took}")
+            elif outcome['result']['items']:
+                refreshed.append(f"✅ {game.upper()}: {outcome['result']['saved']} items saved to database {took}")
+            else:
+                refreshed.append(f"⚠️ {game.upper()}: No items fetched {took}")
+        refreshed.append(f"Total: {total_s:.1f}s")
         
         await interaction.followup.send("\n".join(refreshed))
     
@@ -133,8 +227,7 @@ class OwnerCog(commands.Cog):
             
             adapter = APIRegistry.get(game)
             if adapter:
-                adapter._cache.clear()
-                adapter._cache_expiry.clear()
+                adapter.clear_cache()
                 adapter.values_url = url
                 
                 items = await adapter.fetch_items()
@@ -205,19 +298,17 @@ class OwnerCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            from utils.database import get_db, init_database
+            from utils.database import init_database
             
             await init_database()
             
-            db = await get_db()
-            await db.execute('DELETE FROM game_sources WHERE game = ?', (game,))
-            await db.commit()
-            await db.close()
+            async with db_pool.writer() as db:
+                await db.execute('DELETE FROM game_sources WHERE game = ?', (game,))
+                await db.commit()
             
             adapter = APIRegistry.get(game)
             if adapter:
-                adapter._cache.clear()
-                adapter._cache_expiry.clear()
+                adapter.clear_cache()
                 default_url = getattr(adapter, 'default_values_url', adapter.values_url)
                 adapter.values_url = default_url
                 
@@ -2,14 +2,17 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from typing import Optional
-import aiohttp
+import logging
 
 from utils.database import get_user, create_user, update_user
 from utils.trust_engine import trust_engine
 from utils.validators import Validators
+from utils.http_client import http_client
 from ui.embeds import ProfileEmbed
 from ui.modals import LinkRobloxModal
 
+logger = logging.getLogger(__name__)
+
 class ProfileCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -101,45 +104,45 @@ class ProfileCog(commands.Cog):
     
     async def _fetch_roblox_user(self, username: str) -> Optional[dict]:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    'https://users.roblox.com/v1/usernames/users',
-                    json={'usernames': [username], 'excludeBannedUsers': True}
-                ) as response:
-                    if response.status != 200:
-                        return None
-                    
-                    data = await response.json()
-                    if not data.get('data'):
-                        return None
-                    
-                    user_data = data['data'][0]
-                    user_id = user_data['id']
+            session = await http_client.session()
+            async with session.post(
+                'https://users.roblox.com/v1/usernames/users',
+                json={'usernames': [username], 'excludeBannedUsers': True}
+            ) as response:
+                if response.status != 200:
+                    return None
+                
+                data = await response.json()
+                if not data.get('data'):
+                    return None
+                
+                user_data = data['data'][0]
+                user_id = user_data['id']
+            
+            async with session.get(f'https://users.roblox.com/v1/users/{user_id}') as response:
+                if response.status != 200:
+                    return {'id': user_id, 'name': user_data['name'], 'age_days': 0}
+                
+                details = await response.json()
+                
+                created = details.get('created', '')
+                age_days = 0
+                if created:
+                    from datetime import datetime
+                    try:
+                        created_date = datetime.fromisoformat(created.replace('Z', '+00:00'))
+                        age_days = (datetime.now(created_date.tzinfo) - created_date).days
+                    except:
+                        pass
                 
-                async with session.get(f'https://users.roblox.com/v1/users/{user_id}') as response:
-                    if response.status != 200:
-                        return {'id': user_id, 'name': user_data['name'], 'age_days': 0}
-                    
-                    details = await response.json()
-                    
-                    created = details.get('created', '')
-                    age_days = 0
-                    if created:
-                        from datetime import datetime
-                        try:
-                            created_date = datetime.fromisoformat(created.replace('Z', '+00:00'))
-                            age_days = (datetime.now(created_date.tzinfo) - created_date).days
-                        except:
-                            pass
-                    
-                    return {
-                        'id': user_id,
-                        'name': details.get('name', user_data['name']),
-                        'display_name': details.get('displayName', ''),
-                        'age_days': age_days
-                    }
+                return {
+                    'id': user_id,
+                    'name': details.get('name', user_data['name']),
+                    'display_name': details.get('displayName', ''),
+                    'age_days': age_days
+                }
         except Exception as e:
-            print(f"Error fetching Roblox user: {e}")
+            logger.error(f"Error fetching Roblox user: {e}")
             return None
     
     @app_commands.command(name="unlink_roblox", description="Unlink your Roblox account")
@@ -4,6 +4,7 @@ from discord.ext import commands
 from typing import Optional, List
 
 from utils.resolver import item_resolver
+from utils.autocomplete import item_autocomplete
 from utils.database import get_all_items_for_game
 from ui.embeds import SearchEmbed, GAME_NAMES, GAME_COLORS
 
@@ -26,14 +27,7 @@ class SearchCog(commands.Cog):
             return []
         
         try:
-            if not current or len(current) < 1:
-                items = await get_all_items_for_game(game, limit=25)
-                return [
-                    app_commands.Choice(name=f"{item['name'][:50]} ({item.get('value', 0):,.0f})"[:100], value=item['name'][:100])
-                    for item in items
-                ]
-            
-            items = await item_resolver.search_items(game, current, limit=25)
+            items = await item_autocomplete.complete(game, current or '', interaction.user.id)
             return [
                 app_commands.Choice(name=f"{item['name'][:50]} ({item.get('value', 0):,.0f})"[:100], value=item['name'][:100])
                 for item in items
@@ -6,15 +6,15 @@ import json
 from datetime import datetime, timedelta
 
 from utils.database import (
-    get_user, create_user, update_user, 
+    get_user, create_user,
     create_trade, update_trade, get_trade, get_user_trades,
-    add_trade_history, log_audit, get_trade_channel, get_game_trade_channel
+    get_trade_channel, get_game_trade_channel, transition_trade
 )
-from utils.database_v2 import is_trader_blocked
+from utils.database_v2 import get_block_state
 from utils.resolver import item_resolver
 from utils.trust_engine import trust_engine, RiskLevel
 from utils.validators import Validators
-from utils.rate_limit import rate_limiter, action_cooldown
+from utils.rate_limit import rate_limiter
 from ui.embeds import TradeEmbed, GAME_NAMES, GAME_COLORS
 from ui.views import TradeView, HandoffView, ConfirmView, GameSelectView, DynamicTradeView, DynamicAnnouncementView
 from ui.modals import TradeModal
@@ -65,10 +65,11 @@ class TradingCog(commands.Cog):
             return
         
         if target:
-            if await is_trader_blocked(target.id, interaction.user.id):
+            blocked_by_target, blocked_target = await get_block_state(interaction.user.id, target.id)
+            if blocked_by_target:
                 await interaction.response.send_message("This user has blocked you from trading with them.", ephemeral=True)
                 return
-            if await is_trader_blocked(interaction.user.id, target.id):
+            if blocked_target:
                 await interaction.response.send_message("You have blocked this user. Unblock them first to trade.", ephemeral=True)
                 return
         
@@ -123,9 +124,11 @@ class TradingCog(commands.Cog):
             update_kwargs['target_id'] = target.id
             update_kwargs['status'] = 'pending'
         
-        await update_trade(trade_id, **update_kwargs)
-        await add_trade_history(trade_id, 'created', interaction.user.id)
-        await log_audit('trade_created', interaction.user.id, target.id if target else None, f"Trade {trade_id}")
+        await transition_trade(
+            trade_id, 'created', interaction.user.id,
+            audit=('trade_created', interaction.user.id, target.id if target else None, f"Trade {trade_id}"),
+            **update_kwargs
+        )
         
         trade = await get_trade(trade_id)
         if not trade:
@@ -374,8 +377,9 @@ class TradingCog(commands.Cog):
             await interaction.followup.send("Trade not found.", ephemeral=True)
             return
         
-        await update_trade(trade_id, status='trust_check')
-        await add_trade_history(trade_id, 'accepted', target.id)
+        if not await transition_trade(trade_id, 'accepted', target.id, from_status=('pending',), status='trust_check'):
+            await interaction.followup.send("This trade has already been handled.", ephemeral=True)
+            return
         
         requester_data = await get_user(trade['requester_id'])
         target_data = await get_user(target.id)
@@ -420,13 +424,13 @@ class TradingCog(commands.Cog):
             await view.wait()
             
             if not view.result:
-                await update_trade(trade_id, status='cancelled')
-                await add_trade_history(trade_id, 'cancelled_risk', target.id)
+                await transition_trade(trade_id, 'cancelled_risk', target.id, from_status=('trust_check',), status='cancelled')
                 await interaction.followup.send("Trade cancelled due to risk concerns.")
                 return
         
-        await update_trade(trade_id, status='in_game_trade')
-        await add_trade_history(trade_id, 'handoff_started', 0)
+        if not await transition_trade(trade_id, 'handoff_started', 0, from_status=('trust_check',), status='in_game_trade'):
+            await interaction.followup.send("This trade is no longer awaiting handoff.", ephemeral=True)
+            return
         
         handoff_embed = TradeEmbed.create_handoff(trade, trade['game'])
         view = HandoffView(trade_id, trade['requester_id'], target.id)
@@ -442,31 +446,33 @@ class TradingCog(commands.Cog):
         await view.wait()
         
         if view.result == 'completed':
-            await self._complete_trade(trade_id, trade, requester_data, target_data)
-            
             receipt_hash = trust_engine.generate_receipt_hash(trade)
-            await update_trade(trade_id, receipt_hash=receipt_hash)
+            if not await self._complete_trade(trade_id, trade, receipt_hash):
+                await interaction.followup.send("This trade was already resolved; no receipt was issued.")
+                return
             
             receipt_embed = TradeEmbed.create_receipt(trade, receipt_hash)
             await interaction.followup.send(embed=receipt_embed)
             
         elif view.result == 'disputed':
-            await update_trade(trade_id, status='disputed')
-            await add_trade_history(trade_id, 'disputed', 0)
-            await interaction.followup.send("Trade has been marked as disputed. A moderator will review.")
+            if await transition_trade(trade_id, 'disputed', 0, from_status=('in_game_trade',), status='disputed'):
+                await interaction.followup.send("Trade has been marked as disputed. A moderator will review.")
+            else:
+                await interaction.followup.send("This trade was already resolved and cannot be disputed.")
     
-    async def _complete_trade(self, trade_id: int, trade: dict, requester_data: dict, target_data: dict):
-        completed_at = datetime.utcnow().isoformat()
-        await update_trade(trade_id, status='completed', completed_at=completed_at)
-        await add_trade_history(trade_id, 'completed', 0)
-        
-        req_updates = trust_engine.update_reputation(requester_data, 'trade_completed')
-        tgt_updates = trust_engine.update_reputation(target_data, 'trade_completed')
-        
-        await update_user(trade['requester_id'], **req_updates)
-        await update_user(trade['target_id'], **tgt_updates)
-        
-        await log_audit('trade_completed', trade['requester_id'], trade['target_id'], f"Trade {trade_id}")
+    async def _complete_trade(self, trade_id: int, trade: dict, receipt_hash: str) -> bool:
+        return await transition_trade(
+            trade_id, 'completed', 0,
+            from_status=('in_game_trade',),
+            status='completed',
+            completed_at=datetime.utcnow().isoformat(),
+            receipt_hash=receipt_hash,
+            reputation={
+                trade['requester_id']: 'trade_completed',
+                trade['target_id']: 'trade_completed'
+            },
+            audit=('trade_completed', trade['requester_id'], trade['target_id'], f"Trade {trade_id}")
+        )
     
     @trade_group.command(name="view", description="View a trade by ID")
     @app_commands.describe(trade_id="The trade ID to view")
@@ -519,14 +525,15 @@ class TradingCog(commands.Cog):
     @trade_group.command(name="verify", description="Verify a trade receipt by hash")
     @app_commands.describe(receipt_hash="The receipt hash to verify")
     async def trade_verify(self, interaction: discord.Interaction, receipt_hash: str):
-        from utils.database import get_db
-        import aiosqlite
+        from utils.db_pool import db_pool
         
-        async with aiosqlite.connect("data/trading_bot.db") as db:
-            db.row_factory = aiosqlite.Row
+        async with db_pool.reader() as db:
+            # Receipt hashes are lowercase hex, so a prefix match is the range
+            # [prefix, prefix + 'g'), which can use the receipt_hash index.
+            prefix = receipt_hash.strip().lower()
             async with db.execute(
-                "SELECT * FROM trades WHERE receipt_hash LIKE ?",
-                (f"{receipt_hash}%",)
+                "SELECT * FROM trades WHERE receipt_hash >= ? AND receipt_hash < ? LIMIT 1",
+                (prefix, f"{prefix}g")
             ) as cursor:
                 trade = await cursor.fetchone()
         
@@ -587,13 +594,18 @@ class TradingCog(commands.Cog):
             await interaction.response.send_message("This trade cannot be cancelled.", ephemeral=True)
             return
         
-        await update_trade(trade_id, status='cancelled')
-        await add_trade_history(trade_id, 'cancelled', interaction.user.id)
+        cancelled = await transition_trade(
+            trade_id, 'cancelled', interaction.user.id,
+            from_status=('draft', 'pending'),
+            reputation={interaction.user.id: 'trade_cancelled'},
+            status='cancelled'
+        )
         
-        user = await get_user(interaction.user.id)
-        if user:
-            updates = trust_engine.update_reputation(user, 'trade_cancelled')
-            await update_user(interaction.user.id, **updates)
+        if not cancelled:
+            await interaction.response.send_message(
+                f"Trade #{trade_id} changed state before it could be cancelled.", ephemeral=True
+            )
+            return
         
         await interaction.response.send_message(f"Trade #{trade_id} has been cancelled.")
 
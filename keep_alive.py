@@ -1,4 +1,4 @@
-from flask import Flask
+from flask import Flask, Response
 from threading import Thread
 import os
 
@@ -12,6 +12,11 @@ def home():
 def health():
     return {"status": "healthy", "service": "roblox-trading-bot"}
 
+@app.route('/metrics')
+def metrics():
+    from utils.cache import export_cache_metrics
+    return Response(export_cache_metrics(), mimetype='text/plain; version=0.0.4')
+
 def run():
     app.run(host='0.0.0.0', port=5000)
 
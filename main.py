@@ -6,7 +6,11 @@ import logging
 from dotenv import load_dotenv
 
 from keep_alive import keep_alive
-from utils.database import init_database, get_item_count
+from utils.database import init_database, close_database, get_item_count
+from utils.catalog import item_catalog
+from utils.guild_config import guild_config
+from utils.cache import close_caches
+from utils.http_client import http_client
 from api import setup_all_adapters
 
 load_dotenv()
@@ -49,6 +53,9 @@ class RobloxTradingBot(commands.Bot):
         item_count = await get_item_count()
         logger.info(f"Database has {item_count} items")
         
+        loaded = await item_catalog.load_all()
+        logger.info(f"Item catalog loaded: {loaded} items")
+        
         logger.info("Setting up API adapters...")
         setup_all_adapters()
         
@@ -71,11 +78,21 @@ class RobloxTradingBot(commands.Bot):
         except Exception as e:
             logger.error(f"Failed to sync commands: {e}")
     
+    async def close(self):
+        await super().close()
+        logger.info("Closing database connections...")
+        await close_database()
+        await close_caches()
+        await http_client.close()
+    
     async def on_ready(self):
         if self.user:
             logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
         logger.info(f"Connected to {len(self.guilds)} guilds")
         
+        warmed = await guild_config.load_all(g.id for g in self.guilds)
+        logger.info(f"Guild config loaded for {warmed} guilds")
+        
         await self.change_presence(
             activity=discord.Activity(
                 type=discord.ActivityType.watching,
@@ -83,6 +100,9 @@ class RobloxTradingBot(commands.Bot):
             )
         )
     
+    async def on_guild_remove(self, guild: discord.Guild):
+        guild_config.forget(guild.id)
+    
     async def on_command_error(self, ctx, error):
         if isinstance(error, commands.CommandNotFound):
             return
@@ -51,11 +51,8 @@ async def safe_fetch_trade(trade_id: int) -> Optional[Dict]:
 
 
 async def safe_fetch_user(client, user_id: int):
-    try:
-        return await client.fetch_user(user_id)
-    except Exception as e:
-        logger.error(f"Error fetching user {user_id}: {e}")
-        return None
+    from utils.user_resolver import user_resolver
+    return await user_resolver.get(client, user_id)
 
 
 def create_success_embed(title: str, description: str, game: Optional[str] = None) -> discord.Embed:
@@ -103,7 +100,7 @@ async def disable_message_buttons(interaction: discord.Interaction):
 
 
 async def handle_trade_accept(interaction: discord.Interaction, trade_id: int):
-    from utils.database import get_trade, update_trade, add_trade_history, create_trade_ticket
+    from utils.database import get_trade, transition_trade, create_trade_ticket
     
     trade = await safe_fetch_trade(trade_id)
     if not trade:
@@ -119,13 +116,19 @@ async def handle_trade_accept(interaction: discord.Interaction, trade_id: int):
         return await interaction.response.send_message(embed=embed, ephemeral=True)
     
     try:
-        await update_trade(trade_id, status='accepted')
-        await add_trade_history(trade_id, 'accepted', interaction.user.id)
+        accepted = await transition_trade(
+            trade_id, 'accepted', interaction.user.id,
+            from_status=('pending', 'draft'), status='accepted'
+        )
     except Exception as e:
         logger.error(f"Error accepting trade: {e}")
         embed = create_error_embed("Error", "Failed to accept trade. Please try again.")
         return await interaction.response.send_message(embed=embed, ephemeral=True)
     
+    if not accepted:
+        embed = create_error_embed("Invalid Status", "This trade has already been handled.")
+        return await interaction.response.send_message(embed=embed, ephemeral=True)
+    
     await disable_message_buttons(interaction)
     
     game = trade['game']
@@ -232,7 +235,7 @@ async def handle_trade_accept(interaction: discord.Interaction, trade_id: int):
 
 
 async def handle_trade_decline(interaction: discord.Interaction, trade_id: int):
-    from utils.database import get_trade, update_trade, add_trade_history
+    from utils.database import get_trade, transition_trade
     
     trade = await safe_fetch_trade(trade_id)
     if not trade:
@@ -244,13 +247,19 @@ async def handle_trade_decline(interaction: discord.Interaction, trade_id: int):
         return await interaction.response.send_message(embed=embed, ephemeral=True)
     
     try:
-        await update_trade(trade_id, status='cancelled')
-        await add_trade_history(trade_id, 'declined', interaction.user.id)
+        declined = await transition_trade(
+            trade_id, 'declined', interaction.user.id,
+            from_status=('pending', 'draft', 'counter_offered'), status='cancelled'
+        )
     except Exception as e:
         logger.error(f"Error declining trade: {e}")
         embed = create_error_embed("Error", "Failed to decline trade.")
         return await interaction.response.send_message(embed=embed, ephemeral=True)
     
+    if not declined:
+        embed = create_error_embed("Invalid Status", "This trade has already been handled.")
+        return await interaction.response.send_message(embed=embed, ephemeral=True)
+    
     await disable_message_buttons(interaction)
     
     embed = discord.Embed(
@@ -450,8 +459,7 @@ async def handle_trade_help(interaction: discord.Interaction):
 
 
 async def handle_handoff_confirm(interaction: discord.Interaction, trade_id: int):
-    from utils.database import get_trade, update_trade, add_trade_history, get_user, update_user
-    from utils.trust_engine import trust_engine
+    from utils.database import update_trade, complete_trade, HANDOFF_STATUSES
     
     trade = await safe_fetch_trade(trade_id)
     if not trade:
@@ -465,30 +473,24 @@ async def handle_handoff_confirm(interaction: discord.Interaction, trade_id: int
         embed = create_error_embed("Access Denied", "You are not part of this trade.")
         return await interaction.response.send_message(embed=embed, ephemeral=True)
     
+    if trade['status'] not in HANDOFF_STATUSES:
+        embed = create_error_embed("Invalid Status", "This trade can no longer be confirmed.")
+        return await interaction.response.send_message(embed=embed, ephemeral=True)
+    
     try:
         field = 'requester_confirmed' if interaction.user.id == requester_id else 'target_confirmed'
         await update_trade(trade_id, **{field: 1})
         
         trade = await safe_fetch_trade(trade_id)
-        if trade and trade['requester_confirmed'] and trade['target_confirmed']:
-            await update_trade(trade_id, status='completed', completed_at=datetime.utcnow().isoformat())
-            await add_trade_history(trade_id, 'completed', 0)
-            
-            requester_data = await get_user(requester_id)
-            target_data = await get_user(target_id)
-            
-            if requester_data:
-                req_updates = trust_engine.update_reputation(requester_data, 'trade_completed')
-                await update_user(requester_id, **req_updates)
-            if target_data:
-                tgt_updates = trust_engine.update_reputation(target_data, 'trade_completed')
-                await update_user(target_id, **tgt_updates)
-            
+        both_confirmed = bool(trade and trade['requester_confirmed'] and trade['target_confirmed'])
+        receipt_hash = await complete_trade(trade) if both_confirmed else None
+        
+        if both_confirmed and not receipt_hash:
+            embed = create_error_embed("Invalid Status", "This trade has already been handled.")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+        elif receipt_hash:
             await disable_message_buttons(interaction)
             
-            receipt_hash = trust_engine.generate_receipt_hash(trade)
-            await update_trade(trade_id, receipt_hash=receipt_hash)
-            
             game = trade['game']
             game_emoji = GAME_EMOJIS.get(game, '🎮')
             game_color = GAME_COLORS.get(game, 0x2ECC71)
@@ -522,7 +524,7 @@ async def handle_handoff_confirm(interaction: discord.Interaction, trade_id: int
 
 
 async def handle_handoff_issue(interaction: discord.Interaction, trade_id: int):
-    from utils.database import get_trade, update_trade, add_trade_history
+    from utils.database import get_trade, transition_trade, HANDOFF_STATUSES
     
     trade = await safe_fetch_trade(trade_id)
     if not trade:
@@ -534,10 +536,18 @@ async def handle_handoff_issue(interaction: discord.Interaction, trade_id: int):
         return await interaction.response.send_message(embed=embed, ephemeral=True)
     
     try:
-        await update_trade(trade_id, status='disputed')
-        await add_trade_history(trade_id, 'disputed', interaction.user.id)
+        disputed = await transition_trade(
+            trade_id, 'disputed', interaction.user.id,
+            from_status=HANDOFF_STATUSES, status='disputed'
+        )
     except Exception as e:
         logger.error(f"Error disputing trade: {e}")
+        embed = create_error_embed("Error", "Failed to report the issue. Please try again.")
+        return await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    if not disputed:
+        embed = create_error_embed("Invalid Status", "This trade has already been handled.")
+        return await interaction.response.send_message(embed=embed, ephemeral=True)
     
     await disable_message_buttons(interaction)
     
@@ -783,7 +793,7 @@ async def handle_ticket_close(interaction: discord.Interaction, trade_id: Option
 
 
 async def handle_announce_interested(interaction: discord.Interaction, trade_id: int):
-    from utils.database import get_trade, update_trade, add_trade_history, create_trade_ticket
+    from utils.database import get_trade, transition_trade, create_trade_ticket
     from ui.views import TradeTicketView
     
     trade = await safe_fetch_trade(trade_id)
@@ -804,6 +814,14 @@ async def handle_announce_interested(interaction: discord.Interaction, trade_id:
         embed = create_error_embed("Trade Unavailable", f"This trade is already {trade['status']}.")
         return await interaction.response.send_message(embed=embed, ephemeral=True)
     
+    from utils.database_v2 import get_block_state
+    blocked_by_requester, blocked_requester = await get_block_state(interaction.user.id, requester_id)
+    if blocked_by_requester or blocked_requester:
+        message = ("This trader has blocked you from trading with them." if blocked_by_requester
+                   else "You have blocked this trader. Unblock them first to trade.")
+        embed = create_error_embed("Trade Unavailable", message)
+        return await interaction.response.send_message(embed=embed, ephemeral=True)
+    
     requester = await safe_fetch_user(interaction.client, requester_id)
     game = trade['game']
     game_name = GAME_NAMES.get(game, game)
@@ -826,15 +844,22 @@ async def handle_announce_interested(interaction: discord.Interaction, trade_id:
                 pass
             
             try:
-                await update_trade(trade_id, target_id=interaction.user.id, status='pending')
-                await add_trade_history(trade_id, 'interest_expressed', interaction.user.id)
+                claimed = await transition_trade(
+                    trade_id, 'interest_expressed', interaction.user.id,
+                    from_status=('draft', 'pending', 'open'), target_id=interaction.user.id, status='pending'
+                )
             except Exception as e:
                 logger.error(f"Error updating trade after ticket creation: {e}")
+                claimed = None
+            if not claimed:
                 try:
                     await thread.delete()
                 except:
                     pass
-                embed = create_error_embed("Error", "Failed to set up trade. Please try again.")
+                if claimed is False:
+                    embed = create_error_embed("Trade Unavailable", "This trade has already been handled.")
+                else:
+                    embed = create_error_embed("Error", "Failed to set up trade. Please try again.")
                 return await interaction.response.send_message(embed=embed, ephemeral=True)
             
             await create_trade_ticket(
@@ -1001,7 +1026,7 @@ async def handle_announce_share(interaction: discord.Interaction, trade_id: int)
 
 
 async def handle_counter_accept(interaction: discord.Interaction, trade_id: int):
-    from utils.database import get_trade, update_trade, add_trade_history
+    from utils.database import get_trade, transition_trade
     from ui.views import DynamicHandoffView
     
     trade = await safe_fetch_trade(trade_id)
@@ -1014,13 +1039,19 @@ async def handle_counter_accept(interaction: discord.Interaction, trade_id: int)
         return await interaction.response.send_message(embed=embed, ephemeral=True)
     
     try:
-        await update_trade(trade_id, status='accepted')
-        await add_trade_history(trade_id, 'counter_accepted', interaction.user.id)
+        accepted = await transition_trade(
+            trade_id, 'counter_accepted', interaction.user.id,
+            from_status=('counter_offered',), status='accepted'
+        )
     except Exception as e:
         logger.error(f"Error accepting counter: {e}")
         embed = create_error_embed("Error", "Failed to accept counter offer.")
         return await interaction.response.send_message(embed=embed, ephemeral=True)
     
+    if not accepted:
+        embed = create_error_embed("Invalid Status", "This trade has already been handled.")
+        return await interaction.response.send_message(embed=embed, ephemeral=True)
+    
     await disable_message_buttons(interaction)
     
     target = await safe_fetch_user(interaction.client, trade['target_id'])
@@ -1043,7 +1074,7 @@ async def handle_counter_accept(interaction: discord.Interaction, trade_id: int)
 
 
 async def handle_counter_decline(interaction: discord.Interaction, trade_id: int):
-    from utils.database import get_trade, update_trade, add_trade_history
+    from utils.database import get_trade, transition_trade
     
     trade = await safe_fetch_trade(trade_id)
     if not trade:
@@ -1055,10 +1086,18 @@ async def handle_counter_decline(interaction: discord.Interaction, trade_id: int
         return await interaction.response.send_message(embed=embed, ephemeral=True)
     
     try:
-        await update_trade(trade_id, status='pending', counter_offer_data=None)
-        await add_trade_history(trade_id, 'counter_declined', interaction.user.id)
+        declined = await transition_trade(
+            trade_id, 'counter_declined', interaction.user.id,
+            from_status=('counter_offered',), status='pending', counter_offer_data=None
+        )
     except Exception as e:
         logger.error(f"Error declining counter: {e}")
+        embed = create_error_embed("Error", "Failed to decline counter offer.")
+        return await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    if not declined:
+        embed = create_error_embed("Invalid Status", "This trade has already been handled.")
+        return await interaction.response.send_message(embed=embed, ephemeral=True)
     
     await disable_message_buttons(interaction)
     
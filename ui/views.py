@@ -14,6 +14,7 @@ async def post_trade_to_feed(client, guild, trade, requester_id: int, target_id:
     
     try:
         from utils.database import get_guild_settings
+        from utils.user_resolver import user_resolver
         from ui.enhanced_embeds import EnhancedTradeEmbed
         
         settings = await get_guild_settings(guild.id)
@@ -27,8 +28,11 @@ async def post_trade_to_feed(client, guild, trade, requester_id: int, target_id:
         if not channel:
             return
         
-        requester = await client.fetch_user(requester_id)
-        target = await client.fetch_user(target_id)
+        users = await user_resolver.get_many(client, (requester_id, target_id))
+        requester = users.get(requester_id)
+        target = users.get(target_id)
+        if not requester or not target:
+            return
         
         embed = EnhancedTradeEmbed.create_trade_feed_entry(trade, requester, target)
         
@@ -69,11 +73,13 @@ class AcceptButton(Button):
             await interaction.response.send_message("Only the trade recipient can accept this trade.", ephemeral=True)
             return
         
-        from utils.database import update_trade, add_trade_history, get_trade, create_trade_ticket
+        from utils.database import transition_trade, get_trade, create_trade_ticket
         from ui.embeds import GAME_NAMES
         
-        await update_trade(self.trade_id, status='accepted')
-        await add_trade_history(self.trade_id, 'accepted', interaction.user.id)
+        if not await transition_trade(self.trade_id, 'accepted', interaction.user.id,
+                                      from_status=('pending', 'draft'), status='accepted'):
+            await interaction.response.send_message("This trade has already been handled.", ephemeral=True)
+            return
         
         if self.view:
             for child in self.view.children:
@@ -178,9 +184,11 @@ class DeclineButton(Button):
             await interaction.response.send_message("You are not part of this trade.", ephemeral=True)
             return
         
-        from utils.database import update_trade, add_trade_history
-        await update_trade(self.trade_id, status='cancelled')
-        await add_trade_history(self.trade_id, 'declined', interaction.user.id)
+        from utils.database import transition_trade
+        if not await transition_trade(self.trade_id, 'declined', interaction.user.id,
+                                      from_status=('pending', 'draft', 'counter_offered'), status='cancelled'):
+            await interaction.response.send_message("This trade has already been handled.", ephemeral=True)
+            return
         
         if self.view:
             for child in self.view.children:
@@ -259,7 +267,7 @@ class CounterOfferModal(Modal):
         self.add_item(self.notes)
     
     async def on_submit(self, interaction: discord.Interaction):
-        from utils.database import get_trade, update_trade, add_trade_history
+        from utils.database import get_trade, transition_trade
         from ui.embeds import GAME_NAMES
         from ui.trade_builder import parse_gem_value, format_value
         
@@ -278,8 +286,10 @@ class CounterOfferModal(Modal):
             'from_user': interaction.user.id
         }
         
-        await update_trade(self.trade_id, counter_offer_data=json.dumps(counter_data), status='counter_offered')
-        await add_trade_history(self.trade_id, 'counter_offered', interaction.user.id)
+        if not await transition_trade(self.trade_id, 'counter_offered', interaction.user.id, from_status=('pending',),
+                                      counter_offer_data=json.dumps(counter_data), status='counter_offered'):
+            await interaction.response.send_message("This trade is no longer open to counter offers.", ephemeral=True)
+            return
         
         requester = await interaction.client.fetch_user(self.requester_id)
         
@@ -332,10 +342,12 @@ class AcceptCounterButton(Button):
             await interaction.response.send_message("Only the original trader can accept this counter.", ephemeral=True)
             return
         
-        from utils.database import update_trade, add_trade_history
+        from utils.database import transition_trade
         
-        await update_trade(self.trade_id, status='accepted')
-        await add_trade_history(self.trade_id, 'counter_accepted', interaction.user.id)
+        if not await transition_trade(self.trade_id, 'counter_accepted', interaction.user.id,
+                                      from_status=('counter_offered',), status='accepted'):
+            await interaction.response.send_message("This trade has already been handled.", ephemeral=True)
+            return
         
         if self.view:
             for child in self.view.children:
@@ -364,10 +376,12 @@ class DeclineCounterButton(Button):
             await interaction.response.send_message("Only the original trader can decline.", ephemeral=True)
             return
         
-        from utils.database import update_trade, add_trade_history
+        from utils.database import transition_trade
         
-        await update_trade(self.trade_id, status='pending', counter_offer_data=None)
-        await add_trade_history(self.trade_id, 'counter_declined', interaction.user.id)
+        if not await transition_trade(self.trade_id, 'counter_declined', interaction.user.id,
+                                      from_status=('counter_offered',), status='pending', counter_offer_data=None):
+            await interaction.response.send_message("This trade has already been handled.", ephemeral=True)
+            return
         
         if self.view:
             for child in self.view.children:
@@ -590,33 +604,26 @@ class ConfirmTradeButton(Button):
             await interaction.response.send_message("You are not part of this trade.", ephemeral=True)
             return
         
-        from utils.database import get_trade, update_trade, add_trade_history, get_user, update_user
-        from utils.trust_engine import trust_engine
-        from datetime import datetime
+        from utils.database import get_trade, update_trade, complete_trade, HANDOFF_STATUSES
         
         trade = await get_trade(self.trade_id)
         if not trade:
             await interaction.response.send_message("Trade not found.", ephemeral=True)
             return
+        if trade['status'] not in HANDOFF_STATUSES:
+            await interaction.response.send_message("This trade can no longer be confirmed.", ephemeral=True)
+            return
         
         field = 'requester_confirmed' if interaction.user.id == self.requester_id else 'target_confirmed'
         await update_trade(self.trade_id, **{field: 1})
         
         trade = await get_trade(self.trade_id)
-        if trade and trade['requester_confirmed'] and trade['target_confirmed']:
-            await update_trade(self.trade_id, status='completed', completed_at=datetime.utcnow().isoformat())
-            await add_trade_history(self.trade_id, 'completed', 0)
-            
-            requester_data = await get_user(self.requester_id)
-            target_data = await get_user(self.target_id)
-            
-            if requester_data:
-                req_updates = trust_engine.update_reputation(requester_data, 'trade_completed')
-                await update_user(self.requester_id, **req_updates)
-            if target_data:
-                tgt_updates = trust_engine.update_reputation(target_data, 'trade_completed')
-                await update_user(self.target_id, **tgt_updates)
-            
+        both_confirmed = bool(trade and trade['requester_confirmed'] and trade['target_confirmed'])
+        receipt_hash = await complete_trade(trade) if both_confirmed else None
+        
+        if both_confirmed and not receipt_hash:
+            await interaction.response.send_message("This trade has already been handled.", ephemeral=True)
+        elif receipt_hash:
             if self.view:
                 for child in self.view.children:
                     if hasattr(child, 'disabled'):
@@ -624,9 +631,6 @@ class ConfirmTradeButton(Button):
                 if interaction.message:
                     await interaction.message.edit(view=self.view)
             
-            receipt_hash = trust_engine.generate_receipt_hash(trade)
-            await update_trade(self.trade_id, receipt_hash=receipt_hash)
-            
             embed = discord.Embed(title="Trade Completed!", color=0x2ECC71, description=f"Trade #{self.trade_id} verified.")
             embed.add_field(name="Receipt", value=f"`{receipt_hash[:32]}...`", inline=False)
             embed.set_footer(text="Trust scores updated!")
@@ -650,9 +654,11 @@ class ReportIssueButton(Button):
             await interaction.response.send_message("You are not part of this trade.", ephemeral=True)
             return
         
-        from utils.database import update_trade, add_trade_history
-        await update_trade(self.trade_id, status='disputed')
-        await add_trade_history(self.trade_id, 'disputed', interaction.user.id)
+        from utils.database import transition_trade, HANDOFF_STATUSES
+        if not await transition_trade(self.trade_id, 'disputed', interaction.user.id,
+                                      from_status=HANDOFF_STATUSES, status='disputed'):
+            await interaction.response.send_message("This trade has already been handled.", ephemeral=True)
+            return
         
         if self.view:
             for child in self.view.children:
@@ -733,6 +739,15 @@ class InterestedButton(Button):
             return
         
         from utils.database import get_trade, update_trade
+        from utils.database_v2 import get_block_state
+        
+        blocked_by_requester, blocked_requester = await get_block_state(interaction.user.id, self.requester_id)
+        if blocked_by_requester:
+            await interaction.response.send_message("This user has blocked you from trading with them.", ephemeral=True)
+            return
+        if blocked_requester:
+            await interaction.response.send_message("You have blocked this user. Unblock them first to trade.", ephemeral=True)
+            return
         
         requester = await interaction.client.fetch_user(self.requester_id)
         trade = await get_trade(self.trade_id)
@@ -988,10 +1003,12 @@ class ConfirmCancelView(View):
         if interaction.user.id != self.user_id:
             return
         
-        from utils.database import update_trade, add_trade_history
-        await update_trade(self.trade_id, status='cancelled')
-        await add_trade_history(self.trade_id, 'cancelled', interaction.user.id)
-        await interaction.response.send_message("Trade cancelled.", ephemeral=True)
+        from utils.database import transition_trade, OPEN_TRADE_STATUSES
+        if await transition_trade(self.trade_id, 'cancelled', interaction.user.id,
+                                  from_status=OPEN_TRADE_STATUSES, status='cancelled'):
+            await interaction.response.send_message("Trade cancelled.", ephemeral=True)
+        else:
+            await interaction.response.send_message("This trade is already closed.", ephemeral=True)
         self.stop()
     
     @discord.ui.button(label="No, Keep Trading", style=discord.ButtonStyle.secondary, emoji="❌")
@@ -1225,34 +1242,28 @@ class TicketConfirmTradeButton(Button):
             await interaction.response.send_message("You are not part of this trade.", ephemeral=True)
             return
         
-        from utils.database import get_trade, update_trade, add_trade_history, get_user, update_user, close_trade_ticket
-        from utils.trust_engine import trust_engine
-        from datetime import datetime
+        from utils.database import get_trade, update_trade, complete_trade, close_trade_ticket, HANDOFF_STATUSES
         
         trade = await get_trade(self.trade_id)
         if not trade:
             await interaction.response.send_message("Trade not found.", ephemeral=True)
             return
+        if trade['status'] not in HANDOFF_STATUSES:
+            await interaction.response.send_message("This trade can no longer be confirmed.", ephemeral=True)
+            return
         
         field = 'requester_confirmed' if interaction.user.id == self.requester_id else 'target_confirmed'
         await update_trade(self.trade_id, **{field: 1})
         
         trade = await get_trade(self.trade_id)
-        if trade and trade['requester_confirmed'] and trade['target_confirmed']:
-            await update_trade(self.trade_id, status='completed', completed_at=datetime.utcnow().isoformat())
-            await add_trade_history(self.trade_id, 'completed', 0)
+        both_confirmed = bool(trade and trade['requester_confirmed'] and trade['target_confirmed'])
+        receipt_hash = await complete_trade(trade) if both_confirmed else None
+        
+        if both_confirmed and not receipt_hash:
+            await interaction.response.send_message("This trade has already been handled.", ephemeral=True)
+        elif receipt_hash:
             await close_trade_ticket(self.trade_id)
             
-            requester_data = await get_user(self.requester_id)
-            target_data = await get_user(self.target_id)
-            
-            if requester_data:
-                req_updates = trust_engine.update_reputation(requester_data, 'trade_completed')
-                await update_user(self.requester_id, **req_updates)
-            if target_data:
-                tgt_updates = trust_engine.update_reputation(target_data, 'trade_completed')
-                await update_user(self.target_id, **tgt_updates)
-            
             if self.view:
                 for child in self.view.children:
                     if hasattr(child, 'disabled'):
@@ -1260,9 +1271,6 @@ class TicketConfirmTradeButton(Button):
                 if interaction.message:
                     await interaction.message.edit(view=self.view)
             
-            receipt_hash = trust_engine.generate_receipt_hash(trade)
-            await update_trade(self.trade_id, receipt_hash=receipt_hash)
-            
             embed = discord.Embed(
                 title="🎉 Trade Completed Successfully!",
                 description=f"Trade #{self.trade_id} has been verified and completed.",
@@ -1457,10 +1465,12 @@ class TicketReportIssueButton(Button):
             await interaction.response.send_message("You are not part of this trade.", ephemeral=True)
             return
         
-        from utils.database import update_trade, add_trade_history
+        from utils.database import transition_trade, HANDOFF_STATUSES
         
-        await update_trade(self.trade_id, status='disputed')
-        await add_trade_history(self.trade_id, 'disputed', interaction.user.id)
+        if not await transition_trade(self.trade_id, 'disputed', interaction.user.id,
+                                      from_status=HANDOFF_STATUSES, status='disputed'):
+            await interaction.response.send_message("This trade has already been handled.", ephemeral=True)
+            return
         
         embed = discord.Embed(
             title="⚠️ Trade Issue Reported",
@@ -4,5 +4,7 @@ from .resolver import ItemResolver
 from .validators import Validators
 from .rate_limit import RateLimiter
 from .trust_engine import TrustEngine
+from .db_pool import ConnectionPool
+from .catalog import ItemCatalog
 
-__all__ = ['Cache', 'FuzzyMatcher', 'ItemResolver', 'Validators', 'RateLimiter', 'TrustEngine']
+__all__ = ['Cache', 'FuzzyMatcher', 'ItemResolver', 'Validators', 'RateLimiter', 'TrustEngine', 'ConnectionPool', 'ItemCatalog']
@@ -0,0 +1,143 @@
+from typing import Optional, List, Dict, Any, Tuple
+from collections import OrderedDict
+from bisect import bisect_left
+import re
+import time
+
+from utils.catalog import item_catalog, normalize
+
+WORD_SPLIT = re.compile(r"[\s\-_]+")
+
+
+def _prefix_end(prefix: str) -> str:
+    # Smallest string greater than every string starting with prefix.
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over one game's item names.
+
+    Every item is keyed by the normalized name starting at each word, so
+    "drag" finds "Huge Dragon" as well as "Dragon Egg". A prefix is a bisect
+    range over the sorted keys; matches are returned best value first.
+    """
+
+    def __init__(self, items: Dict[str, Dict]):
+        self.item_keys: Dict[str, Tuple[str, ...]] = {}
+        pairs = []
+        for item_id, item in items.items():
+            words = [w for w in WORD_SPLIT.split(item.get('name', '')) if w]
+            keys = tuple(dict.fromkeys(normalize(''.join(words[i:])) for i in range(len(words))))
+            self.item_keys[item_id] = keys
+            pairs.extend((key, item_id) for key in keys if key)
+        pairs.sort()
+        self._keys = [p[0] for p in pairs]
+        self._owners = [p[1] for p in pairs]
+        self.by_value = sorted(items, key=lambda i: -float(items[i].get('value') or 0))
+        self._rank = {item_id: rank for rank, item_id in enumerate(self.by_value)}
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        return bisect_left(self._keys, prefix), bisect_left(self._keys, _prefix_end(prefix))
+
+    def matches_key(self, item_id: str, prefix: str) -> bool:
+        return any(key.startswith(prefix) for key in self.item_keys.get(item_id, ()))
+
+    def matches(self, prefix: str) -> List[str]:
+        """Every matching item_id, best value first."""
+        if not prefix:
+            return list(self.by_value)
+        lo, hi = self._range(prefix)
+        return sorted(set(self._owners[lo:hi]), key=self._rank.__getitem__)
+
+    def top(self, prefix: str, limit: int = 25) -> Tuple[List[str], bool]:
+        """Matches best value first, and whether that is the complete set.
+
+        Sparse prefixes return every match so callers can narrow them later;
+        dense ones stop after the best `limit`.
+        """
+        if not prefix:
+            return self.by_value[:limit], len(self.by_value) <= limit
+        lo, hi = self._range(prefix)
+        # Walking items in value order finds `limit` hits after roughly
+        # limit * N / matches checks; sorting the range costs about matches.
+        # Walk only when the range is dense enough for that to be shorter.
+        if (hi - lo) ** 2 <= limit * len(self.by_value):
+            return self.matches(prefix), True
+        found = []
+        for item_id in self.by_value:
+            if self.matches_key(item_id, prefix):
+                found.append(item_id)
+                if len(found) == limit:
+                    break
+        return found, False
+
+
+class AutocompleteEngine:
+    """Item autocomplete for slash-command options.
+
+    Keeps the last full match set per user so that typing "dr", "dra",
+    "drag" filters the previous matches instead of searching again. Falls
+    back to fuzzy matching when a prefix has no hits, so typos still
+    produce suggestions.
+    """
+
+    def __init__(self, session_ttl: int = 60, max_sessions: int = 1000):
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict = OrderedDict()
+        self._stats: Dict[str, int] = {'queries': 0, 'narrowed': 0, 'indexed': 0, 'fuzzy': 0}
+
+    def _session(self, user_id: int, game: str, prefix: str, version: int) -> Optional[List[str]]:
+        session = self._sessions.get(user_id)
+        if not session:
+            return None
+        s_game, s_prefix, s_version, s_ids, expires = session
+        if expires < time.monotonic() or s_game != game or s_version != version:
+            del self._sessions[user_id]
+            return None
+        if not prefix.startswith(s_prefix):
+            return None
+        return s_ids
+
+    def _remember(self, user_id: int, game: str, prefix: str, version: int, ids: List[str]) -> None:
+        self._sessions[user_id] = (game, prefix, version, ids, time.monotonic() + self.session_ttl)
+        self._sessions.move_to_end(user_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def complete(self, game: str, query: str, user_id: Optional[int] = None, limit: int = 25) -> List[Dict]:
+        catalog = await item_catalog.get(game)
+        if not catalog.items:
+            return []
+        self._stats['queries'] += 1
+        index = catalog.prefix
+        prefix = normalize(query)
+
+        previous = self._session(user_id, game, prefix, catalog.version) if user_id is not None else None
+        if previous is not None:
+            ids = [i for i in previous if index.matches_key(i, prefix)]
+            complete = True
+            self._stats['narrowed'] += 1
+        else:
+            ids, complete = index.top(prefix, limit)
+            self._stats['indexed'] += 1
+
+        if user_id is not None and prefix:
+            if complete:
+                self._remember(user_id, game, prefix, catalog.version, ids)
+            else:
+                self._sessions.pop(user_id, None)
+
+        if not ids and prefix:
+            self._stats['fuzzy'] += 1
+            ids = [item_id for item_id, _ in catalog.fuzzy.find_matches(query, limit=limit)]
+
+        return [catalog.items[item_id] for item_id in ids[:limit] if item_id in catalog.items]
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(self._stats)
+        result['sessions'] = len(self._sessions)
+        return result
+
+
+item_autocomplete = AutocompleteEngine()
@@ -0,0 +1,101 @@
+from typing import Dict, Any, Set, Tuple
+import logging
+import sys
+import time
+
+from utils.db_pool import db_pool
+from utils.cache import SingleFlight, register_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _pair(user_id: int, blocked_id: int) -> int:
+    # Discord snowflakes fit in 64 bits, so one int per pair is enough and is
+    # roughly half the size of a (user_id, blocked_id) tuple.
+    return (user_id << 64) | blocked_id
+
+
+class BlockIndex:
+    """In-memory copy of blocked_traders for O(1) trade gating.
+
+    The whole table is loaded on first check and kept current by
+    block_trader/unblock_trader in utils.database_v2, which call add/discard
+    after their write commits.
+    """
+
+    def __init__(self):
+        self._pairs: Set[int] = set()
+        # Sum of getsizeof over the pair ints, kept in step by add/discard so
+        # stats() stays O(1).
+        self._pair_bytes = 0
+        self._loaded = False
+        self._flight = SingleFlight()
+        # Bumped on every add/discard so a load that raced a write is redone.
+        self._generation = 0
+        self._stats: Dict[str, Any] = {'checks': 0, 'loads': 0, 'last_load_ms': 0.0}
+
+    async def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            await self._flight.do('load', self._load)
+
+    async def _load(self) -> None:
+        while True:
+            generation = self._generation
+            started = time.perf_counter()
+            pairs: Set[int] = set()
+            pair_bytes = 0
+            async with db_pool.reader() as db:
+                async with db.execute('SELECT user_id, blocked_id FROM blocked_traders') as cursor:
+                    for row in await cursor.fetchall():
+                        pair = _pair(row[0], row[1])
+                        if pair not in pairs:
+                            pairs.add(pair)
+                            pair_bytes += sys.getsizeof(pair)
+            self._stats['loads'] += 1
+            self._stats['last_load_ms'] = (time.perf_counter() - started) * 1000
+            if generation == self._generation:
+                self._pairs = pairs
+                self._pair_bytes = pair_bytes
+                self._loaded = True
+                logger.debug(f"Block index loaded {len(pairs)} relationships in {self._stats['last_load_ms']:.1f}ms")
+                return
+
+    async def check(self, user_id: int, other_id: int) -> Tuple[bool, bool]:
+        """Return (other_id blocked user_id, user_id blocked other_id)."""
+        await self._ensure_loaded()
+        self._stats['checks'] += 1
+        pairs = self._pairs
+        return _pair(other_id, user_id) in pairs, _pair(user_id, other_id) in pairs
+
+    async def is_blocked(self, user_id: int, blocked_id: int) -> bool:
+        await self._ensure_loaded()
+        self._stats['checks'] += 1
+        return _pair(user_id, blocked_id) in self._pairs
+
+    def add(self, user_id: int, blocked_id: int) -> None:
+        self._generation += 1
+        pair = _pair(user_id, blocked_id)
+        if self._loaded and pair not in self._pairs:
+            self._pairs.add(pair)
+            self._pair_bytes += sys.getsizeof(pair)
+
+    def discard(self, user_id: int, blocked_id: int) -> None:
+        self._generation += 1
+        pair = _pair(user_id, blocked_id)
+        if self._loaded and pair in self._pairs:
+            self._pairs.remove(pair)
+            self._pair_bytes -= sys.getsizeof(pair)
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._pairs) + self._pair_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        result = dict(self._stats)
+        result['hits'] = self._stats['checks']
+        result['entries'] = len(self._pairs)
+        result['bytes'] = self.memory_bytes()
+        return result
+
+
+block_index = BlockIndex()
+register_cache('block_index', block_index.stats)
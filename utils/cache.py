@@ -1,96 +1,323 @@
-from typing import Any, Optional, Dict
-from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Hashable, Optional, Dict, List, Tuple
+from collections import OrderedDict
 import hashlib
+import heapq
 import json
 import asyncio
+import logging
+import sys
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any, depth: int = 3) -> int:
+    """Rough in-memory size of a cached value, following containers a few levels."""
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k, depth - 1) + estimate_size(v, depth - 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for v in value:
+            size += estimate_size(v, depth - 1)
+    return size
+
+
+_caches: 'weakref.WeakSet[Cache]' = weakref.WeakSet()
+_metric_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+# Counters every registered source reports, in table order.
+METRIC_FIELDS = ('hits', 'misses', 'evictions', 'entries', 'bytes', 'loads', 'load_ms_avg', 'load_ms_max')
+
+
+def register_cache(name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+    """Register a cache's stats() under name for /owner status and /metrics."""
+    _metric_sources[name] = stats
+
+
+def cache_metrics() -> Dict[str, Dict[str, Any]]:
+    result: Dict[str, Dict[str, Any]] = {}
+    for name, stats in list(_metric_sources.items()):
+        try:
+            snapshot = stats()
+        except Exception as e:
+            logger.warning(f"Cache metrics for {name} failed: {e}")
+            continue
+        result[name] = {field: snapshot.get(field, 0) for field in METRIC_FIELDS}
+    return result
+
+
+def export_cache_metrics() -> str:
+    """Render cache_metrics() in the Prometheus text exposition format."""
+    metrics = cache_metrics()
+    lines: List[str] = []
+    for field in METRIC_FIELDS:
+        counter = field in ('hits', 'misses', 'evictions', 'loads')
+        metric = f"cache_{field}_total" if counter else f"cache_{field}"
+        lines.append(f"# TYPE {metric} {'counter' if counter else 'gauge'}")
+        for name, values in metrics.items():
+            lines.append(f'{metric}{{cache="{name}"}} {values[field]}')
+    return "\n".join(lines) + "\n"
+
+
+class SingleFlight:
+    """Coalesce concurrent loads of the same key into one in-flight task.
+
+    The first caller for a key starts the loader as a task; callers that
+    arrive while it runs await the same task. Callers are shielded, so one
+    of them being cancelled does not cancel the shared load.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.loads = 0
+        self.coalesced = 0
+        self.load_ms_total = 0.0
+        self.load_ms_max = 0.0
+
+    def _start(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.ensure_future(loader())
+        self._calls[key] = task
+        self.loads += 1
+        started = time.perf_counter()
+        task.add_done_callback(lambda t, key=key: self._forget(key, t, started))
+        return task
+
+    def _forget(self, key: Hashable, task: asyncio.Task, started: float) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.load_ms_total += elapsed_ms
+        self.load_ms_max = max(self.load_ms_max, elapsed_ms)
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = self._start(key, loader)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        """Start a background load for key unless one is already running."""
+        if key in self._calls:
+            return
+        self._start(key, loader).add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background refresh failed: {task.exception()}")
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'loads': self.loads,
+            'coalesced': self.coalesced,
+            'load_ms_avg': self.load_ms_total / self.loads if self.loads else 0.0,
+            'load_ms_max': self.load_ms_max,
+        }
+
 
 class Cache:
-    def __init__(self, default_ttl: int = 1800):
-        self._cache: Dict[str, Any] = {}
-        self._expiry: Dict[str, datetime] = {}
-        self._default_ttl = timedelta(seconds=default_ttl)
-        self._lock = asyncio.Lock()
-    
+    """Bounded LRU cache with monotonic-clock TTLs.
+
+    Entries are evicted least recently used first once either max_entries or
+    max_bytes is exceeded. Expired entries are dropped on read and by a
+    background sweeper that pops an expiry heap, so keys that are never read
+    again do not linger. All operations run on the event loop without
+    awaiting, so reads need no lock.
+    """
+
+    def __init__(self, default_ttl: int = 1800, max_entries: int = 10000,
+                 max_bytes: int = 16 * 1024 * 1024, sweep_interval: int = 30,
+                 name: Optional[str] = None):
+        self._cache: OrderedDict = OrderedDict()
+        self._default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._bytes = 0
+        self._heap: List[Tuple[float, str]] = []
+        self._sweeper: Optional[asyncio.Task] = None
+        self._stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'expirations': 0,
+                                       'stale_hits': 0}
+        self._flight = SingleFlight()
+        _caches.add(self)
+        if name:
+            register_cache(name, self.stats)
+
     def _generate_key(self, *args, **kwargs) -> str:
         key_data = json.dumps({'args': args, 'kwargs': kwargs}, sort_keys=True, default=str)
         return hashlib.sha256(key_data.encode()).hexdigest()[:16]
-    
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._cache.pop(key)
+        self._bytes -= size
+        self._on_remove(key)
+
+    def _on_remove(self, key: str) -> None:
+        pass
+
     async def get(self, key: str) -> Optional[Any]:
-        async with self._lock:
-            if key in self._cache:
-                if datetime.now() < self._expiry.get(key, datetime.min):
-                    return self._cache[key]
-                else:
-                    del self._cache[key]
-                    if key in self._expiry:
-                        del self._expiry[key]
+        entry = self._cache.get(key)
+        if entry is None:
+            self._stats['misses'] += 1
+            return None
+        if entry[1] <= time.monotonic():
+            self._remove(key)
+            self._stats['expirations'] += 1
+            self._stats['misses'] += 1
             return None
-    
+        self._cache.move_to_end(key)
+        self._stats['hits'] += 1
+        return entry[0]
+
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        async with self._lock:
-            self._cache[key] = value
-            expiry_time = timedelta(seconds=ttl) if ttl else self._default_ttl
-            self._expiry[key] = datetime.now() + expiry_time
-    
+        expires = time.monotonic() + (ttl if ttl else self._default_ttl)
+        size = estimate_size(key) + estimate_size(value)
+        if key in self._cache:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        self._cache[key] = (value, expires, size)
+        self._bytes += size
+        self._stats['sets'] += 1
+        heapq.heappush(self._heap, (expires, key))
+        while len(self._cache) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._cache))
+            self._remove(oldest)
+            self._stats['evictions'] += 1
+        self._ensure_sweeper()
+
     async def delete(self, key: str) -> bool:
-        async with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                if key in self._expiry:
-                    del self._expiry[key]
-                return True
-            return False
-    
+        if key in self._cache:
+            self._remove(key)
+            return True
+        return False
+
     async def clear(self) -> None:
-        async with self._lock:
-            self._cache.clear()
-            self._expiry.clear()
-    
+        for key in list(self._cache):
+            self._remove(key)
+        self._heap.clear()
+
     async def cleanup_expired(self) -> int:
-        async with self._lock:
-            now = datetime.now()
-            expired = [k for k, v in self._expiry.items() if v < now]
-            for key in expired:
-                del self._cache[key]
-                del self._expiry[key]
-            return len(expired)
-    
-    def cached(self, ttl: Optional[int] = None):
+        now = time.monotonic()
+        heap = self._heap
+        expired = 0
+        while heap and heap[0][0] <= now:
+            expires, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            # Heap entries go stale when a key is re-set or removed early;
+            # only drop the key if this is still its current expiry.
+            if entry is not None and entry[1] == expires:
+                self._remove(key)
+                expired += 1
+        if len(heap) > 2 * len(self._cache) + 1024:
+            heap[:] = [(entry[1], key) for key, entry in self._cache.items()]
+            heapq.heapify(heap)
+        self._stats['expirations'] += expired
+        return expired
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            try:
+                self._sweeper = asyncio.get_running_loop().create_task(self._sweep_loop())
+            except RuntimeError:
+                pass
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.cleanup_expired()
+
+    async def close(self) -> None:
+        task = self._sweeper
+        self._sweeper = None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def cached(self, ttl: Optional[int] = None, stale_ttl: Optional[int] = None):
+        """Memoize an async function; concurrent misses share one call.
+
+        With stale_ttl set, a value older than ttl is still served for up to
+        stale_ttl more seconds while a single background call refreshes it.
+        """
+        fresh_ttl = ttl if ttl else self._default_ttl
+
         def decorator(func):
+            async def load(key: str, args, kwargs):
+                result = await func(*args, **kwargs)
+                if stale_ttl and result is not None:
+                    await self.set(key, (result, time.monotonic() + fresh_ttl), fresh_ttl + stale_ttl)
+                else:
+                    await self.set(key, result, ttl)
+                return result
+
             async def wrapper(*args, **kwargs):
                 key = f"{func.__name__}:{self._generate_key(*args, **kwargs)}"
                 cached_value = await self.get(key)
                 if cached_value is not None:
-                    return cached_value
-                result = await func(*args, **kwargs)
-                await self.set(key, result, ttl)
-                return result
+                    if not stale_ttl:
+                        return cached_value
+                    value, fresh_until = cached_value
+                    if fresh_until <= time.monotonic():
+                        self._stats['stale_hits'] += 1
+                        self._flight.refresh(key, lambda: load(key, args, kwargs))
+                    return value
+                return await self._flight.do(key, lambda: load(key, args, kwargs))
             return wrapper
         return decorator
-    
+
     @property
     def size(self) -> int:
         return len(self._cache)
 
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(self._stats)
+        result['entries'] = len(self._cache)
+        result['bytes'] = self._bytes
+        result['max_entries'] = self.max_entries
+        result['max_bytes'] = self.max_bytes
+        result.update(self._flight.stats())
+        return result
+
 
 class IconCache(Cache):
-    def __init__(self):
-        super().__init__(default_ttl=604800)
+    def __init__(self, name: Optional[str] = None):
+        super().__init__(default_ttl=604800, max_entries=20000, max_bytes=8 * 1024 * 1024, name=name)
         self._hash_map: Dict[str, str] = {}
-    
+
+    def _on_remove(self, key: str) -> None:
+        self._hash_map.pop(key, None)
+
     def _generate_icon_hash(self, url: str) -> str:
         return hashlib.sha256(url.encode()).hexdigest()[:16]
-    
+
     async def get_icon(self, item_id: str, game: str) -> Optional[str]:
         key = f"icon:{game}:{item_id}"
         return await self.get(key)
-    
+
     async def set_icon(self, item_id: str, game: str, url: str) -> None:
         key = f"icon:{game}:{item_id}"
         icon_hash = self._generate_icon_hash(url)
-        self._hash_map[key] = icon_hash
         await self.set(key, url)
-    
+        if key in self._cache:
+            self._hash_map[key] = icon_hash
+
     async def verify_icon(self, item_id: str, game: str, url: str) -> bool:
         key = f"icon:{game}:{item_id}"
         stored_hash = self._hash_map.get(key)
@@ -99,6 +326,11 @@ class IconCache(Cache):
         return stored_hash == self._generate_icon_hash(url)
 
 
-item_cache = Cache(default_ttl=1800)
-icon_cache = IconCache()
-user_cache = Cache(default_ttl=300)
+async def close_caches() -> None:
+    for cache in list(_caches):
+        await cache.close()
+
+
+item_cache = Cache(default_ttl=1800, max_entries=10000, name='item_cache')
+icon_cache = IconCache(name='icon_cache')
+user_cache = Cache(default_ttl=300, max_entries=10000, name='user_cache')
@@ -0,0 +1,192 @@
+from typing import Optional, List, Dict, Any, Iterable
+import asyncio
+import itertools
+import logging
+import time
+
+from utils.cache import estimate_size, register_cache
+from utils.db_pool import db_pool
+from utils.fuzzy import FuzzyIndex
+
+logger = logging.getLogger(__name__)
+
+# Shared across catalogs so a reloaded game never reuses an old version.
+_versions = itertools.count(1)
+
+
+def normalize(text: str) -> str:
+    return text.lower().replace(' ', '').replace('-', '').replace('_', '').replace("'", '')
+
+
+class GameCatalog:
+    """All items of one game, indexed for O(1) exact lookups."""
+
+    def __init__(self, game: str):
+        self.game = game
+        self.items: Dict[str, Dict] = {}
+        self.by_name: Dict[str, str] = {}
+        self.by_id: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = {}
+        self.loaded_at = 0.0
+        # Approximate size of the item rows, kept in step by put/remove.
+        self.bytes = 0
+        self.version = next(_versions)
+        self._fuzzy: Optional[FuzzyIndex] = None
+        self._prefix = None
+
+    @property
+    def fuzzy(self) -> FuzzyIndex:
+        # Built on first fuzzy query, then kept in step by put/remove.
+        if self._fuzzy is None:
+            index = FuzzyIndex(normalize)
+            for item_id, item in self.items.items():
+                index.add(item_id, item.get('name', ''))
+            self._fuzzy = index
+        return self._fuzzy
+
+    @property
+    def prefix(self):
+        # Sorted arrays cannot be patched cheaply; rebuilt on next use instead.
+        if self._prefix is None:
+            from utils.autocomplete import PrefixIndex
+            self._prefix = PrefixIndex(self.items)
+        return self._prefix
+
+    def put(self, item: Dict) -> None:
+        item_id = item['item_id']
+        old = self.items.get(item_id)
+        if old:
+            self._unindex(old)
+            self.bytes -= estimate_size(old)
+        self.items[item_id] = item
+        self.bytes += estimate_size(item)
+        self.by_name[normalize(item.get('normalized_name') or item.get('name', ''))] = item_id
+        self.by_id[item_id.lower()] = item_id
+        self.version = next(_versions)
+        self._prefix = None
+        if self._fuzzy is not None:
+            self._fuzzy.add(item_id, item.get('name', ''))
+
+    def remove(self, item_id: str) -> None:
+        old = self.items.pop(item_id, None)
+        if old:
+            self._unindex(old)
+            self.bytes -= estimate_size(old)
+        self.version = next(_versions)
+        self._prefix = None
+        if self._fuzzy is not None:
+            self._fuzzy.remove(item_id)
+
+    def _unindex(self, item: Dict) -> None:
+        key = normalize(item.get('normalized_name') or item.get('name', ''))
+        if self.by_name.get(key) == item['item_id']:
+            del self.by_name[key]
+        self.by_id.pop(item['item_id'].lower(), None)
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Find an item by normalized name, item_id or alias."""
+        item_id = self.by_name.get(key) or self.by_id.get(key) or self.aliases.get(key)
+        return self.items.get(item_id) if item_id else None
+
+
+class ItemCatalog:
+    """Per-game in-memory copy of the items table.
+
+    Each game is read from the database once, then kept current by the item
+    write helpers in utils.database: single-item writes patch the catalog in
+    place and bulk imports drop the game so it is reloaded on next use.
+    """
+
+    def __init__(self):
+        self._games: Dict[str, GameCatalog] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Bumped on every patch/invalidation so a load that raced a write
+        # knows its snapshot is stale.
+        self._generation: Dict[str, int] = {}
+        self._stats: Dict[str, Any] = {
+            'hits': 0, 'misses': 0, 'evictions': 0, 'loads': 0, 'patches': 0, 'invalidations': 0,
+            'last_load_ms': 0.0, 'load_ms_total': 0.0, 'load_ms_max': 0.0,
+        }
+
+    async def get(self, game: str) -> GameCatalog:
+        catalog = self._games.get(game)
+        if catalog is not None:
+            self._stats['hits'] += 1
+            return catalog
+        self._stats['misses'] += 1
+        lock = self._locks.setdefault(game, asyncio.Lock())
+        async with lock:
+            catalog = self._games.get(game)
+            while catalog is None:
+                generation = self._generation.get(game, 0)
+                loaded = await self._load(game)
+                if self._generation.get(game, 0) == generation:
+                    self._games[game] = catalog = loaded
+            return catalog
+
+    async def _load(self, game: str) -> GameCatalog:
+        started = time.perf_counter()
+        catalog = GameCatalog(game)
+        async with db_pool.reader() as db:
+            # Ascending value so that when two items normalize to the same name,
+            # the more valuable one ends up owning the name, as resolve_item did.
+            async with db.execute('SELECT * FROM items WHERE game = ? ORDER BY value', (game,)) as cursor:
+                for row in await cursor.fetchall():
+                    catalog.put(dict(row))
+            async with db.execute('SELECT alias, item_id FROM item_aliases WHERE game = ?', (game,)) as cursor:
+                for row in await cursor.fetchall():
+                    catalog.aliases[normalize(row['alias'])] = row['item_id']
+        catalog.loaded_at = time.time()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._stats['loads'] += 1
+        self._stats['last_load_ms'] = elapsed_ms
+        self._stats['load_ms_total'] += elapsed_ms
+        self._stats['load_ms_max'] = max(self._stats['load_ms_max'], elapsed_ms)
+        logger.debug(f"Loaded {len(catalog.items)} {game} items into catalog in {self._stats['last_load_ms']:.1f}ms")
+        return catalog
+
+    async def load_all(self) -> int:
+        async with db_pool.reader() as db:
+            async with db.execute('SELECT DISTINCT game FROM items') as cursor:
+                games = [row[0] for row in await cursor.fetchall()]
+        total = 0
+        for game in games:
+            total += len((await self.get(game)).items)
+        return total
+
+    async def lookup(self, game: str, key: str) -> Optional[Dict]:
+        return (await self.get(game)).lookup(normalize(key))
+
+    async def all_items(self, game: str) -> List[Dict]:
+        return list((await self.get(game)).items.values())
+
+    def patch(self, game: str, item: Optional[Dict], item_id: Optional[str] = None) -> None:
+        """Apply a committed single-item write. item=None means it was deleted."""
+        self._generation[game] = self._generation.get(game, 0) + 1
+        catalog = self._games.get(game)
+        if catalog is None:
+            return
+        if item is None:
+            catalog.remove(item_id)
+        else:
+            catalog.put(item)
+        self._stats['patches'] += 1
+
+    def invalidate(self, games: Optional[Iterable[str]] = None) -> None:
+        for game in list(games) if games is not None else list(self._games):
+            self._generation[game] = self._generation.get(game, 0) + 1
+            if self._games.pop(game, None) is not None:
+                self._stats['evictions'] += 1
+        self._stats['invalidations'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        result = dict(self._stats)
+        result['games'] = {game: len(catalog.items) for game, catalog in self._games.items()}
+        result['entries'] = sum(result['games'].values())
+        result['bytes'] = sum(catalog.bytes for catalog in self._games.values())
+        result['load_ms_avg'] = self._stats['load_ms_total'] / self._stats['loads'] if self._stats['loads'] else 0.0
+        return result
+
+
+item_catalog = ItemCatalog()
+register_cache('item_catalog', item_catalog.stats)
@@ -1,260 +1,69 @@
-import aiosqlite
 import os
+import time
+import logging
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+from utils.db_pool import db_pool
+from utils.write_behind import write_behind
+from utils.catalog import item_catalog
+from utils.cache import user_cache
+from utils.guild_config import guild_config
+from utils.migrations import run_migrations, LATEST_VERSION
+
+logger = logging.getLogger(__name__)
 
 DATABASE_PATH = "data/trading_bot.db"
 
 async def init_database():
-    os.makedirs("data", exist_ok=True)
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                discord_id INTEGER PRIMARY KEY,
-                roblox_username TEXT,
-                roblox_id INTEGER,
-                roblox_account_age INTEGER,
-                discord_account_created TEXT,
-                trust_score REAL DEFAULT 50.0,
-                trust_tier TEXT DEFAULT 'Bronze',
-                reliability REAL DEFAULT 50.0,
-                fairness REAL DEFAULT 50.0,
-                responsiveness REAL DEFAULT 50.0,
-                proof_compliance REAL DEFAULT 50.0,
-                total_trades INTEGER DEFAULT 0,
-                successful_trades INTEGER DEFAULT 0,
-                disputed_trades INTEGER DEFAULT 0,
-                cancelled_trades INTEGER DEFAULT 0,
-                total_value_traded REAL DEFAULT 0.0,
-                is_banned INTEGER DEFAULT 0,
-                ban_reason TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                game TEXT NOT NULL,
-                item_id TEXT NOT NULL,
-                name TEXT NOT NULL,
-                normalized_name TEXT NOT NULL,
-                rarity TEXT,
-                icon_url TEXT,
-                value REAL,
-                tradeable INTEGER DEFAULT 1,
-                source TEXT,
-                metadata TEXT,
-                last_verified TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(game, item_id)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS item_aliases (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                game TEXT NOT NULL,
-                item_id TEXT NOT NULL,
-                alias TEXT NOT NULL,
-                UNIQUE(game, alias)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                trade_hash TEXT UNIQUE,
-                requester_id INTEGER NOT NULL,
-                target_id INTEGER,
-                game TEXT NOT NULL,
-                status TEXT DEFAULT 'draft',
-                risk_level TEXT DEFAULT 'unknown',
-                requester_items TEXT,
-                target_items TEXT,
-                offering_gems INTEGER DEFAULT 0,
-                requesting_gems INTEGER DEFAULT 0,
-                requester_confirmed INTEGER DEFAULT 0,
-                target_confirmed INTEGER DEFAULT 0,
-                proof_url TEXT,
-                receipt_hash TEXT,
-                moderator_notes TEXT,
-                notes TEXT,
-                counter_offer_data TEXT,
-                expires_at TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                completed_at TEXT,
-                archived_at TEXT
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS trade_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                trade_id INTEGER NOT NULL,
-                action TEXT NOT NULL,
-                actor_id INTEGER NOT NULL,
-                details TEXT,
-                timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (trade_id) REFERENCES trades(id)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS inventories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                game TEXT NOT NULL,
-                item_id TEXT NOT NULL,
-                quantity INTEGER DEFAULT 1,
-                for_trade INTEGER DEFAULT 0,
-                wishlist INTEGER DEFAULT 0,
-                added_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, game, item_id)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS reports (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                reporter_id INTEGER NOT NULL,
-                reported_id INTEGER NOT NULL,
-                trade_id INTEGER,
-                reason TEXT NOT NULL,
-                evidence TEXT,
-                status TEXT DEFAULT 'pending',
-                moderator_id INTEGER,
-                resolution TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                resolved_at TEXT
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS scam_patterns (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                pattern_type TEXT NOT NULL,
-                occurrences INTEGER DEFAULT 1,
-                last_occurrence TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, pattern_type)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS audit_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                action TEXT NOT NULL,
-                actor_id INTEGER,
-                target_id INTEGER,
-                details TEXT,
-                timestamp TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS auctions (
-                id TEXT PRIMARY KEY,
-                seller_id INTEGER NOT NULL,
-                game TEXT NOT NULL,
-                item_data TEXT NOT NULL,
-                starting_bid INTEGER NOT NULL,
-                current_bid INTEGER DEFAULT 0,
-                current_bidder INTEGER,
-                status TEXT DEFAULT 'active',
-                channel_id INTEGER,
-                message_id INTEGER,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                ends_at TEXT NOT NULL
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS auction_bids (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                auction_id TEXT NOT NULL,
-                user_id INTEGER NOT NULL,
-                amount INTEGER NOT NULL,
-                timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (auction_id) REFERENCES auctions(id)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS game_sources (
-                game TEXT PRIMARY KEY,
-                values_url TEXT NOT NULL,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                updated_by INTEGER
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS guild_settings (
-                guild_id INTEGER PRIMARY KEY,
-                trade_channel_id INTEGER,
-                log_channel_id INTEGER,
-                mod_role_id INTEGER,
-                trade_feed_channel_id INTEGER,
-                announcement_enabled INTEGER DEFAULT 1,
-                trade_feed_enabled INTEGER DEFAULT 1,
-                auto_delete_expired INTEGER DEFAULT 1,
-                require_verification INTEGER DEFAULT 0,
-                min_trust_score REAL DEFAULT 0.0,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS game_trade_channels (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER NOT NULL,
-                game TEXT NOT NULL,
-                channel_id INTEGER NOT NULL,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(guild_id, game)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS trade_tickets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                trade_id INTEGER NOT NULL UNIQUE,
-                thread_id INTEGER NOT NULL,
-                channel_id INTEGER NOT NULL,
-                guild_id INTEGER NOT NULL,
-                requester_id INTEGER NOT NULL,
-                target_id INTEGER NOT NULL,
-                status TEXT DEFAULT 'open',
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                closed_at TEXT,
-                FOREIGN KEY (trade_id) REFERENCES trades(id)
-            )
-        ''')
-        
-        await db.execute('CREATE INDEX IF NOT EXISTS idx_game_trade_channels ON game_trade_channels(guild_id, game)')
-        await db.execute('CREATE INDEX IF NOT EXISTS idx_items_game ON items(game)')
-        await db.execute('CREATE INDEX IF NOT EXISTS idx_items_normalized ON items(normalized_name)')
-        await db.execute('CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status)')
-        await db.execute('CREATE INDEX IF NOT EXISTS idx_trades_users ON trades(requester_id, target_id)')
-        await db.execute('CREATE INDEX IF NOT EXISTS idx_inventories_user ON inventories(user_id)')
-        await db.execute('CREATE INDEX IF NOT EXISTS idx_trade_tickets ON trade_tickets(trade_id)')
-        
-        await db.commit()
-
-async def get_db():
-    return await aiosqlite.connect(DATABASE_PATH)
+    started = time.perf_counter()
+    await db_pool.open(DATABASE_PATH)
+    async with db_pool.writer() as db:
+        applied = await run_migrations(db)
+    db_pool.start_maintenance()
+    boot_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"Database ready: schema v{LATEST_VERSION}, {len(applied)} migration(s) applied in {boot_ms:.1f}ms")
+
+async def close_database() -> None:
+    await write_behind.close()
+    await db_pool.close()
+
+# Bumped on every users write. A read only fills user_cache if no write
+# landed while it was in flight, so it cannot overwrite a newer row.
+_user_writes = 0
+
+def _user_key(discord_id: int) -> str:
+    return f"user:{discord_id}"
+
+async def _write_through_user(discord_id: int, row: Optional[Dict] = None, **fields) -> None:
+    global _user_writes
+    _user_writes += 1
+    key = _user_key(discord_id)
+    if row is None:
+        row = await user_cache.get(key)
+        if row is None:
+            return
+    await user_cache.set(key, {**row, **fields})
 
 async def get_user(discord_id: int) -> Optional[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    """Read-through: served from user_cache, loaded from SQLite on a miss."""
+    key = _user_key(discord_id)
+    cached = await user_cache.get(key)
+    if cached is not None:
+        return dict(cached)
+    writes = _user_writes
+    async with db_pool.reader() as db:
         async with db.execute('SELECT * FROM users WHERE discord_id = ?', (discord_id,)) as cursor:
             row = await cursor.fetchone()
-            return dict(row) if row else None
+    if not row:
+        return None
+    user = dict(row)
+    if writes == _user_writes:
+        await user_cache.set(key, user)
+    return dict(user)
 
 async def create_user(discord_id: int, discord_created: str) -> Optional[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         await db.execute('''
             INSERT OR IGNORE INTO users (discord_id, discord_account_created)
             VALUES (?, ?)
@@ -267,19 +76,19 @@ async def update_user(discord_id: int, **kwargs) -> None:
         return
     fields = ', '.join(f'{k} = ?' for k in kwargs.keys())
     values = list(kwargs.values()) + [discord_id]
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         await db.execute(f'UPDATE users SET {fields}, updated_at = CURRENT_TIMESTAMP WHERE discord_id = ?', values)
         await db.commit()
+    await _write_through_user(discord_id, updated_at=datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'), **kwargs)
 
 async def get_trade(trade_id: int) -> Optional[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         async with db.execute('SELECT * FROM trades WHERE id = ?', (trade_id,)) as cursor:
             row = await cursor.fetchone()
             return dict(row) if row else None
 
 async def create_trade(requester_id: int, game: str, requester_items: str, target_items: Optional[str] = None) -> Optional[int]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         cursor = await db.execute('''
             INSERT INTO trades (requester_id, game, requester_items, target_items, status)
             VALUES (?, ?, ?, ?, 'draft')
@@ -292,34 +101,133 @@ async def update_trade(trade_id: int, **kwargs) -> None:
         return
     fields = ', '.join(f'{k} = ?' for k in kwargs.keys())
     values = list(kwargs.values()) + [trade_id]
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         await db.execute(f'UPDATE trades SET {fields}, updated_at = CURRENT_TIMESTAMP WHERE id = ?', values)
         await db.commit()
 
-async def add_trade_history(trade_id: int, action: str, actor_id: int, details: Optional[str] = None) -> None:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        await db.execute('''
-            INSERT INTO trade_history (trade_id, action, actor_id, details)
-            VALUES (?, ?, ?, ?)
-        ''', (trade_id, action, actor_id, details))
+# from_status sets for transition_trade. A dispute is only possible once both
+# sides agreed; a cancel is possible from any status that is not final.
+HANDOFF_STATUSES = ('accepted', 'trust_check', 'in_game_trade')
+OPEN_TRADE_STATUSES = ('draft', 'open', 'pending', 'counter_offered') + HANDOFF_STATUSES
+
+async def transition_trade(trade_id: int, action: Optional[str] = None, actor_id: int = 0,
+                           details: Optional[str] = None, from_status: Optional[Iterable[str]] = None,
+                           reputation: Optional[Dict[int, str]] = None,
+                           audit: Optional[Tuple[str, Optional[int], Optional[int], Optional[str]]] = None,
+                           **fields) -> bool:
+    """Apply a trade state change as one unit of work.
+
+    The trade update, its history row, reputation updates (user id -> trust
+    engine event) and the audit entry are committed together, so a crash can
+    never leave a trade completed without its reputation changes. When
+    from_status is given the transition only applies if the trade is still in
+    one of those states; returns False if it was not applied.
+    """
+    from utils.trust_engine import trust_engine
+    
+    assignments = ''.join(f'{k} = ?, ' for k in fields.keys())
+    values = list(fields.values()) + [trade_id]
+    where = 'id = ?'
+    if from_status:
+        from_status = list(from_status)
+        where += f" AND status IN ({', '.join(['?'] * len(from_status))})"
+        values += from_status
+    
+    updated_users: Dict[int, Dict] = {}
+    async with db_pool.writer() as db:
+        cursor = await db.execute(f'UPDATE trades SET {assignments}updated_at = CURRENT_TIMESTAMP WHERE {where}', values)
+        if cursor.rowcount == 0:
+            await db.rollback()
+            return False
+        
+        if action:
+            await db.execute('''
+                INSERT INTO trade_history (trade_id, action, actor_id, details)
+                VALUES (?, ?, ?, ?)
+            ''', (trade_id, action, actor_id, details))
+        
+        for user_id, event in (reputation or {}).items():
+            if not user_id:
+                continue
+            async with db.execute('SELECT * FROM users WHERE discord_id = ?', (user_id,)) as cursor:
+                row = await cursor.fetchone()
+            if not row:
+                continue
+            updates = trust_engine.update_reputation(dict(row), event)
+            if updates:
+                user_fields = ', '.join(f'{k} = ?' for k in updates.keys())
+                await db.execute(
+                    f'UPDATE users SET {user_fields}, updated_at = CURRENT_TIMESTAMP WHERE discord_id = ?',
+                    list(updates.values()) + [user_id]
+                )
+                updated_users[user_id] = {**dict(row), **updates}
+        
+        if audit:
+            await db.execute('''
+                INSERT INTO audit_log (action, actor_id, target_id, details)
+                VALUES (?, ?, ?, ?)
+            ''', audit)
+        
         await db.commit()
+    
+    now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    for user_id, row in updated_users.items():
+        await _write_through_user(user_id, row, updated_at=now)
+    return True
+
+async def complete_trade(trade: Dict, actor_id: int = 0) -> Optional[str]:
+    """Complete a trade once both sides confirmed. Returns the receipt hash, or
+    None if the trade is not in a handoff status (already completed, disputed,
+    cancelled...) or was moved out of one by someone else in the meantime."""
+    from utils.trust_engine import trust_engine
+    
+    if trade['status'] not in HANDOFF_STATUSES:
+        return None
+    receipt_hash = trust_engine.generate_receipt_hash(trade)
+    applied = await transition_trade(
+        trade['id'], 'completed', actor_id,
+        from_status=HANDOFF_STATUSES,
+        reputation={
+            trade['requester_id']: 'trade_completed',
+            trade['target_id']: 'trade_completed'
+        },
+        audit=('trade_completed', trade['requester_id'], trade['target_id'], f"Trade {trade['id']}"),
+        status='completed',
+        completed_at=datetime.utcnow().isoformat(),
+        receipt_hash=receipt_hash
+    )
+    return receipt_hash if applied else None
+
+async def add_trade_history(trade_id: int, action: str, actor_id: int, details: Optional[str] = None) -> None:
+    await write_behind.put('trade_history', (trade_id, action, actor_id, details))
 
 async def get_user_trades(user_id: int, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
+        # Two index walks merged in updated_at order. An OR across both columns
+        # makes SQLite collect and sort every matching row; the second arm skips
+        # rows the first one already returned.
         if status:
-            query = 'SELECT * FROM trades WHERE (requester_id = ? OR target_id = ?) AND status = ? ORDER BY updated_at DESC LIMIT ?'
-            params = (user_id, user_id, status, limit)
+            query = '''
+                SELECT * FROM trades WHERE requester_id = ? AND status = ?
+                UNION ALL
+                SELECT * FROM trades WHERE target_id = ? AND requester_id != ? AND status = ?
+                ORDER BY updated_at DESC LIMIT ?
+            '''
+            params = (user_id, status, user_id, user_id, status, limit)
         else:
-            query = 'SELECT * FROM trades WHERE requester_id = ? OR target_id = ? ORDER BY updated_at DESC LIMIT ?'
-            params = (user_id, user_id, limit)
+            query = '''
+                SELECT * FROM trades WHERE requester_id = ?
+                UNION ALL
+                SELECT * FROM trades WHERE target_id = ? AND requester_id != ?
+                ORDER BY updated_at DESC LIMIT ?
+            '''
+            params = (user_id, user_id, user_id, limit)
         async with db.execute(query, params) as cursor:
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
 
 async def get_inventory(user_id: int, game: Optional[str] = None) -> List[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         if game:
             query = '''
                 SELECT i.*, it.name, it.rarity, it.icon_url, it.value 
@@ -341,7 +249,7 @@ async def get_inventory(user_id: int, game: Optional[str] = None) -> List[Dict]:
             return [dict(row) for row in rows]
 
 async def add_to_inventory(user_id: int, game: str, item_id: str, quantity: int = 1) -> None:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         await db.execute('''
             INSERT INTO inventories (user_id, game, item_id, quantity)
             VALUES (?, ?, ?, ?)
@@ -350,7 +258,7 @@ async def add_to_inventory(user_id: int, game: str, item_id: str, quantity: int
         await db.commit()
 
 async def remove_from_inventory(user_id: int, game: str, item_id: str, quantity: int = 1) -> bool:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         async with db.execute(
             'SELECT quantity FROM inventories WHERE user_id = ? AND game = ? AND item_id = ?',
             (user_id, game, item_id)
@@ -373,15 +281,10 @@ async def remove_from_inventory(user_id: int, game: str, item_id: str, quantity:
         return True
 
 async def log_audit(action: str, actor_id: Optional[int] = None, target_id: Optional[int] = None, details: Optional[str] = None) -> None:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        await db.execute('''
-            INSERT INTO audit_log (action, actor_id, target_id, details)
-            VALUES (?, ?, ?, ?)
-        ''', (action, actor_id, target_id, details))
-        await db.commit()
+    await write_behind.put('audit_log', (action, actor_id, target_id, details))
 
 async def record_scam_pattern(user_id: int, pattern_type: str) -> int:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         await db.execute('''
             INSERT INTO scam_patterns (user_id, pattern_type)
             VALUES (?, ?)
@@ -398,30 +301,14 @@ async def record_scam_pattern(user_id: int, pattern_type: str) -> int:
             return row[0] if row else 1
 
 async def get_item(game: str, item_id: str) -> Optional[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         async with db.execute('SELECT * FROM items WHERE game = ? AND item_id = ?', (game, item_id)) as cursor:
             row = await cursor.fetchone()
             return dict(row) if row else None
 
-async def search_items(game: str, query: str, limit: int = 20) -> List[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        normalized = query.lower().replace(' ', '').replace('-', '').replace('_', '')
-        async with db.execute('''
-            SELECT * FROM items 
-            WHERE game = ? AND (
-                normalized_name LIKE ? OR
-                name LIKE ?
-            )
-            LIMIT ?
-        ''', (game, f'%{normalized}%', f'%{query}%', limit)) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
-
 async def upsert_item(game: str, item_id: str, name: str, **kwargs) -> None:
     normalized = name.lower().replace(' ', '').replace('-', '').replace('_', '')
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         existing = await get_item(game, item_id)
         if existing:
             fields = ', '.join(f'{k} = ?' for k in kwargs.keys())
@@ -434,15 +321,16 @@ async def upsert_item(game: str, item_id: str, name: str, **kwargs) -> None:
             values = [game, item_id, name, normalized] + list(kwargs.values())
             await db.execute(f'INSERT INTO items ({", ".join(columns)}) VALUES ({placeholders})', values)
         await db.commit()
+    item_catalog.patch(game, await get_item(game, item_id))
 
 async def get_game_source(game: str) -> Optional[str]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.reader() as db:
         async with db.execute('SELECT values_url FROM game_sources WHERE game = ?', (game,)) as cursor:
             row = await cursor.fetchone()
             return row[0] if row else None
 
 async def set_game_source(game: str, values_url: str, updated_by: Optional[int] = None) -> None:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         await db.execute('''
             INSERT INTO game_sources (game, values_url, updated_by, updated_at)
             VALUES (?, ?, ?, CURRENT_TIMESTAMP)
@@ -454,26 +342,27 @@ async def set_game_source(game: str, values_url: str, updated_by: Optional[int]
         await db.commit()
 
 async def get_all_game_sources() -> Dict[str, str]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         async with db.execute('SELECT game, values_url FROM game_sources') as cursor:
             rows = await cursor.fetchall()
             return {row['game']: row['values_url'] for row in rows}
 
 
 async def delete_item(game: str, item_id: str) -> bool:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         cursor = await db.execute(
             'DELETE FROM items WHERE game = ? AND item_id = ?',
             (game, item_id)
         )
         await db.commit()
-        return cursor.rowcount > 0
+    if cursor.rowcount > 0:
+        item_catalog.patch(game, None, item_id)
+        return True
+    return False
 
 
 async def get_all_items_for_game(game: str, limit: int = 100) -> List[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         async with db.execute(
             'SELECT * FROM items WHERE game = ? ORDER BY value DESC LIMIT ?',
             (game, limit)
@@ -487,7 +376,7 @@ async def update_item_field(game: str, item_id: str, field: str, value: Any) ->
     if field not in allowed_fields:
         raise ValueError(f"Field '{field}' is not allowed to be updated")
     
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         if field == 'name':
             normalized = str(value).lower().replace(' ', '').replace('-', '').replace('_', '')
             cursor = await db.execute(
@@ -500,20 +389,21 @@ async def update_item_field(game: str, item_id: str, field: str, value: Any) ->
                 (value, game, item_id)
             )
         await db.commit()
-        return cursor.rowcount > 0
+    if cursor.rowcount > 0:
+        item_catalog.patch(game, await get_item(game, item_id))
+        return True
+    return False
 
 
 async def get_guild_settings(guild_id: int) -> Optional[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute('SELECT * FROM guild_settings WHERE guild_id = ?', (guild_id,)) as cursor:
-            row = await cursor.fetchone()
-            return dict(row) if row else None
+    settings = (await guild_config.get(guild_id)).settings
+    return dict(settings) if settings else None
 
 
 async def set_guild_settings(guild_id: int, **kwargs) -> None:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        existing = await get_guild_settings(guild_id)
+    async with db_pool.writer() as db:
+        async with db.execute('SELECT 1 FROM guild_settings WHERE guild_id = ?', (guild_id,)) as cursor:
+            existing = await cursor.fetchone()
         if existing:
             if kwargs:
                 fields = ', '.join(f'{k} = ?' for k in kwargs.keys())
@@ -525,13 +415,13 @@ async def set_guild_settings(guild_id: int, **kwargs) -> None:
             values = [guild_id] + list(kwargs.values())
             await db.execute(f'INSERT INTO guild_settings ({", ".join(columns)}) VALUES ({placeholders})', values)
         await db.commit()
+        async with db.execute('SELECT * FROM guild_settings WHERE guild_id = ?', (guild_id,)) as cursor:
+            row = await cursor.fetchone()
+    guild_config.patch_settings(guild_id, dict(row) if row else None)
 
 
 async def get_trade_channel(guild_id: int) -> Optional[int]:
-    settings = await get_guild_settings(guild_id)
-    if settings and settings.get('announcement_enabled'):
-        return settings.get('trade_channel_id')
-    return None
+    return (await guild_config.get(guild_id)).trade_channel()
 
 
 async def set_trade_channel(guild_id: int, channel_id: Optional[int]) -> None:
@@ -539,7 +429,7 @@ async def set_trade_channel(guild_id: int, channel_id: Optional[int]) -> None:
 
 
 async def set_game_trade_channel(guild_id: int, game: str, channel_id: Optional[int]) -> None:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         if channel_id:
             await db.execute('''
                 INSERT INTO game_trade_channels (guild_id, game, channel_id, updated_at)
@@ -554,32 +444,15 @@ async def set_game_trade_channel(guild_id: int, game: str, channel_id: Optional[
                 (guild_id, game)
             )
         await db.commit()
+    guild_config.patch_game_channel(guild_id, game, channel_id)
 
 
 async def get_game_trade_channel(guild_id: int, game: str) -> Optional[int]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        async with db.execute(
-            'SELECT channel_id FROM game_trade_channels WHERE guild_id = ? AND game = ?',
-            (guild_id, game)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if row:
-                return row[0]
-    settings = await get_guild_settings(guild_id)
-    if settings and settings.get('announcement_enabled'):
-        return settings.get('trade_channel_id')
-    return None
+    return (await guild_config.get(guild_id)).game_trade_channel(game)
 
 
 async def get_all_game_trade_channels(guild_id: int) -> Dict[str, int]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute(
-            'SELECT game, channel_id FROM game_trade_channels WHERE guild_id = ?',
-            (guild_id,)
-        ) as cursor:
-            rows = await cursor.fetchall()
-            return {row['game']: row['channel_id'] for row in rows}
+    return dict((await guild_config.get(guild_id)).game_channels)
 
 
 async def bulk_upsert_items(items: List[Dict], source: str = 'api') -> int:
@@ -588,7 +461,8 @@ async def bulk_upsert_items(items: List[Dict], source: str = 'api') -> int:
         return 0
     
     count = 0
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    games = set()
+    async with db_pool.writer() as db:
         for item in items:
             game = item.get('game', '')
             item_id = item.get('id', item.get('item_id', ''))
@@ -630,9 +504,13 @@ async def bulk_upsert_items(items: List[Dict], source: str = 'api') -> int:
                 metadata
             ))
             count += 1
+            games.add(game)
         
         await db.commit()
     
+    # Imports touch most of a game's rows; reloading it once on next use is
+    # cheaper than patching item by item.
+    item_catalog.invalidate(games)
     return count
 
 
@@ -678,7 +556,7 @@ async def populate_from_fallback() -> Dict[str, int]:
 
 async def get_item_count(game: Optional[str] = None) -> int:
     """Get the count of items in the database, optionally filtered by game."""
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.reader() as db:
         if game:
             async with db.execute('SELECT COUNT(*) FROM items WHERE game = ?', (game,)) as cursor:
                 row = await cursor.fetchone()
@@ -691,7 +569,7 @@ async def get_item_count(game: Optional[str] = None) -> int:
 
 async def create_trade_ticket(trade_id: int, thread_id: int, channel_id: int, guild_id: int, requester_id: int, target_id: int) -> Optional[int]:
     """Create a trade ticket record for a private thread."""
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         try:
             cursor = await db.execute('''
                 INSERT INTO trade_tickets (trade_id, thread_id, channel_id, guild_id, requester_id, target_id)
@@ -705,8 +583,7 @@ async def create_trade_ticket(trade_id: int, thread_id: int, channel_id: int, gu
 
 async def get_trade_ticket(trade_id: int) -> Optional[Dict]:
     """Get a trade ticket by trade ID."""
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         async with db.execute('SELECT * FROM trade_tickets WHERE trade_id = ?', (trade_id,)) as cursor:
             row = await cursor.fetchone()
             return dict(row) if row else None
@@ -714,8 +591,7 @@ async def get_trade_ticket(trade_id: int) -> Optional[Dict]:
 
 async def get_ticket_by_thread(thread_id: int) -> Optional[Dict]:
     """Get a trade ticket by thread ID."""
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         async with db.execute('SELECT * FROM trade_tickets WHERE thread_id = ?', (thread_id,)) as cursor:
             row = await cursor.fetchone()
             return dict(row) if row else None
@@ -723,7 +599,7 @@ async def get_ticket_by_thread(thread_id: int) -> Optional[Dict]:
 
 async def close_trade_ticket(trade_id: int) -> bool:
     """Mark a trade ticket as closed."""
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         await db.execute('''
             UPDATE trade_tickets SET status = 'closed', closed_at = CURRENT_TIMESTAMP
             WHERE trade_id = ?
@@ -1,181 +1,23 @@
-import aiosqlite
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+
+from utils.db_pool import db_pool
+from utils.guild_config import guild_config
+from utils.block_index import block_index
 
 DATABASE_PATH = "data/trading_bot.db"
 
 
 async def init_enhanced_tables():
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS wishlists (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                game TEXT NOT NULL,
-                item_id TEXT NOT NULL,
-                item_name TEXT NOT NULL,
-                priority INTEGER DEFAULT 1,
-                max_price REAL,
-                notes TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, game, item_id)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS lf_ft_posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                guild_id INTEGER NOT NULL,
-                game TEXT NOT NULL,
-                post_type TEXT NOT NULL,
-                items TEXT NOT NULL,
-                gems INTEGER DEFAULT 0,
-                notes TEXT,
-                status TEXT DEFAULT 'active',
-                message_id INTEGER,
-                channel_id INTEGER,
-                expires_at TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS trader_reviews (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                reviewer_id INTEGER NOT NULL,
-                reviewed_id INTEGER NOT NULL,
-                trade_id INTEGER,
-                rating INTEGER NOT NULL,
-                review_text TEXT,
-                review_type TEXT DEFAULT 'positive',
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(reviewer_id, trade_id)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS favorite_traders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                favorite_id INTEGER NOT NULL,
-                notes TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, favorite_id)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS blocked_traders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                blocked_id INTEGER NOT NULL,
-                reason TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, blocked_id)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS trade_templates (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                game TEXT NOT NULL,
-                offering_items TEXT,
-                requesting_items TEXT,
-                offering_gems INTEGER DEFAULT 0,
-                requesting_gems INTEGER DEFAULT 0,
-                notes TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, name)
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS trade_notifications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                trigger_type TEXT NOT NULL,
-                game TEXT,
-                item_id TEXT,
-                min_value REAL,
-                max_value REAL,
-                enabled INTEGER DEFAULT 1,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS trade_feed_settings (
-                guild_id INTEGER PRIMARY KEY,
-                feed_channel_id INTEGER,
-                show_item_images INTEGER DEFAULT 1,
-                show_values INTEGER DEFAULT 1,
-                show_trader_info INTEGER DEFAULT 1,
-                min_trade_value REAL DEFAULT 0,
-                games_filter TEXT,
-                enabled INTEGER DEFAULT 1,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS trade_stats (
-                user_id INTEGER PRIMARY KEY,
-                total_value_given REAL DEFAULT 0,
-                total_value_received REAL DEFAULT 0,
-                total_gems_traded REAL DEFAULT 0,
-                biggest_trade_value REAL DEFAULT 0,
-                favorite_game TEXT,
-                most_traded_item TEXT,
-                trade_streak INTEGER DEFAULT 0,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        try:
-            await db.execute('ALTER TABLE trades ADD COLUMN offering_gems INTEGER DEFAULT 0')
-        except:
-            pass
-        
-        try:
-            await db.execute('ALTER TABLE trades ADD COLUMN requesting_gems INTEGER DEFAULT 0')
-        except:
-            pass
-        
-        try:
-            await db.execute('ALTER TABLE trades ADD COLUMN notes TEXT')
-        except:
-            pass
-        
-        try:
-            await db.execute('ALTER TABLE trades ADD COLUMN counter_offer_data TEXT')
-        except:
-            pass
-        
-        try:
-            await db.execute('ALTER TABLE trades ADD COLUMN requester_locked INTEGER DEFAULT 0')
-        except:
-            pass
-        
-        try:
-            await db.execute('ALTER TABLE trades ADD COLUMN target_locked INTEGER DEFAULT 0')
-        except:
-            pass
-        
-        await db.execute('CREATE INDEX IF NOT EXISTS idx_wishlists_user ON wishlists(user_id)')
-        await db.execute('CREATE INDEX IF NOT EXISTS idx_lf_ft_posts_guild ON lf_ft_posts(guild_id, status)')
-        await db.execute('CREATE INDEX IF NOT EXISTS idx_reviews_reviewed ON trader_reviews(reviewed_id)')
-        await db.execute('CREATE INDEX IF NOT EXISTS idx_notifications_user ON trade_notifications(user_id)')
-        
-        await db.commit()
+    # The enhanced tables are created by utils.migrations; this only makes sure
+    # the schema is current, which is a no-op once the bot has booted.
+    from utils.database import init_database
+    await init_database()
 
 
 async def add_to_wishlist(user_id: int, game: str, item_id: str, item_name: str, 
                           priority: int = 1, max_price: Optional[float] = None, notes: Optional[str] = None) -> bool:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         try:
             await db.execute('''
                 INSERT INTO wishlists (user_id, game, item_id, item_name, priority, max_price, notes)
@@ -192,7 +34,7 @@ async def add_to_wishlist(user_id: int, game: str, item_id: str, item_name: str,
 
 
 async def remove_from_wishlist(user_id: int, game: str, item_id: str) -> bool:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         cursor = await db.execute(
             'DELETE FROM wishlists WHERE user_id = ? AND game = ? AND item_id = ?',
             (user_id, game, item_id)
@@ -202,8 +44,7 @@ async def remove_from_wishlist(user_id: int, game: str, item_id: str) -> bool:
 
 
 async def get_wishlist(user_id: int, game: Optional[str] = None) -> List[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         if game:
             query = 'SELECT * FROM wishlists WHERE user_id = ? AND game = ? ORDER BY priority DESC'
             params = (user_id, game)
@@ -223,7 +64,7 @@ async def create_lf_ft_post(user_id: int, guild_id: int, game: str, post_type: s
     
     expires_at = (datetime.utcnow() + timedelta(hours=expires_hours)).isoformat()
     
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         cursor = await db.execute('''
             INSERT INTO lf_ft_posts (user_id, guild_id, game, post_type, items, gems, notes, expires_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -236,9 +77,7 @@ async def get_active_lf_ft_posts(guild_id: int, game: Optional[str] = None,
                                   post_type: Optional[str] = None, limit: int = 50) -> List[Dict]:
     import json
     
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        
+    async with db_pool.reader() as db:
         query = 'SELECT * FROM lf_ft_posts WHERE guild_id = ? AND status = ? AND expires_at > ?'
         params = [guild_id, 'active', datetime.utcnow().isoformat()]
         
@@ -266,7 +105,7 @@ async def add_trader_review(reviewer_id: int, reviewed_id: int, trade_id: int,
                             rating: int, review_text: Optional[str] = None) -> bool:
     review_type = 'positive' if rating >= 4 else ('neutral' if rating >= 3 else 'negative')
     
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         try:
             await db.execute('''
                 INSERT INTO trader_reviews (reviewer_id, reviewed_id, trade_id, rating, review_text, review_type)
@@ -279,8 +118,7 @@ async def add_trader_review(reviewer_id: int, reviewed_id: int, trade_id: int,
 
 
 async def get_trader_reviews(user_id: int, limit: int = 20) -> List[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         async with db.execute('''
             SELECT * FROM trader_reviews WHERE reviewed_id = ? 
             ORDER BY created_at DESC LIMIT ?
@@ -290,7 +128,7 @@ async def get_trader_reviews(user_id: int, limit: int = 20) -> List[Dict]:
 
 
 async def get_trader_rating_summary(user_id: int) -> Dict:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.reader() as db:
         async with db.execute('''
             SELECT 
                 COUNT(*) as total,
@@ -313,7 +151,7 @@ async def get_trader_rating_summary(user_id: int) -> Dict:
 
 
 async def add_favorite_trader(user_id: int, favorite_id: int, notes: Optional[str] = None) -> bool:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         try:
             await db.execute('''
                 INSERT INTO favorite_traders (user_id, favorite_id, notes)
@@ -326,7 +164,7 @@ async def add_favorite_trader(user_id: int, favorite_id: int, notes: Optional[st
 
 
 async def remove_favorite_trader(user_id: int, favorite_id: int) -> bool:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         cursor = await db.execute(
             'DELETE FROM favorite_traders WHERE user_id = ? AND favorite_id = ?',
             (user_id, favorite_id)
@@ -336,8 +174,7 @@ async def remove_favorite_trader(user_id: int, favorite_id: int) -> bool:
 
 
 async def get_favorite_traders(user_id: int) -> List[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         async with db.execute(
             'SELECT * FROM favorite_traders WHERE user_id = ? ORDER BY created_at DESC',
             (user_id,)
@@ -347,40 +184,41 @@ async def get_favorite_traders(user_id: int) -> List[Dict]:
 
 
 async def block_trader(user_id: int, blocked_id: int, reason: Optional[str] = None) -> bool:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         try:
             await db.execute('''
                 INSERT INTO blocked_traders (user_id, blocked_id, reason)
                 VALUES (?, ?, ?)
             ''', (user_id, blocked_id, reason))
             await db.commit()
-            return True
         except Exception:
             return False
+    block_index.add(user_id, blocked_id)
+    return True
 
 
 async def unblock_trader(user_id: int, blocked_id: int) -> bool:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         cursor = await db.execute(
             'DELETE FROM blocked_traders WHERE user_id = ? AND blocked_id = ?',
             (user_id, blocked_id)
         )
         await db.commit()
-        return cursor.rowcount > 0
+    block_index.discard(user_id, blocked_id)
+    return cursor.rowcount > 0
 
 
 async def is_trader_blocked(user_id: int, other_id: int) -> bool:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        async with db.execute(
-            'SELECT 1 FROM blocked_traders WHERE user_id = ? AND blocked_id = ?',
-            (user_id, other_id)
-        ) as cursor:
-            return await cursor.fetchone() is not None
+    return await block_index.is_blocked(user_id, other_id)
+
+
+async def get_block_state(user_id: int, other_id: int) -> Tuple[bool, bool]:
+    """Return (other_id blocked user_id, user_id blocked other_id) in one check."""
+    return await block_index.check(user_id, other_id)
 
 
 async def get_blocked_traders(user_id: int) -> List[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         async with db.execute(
             'SELECT * FROM blocked_traders WHERE user_id = ? ORDER BY created_at DESC',
             (user_id,)
@@ -395,7 +233,7 @@ async def save_trade_template(user_id: int, name: str, game: str,
                               notes: Optional[str] = None) -> bool:
     import json
     
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         try:
             await db.execute('''
                 INSERT INTO trade_templates (user_id, name, game, offering_items, requesting_items, 
@@ -419,8 +257,7 @@ async def save_trade_template(user_id: int, name: str, game: str,
 async def get_trade_templates(user_id: int, game: Optional[str] = None) -> List[Dict]:
     import json
     
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         if game:
             query = 'SELECT * FROM trade_templates WHERE user_id = ? AND game = ? ORDER BY name'
             params = (user_id, game)
@@ -440,7 +277,7 @@ async def get_trade_templates(user_id: int, game: Optional[str] = None) -> List[
 
 
 async def delete_trade_template(user_id: int, name: str) -> bool:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         cursor = await db.execute(
             'DELETE FROM trade_templates WHERE user_id = ? AND name = ?',
             (user_id, name)
@@ -450,7 +287,7 @@ async def delete_trade_template(user_id: int, name: str) -> bool:
 
 
 async def set_trade_feed_settings(guild_id: int, **kwargs) -> None:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         existing = None
         async with db.execute('SELECT 1 FROM trade_feed_settings WHERE guild_id = ?', (guild_id,)) as cursor:
             existing = await cursor.fetchone()
@@ -466,20 +303,18 @@ async def set_trade_feed_settings(guild_id: int, **kwargs) -> None:
             values = [guild_id] + list(kwargs.values())
             await db.execute(f'INSERT INTO trade_feed_settings ({", ".join(columns)}) VALUES ({placeholders})', values)
         await db.commit()
+        async with db.execute('SELECT * FROM trade_feed_settings WHERE guild_id = ?', (guild_id,)) as cursor:
+            row = await cursor.fetchone()
+    guild_config.patch_feed(guild_id, dict(row) if row else None)
 
 
 async def get_trade_feed_settings(guild_id: int) -> Optional[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute('SELECT * FROM trade_feed_settings WHERE guild_id = ?', (guild_id,)) as cursor:
-            row = await cursor.fetchone()
-            return dict(row) if row else None
+    feed = (await guild_config.get(guild_id)).feed
+    return dict(feed) if feed else None
 
 
 async def get_trade_leaderboard(guild_id: Optional[int] = None, limit: int = 10, 
                                  metric: str = 'total_trades') -> List[Dict]:
-    from utils.database import DATABASE_PATH
-    
     valid_metrics = {
         'total_trades': 'total_trades',
         'successful_trades': 'successful_trades', 
@@ -489,8 +324,7 @@ async def get_trade_leaderboard(guild_id: Optional[int] = None, limit: int = 10,
     
     order_column = valid_metrics.get(metric, 'total_trades')
     
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with db_pool.reader() as db:
         async with db.execute(f'''
             SELECT discord_id, trust_score, trust_tier, total_trades, 
                    successful_trades, total_value_traded
@@ -505,7 +339,7 @@ async def get_trade_leaderboard(guild_id: Optional[int] = None, limit: int = 10,
 
 async def update_trade_stats(user_id: int, value_given: float = 0, value_received: float = 0,
                              gems_traded: float = 0) -> None:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async with db_pool.writer() as db:
         await db.execute('''
             INSERT INTO trade_stats (user_id, total_value_given, total_value_received, total_gems_traded)
             VALUES (?, ?, ?, ?)
@@ -523,9 +357,7 @@ async def update_trade_stats(user_id: int, value_given: float = 0, value_receive
 async def find_matching_trades(user_id: int, game: str, looking_for: List[str]) -> List[Dict]:
     import json
     
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        
+    async with db_pool.reader() as db:
         async with db.execute('''
             SELECT * FROM trades 
             WHERE game = ? AND status = 'pending' AND requester_id != ? AND target_id IS NULL
@@ -549,9 +381,7 @@ async def find_matching_trades(user_id: int, game: str, looking_for: List[str])
 
 
 async def check_wishlist_matches(game: str, offered_items: List[Dict]) -> List[Dict]:
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        
+    async with db_pool.reader() as db:
         item_ids = [item.get('id', '') for item in offered_items]
         if not item_ids:
             return []
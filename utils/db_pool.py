@@ -0,0 +1,249 @@
+from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+import aiosqlite
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,
+    'mmap_size': 134217728,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+
+
+def load_pragma_profile(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build the PRAGMA profile from the defaults, DB_PRAGMA_<NAME> env vars and overrides."""
+    profile = dict(DEFAULT_PRAGMAS)
+    for name in DEFAULT_PRAGMAS:
+        env_value = os.getenv(f'DB_PRAGMA_{name.upper()}')
+        if env_value:
+            profile[name] = env_value
+    if overrides:
+        profile.update(overrides)
+    return profile
+
+
+class ConnectionPool:
+    """Long-lived aiosqlite connections shared by every database helper.
+
+    SQLite allows a single writer at a time, so writes are funnelled through
+    one dedicated connection guarded by a lock, while reads are served from a
+    small set of reader connections. Connections are opened once and reused
+    for the lifetime of the bot instead of per call.
+    """
+
+    def __init__(self, readers: int = 4):
+        self.path: Optional[str] = None
+        self.readers = max(1, readers)
+        self.pragmas: Dict[str, Any] = load_pragma_profile()
+        self.checkpoint_interval = int(os.getenv('DB_CHECKPOINT_INTERVAL', 300))
+        self.optimize_interval = int(os.getenv('DB_OPTIMIZE_INTERVAL', 3600))
+        self.wal_truncate_bytes = int(os.getenv('DB_WAL_TRUNCATE_BYTES', 64 * 1024 * 1024))
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._maintenance: Dict[str, Any] = {
+            'checkpoints': 0,
+            'last_checkpoint_mode': None,
+            'last_checkpoint_ms': 0.0,
+            'last_checkpoint_pages': 0,
+            'last_checkpoint_busy': False,
+            'last_optimize_ms': 0.0,
+        }
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock = asyncio.Lock()
+        self._reader_queue: Optional[asyncio.Queue] = None
+        self._reader_conns: List[aiosqlite.Connection] = []
+        self._open_lock = asyncio.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {
+            'reader': {'checkouts': 0, 'wait_total': 0.0, 'wait_max': 0.0},
+            'writer': {'checkouts': 0, 'wait_total': 0.0, 'wait_max': 0.0},
+        }
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    async def _connect(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.path)
+        db.row_factory = aiosqlite.Row
+        for name, value in self.pragmas.items():
+            if name == 'journal_mode':
+                continue
+            await db.execute(f'PRAGMA {name} = {value}')
+        return db
+
+    async def open(self, path: str, pragmas: Optional[Dict[str, Any]] = None) -> None:
+        async with self._open_lock:
+            if self.is_open:
+                return
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.path = path
+            if pragmas:
+                self.pragmas = load_pragma_profile(pragmas)
+            self._writer = await self._connect()
+            # journal_mode is persistent in the database file, so setting it once
+            # on the writer is enough for every connection opened afterwards.
+            journal_mode = self.pragmas.get('journal_mode')
+            if journal_mode:
+                async with self._writer.execute(f'PRAGMA journal_mode = {journal_mode}') as cursor:
+                    row = await cursor.fetchone()
+                    self.pragmas['journal_mode'] = row[0].upper() if row else journal_mode
+            self._reader_queue = asyncio.Queue()
+            for _ in range(self.readers):
+                conn = await self._connect()
+                self._reader_conns.append(conn)
+                self._reader_queue.put_nowait(conn)
+            logger.info(f"Database pool opened: 1 writer, {self.readers} readers ({path})")
+
+    async def close(self) -> None:
+        await self.stop_maintenance()
+        async with self._open_lock:
+            if not self.is_open:
+                return
+            async with self._writer_lock:
+                await self._writer.close()
+                self._writer = None
+            for conn in self._reader_conns:
+                await conn.close()
+            self._reader_conns.clear()
+            self._reader_queue = None
+            logger.info("Database pool closed")
+
+    async def _ensure_open(self) -> None:
+        if not self.is_open:
+            from utils.database import DATABASE_PATH
+            await self.open(self.path or DATABASE_PATH)
+
+    def _record(self, kind: str, waited: float) -> None:
+        stats = self._stats[kind]
+        stats['checkouts'] += 1
+        stats['wait_total'] += waited
+        if waited > stats['wait_max']:
+            stats['wait_max'] = waited
+
+    @asynccontextmanager
+    async def reader(self):
+        await self._ensure_open()
+        queue = self._reader_queue
+        started = time.perf_counter()
+        conn = await queue.get()
+        self._record('reader', time.perf_counter() - started)
+        try:
+            yield conn
+        finally:
+            queue.put_nowait(conn)
+
+    @asynccontextmanager
+    async def writer(self):
+        await self._ensure_open()
+        started = time.perf_counter()
+        async with self._writer_lock:
+            self._record('writer', time.perf_counter() - started)
+            conn = self._writer
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    await conn.rollback()
+                raise
+            else:
+                # Never leak a half-finished transaction to the next caller.
+                if conn.in_transaction:
+                    await conn.rollback()
+
+    def wal_size(self) -> int:
+        if not self.path:
+            return 0
+        try:
+            return os.path.getsize(f'{self.path}-wal')
+        except OSError:
+            return 0
+
+    async def checkpoint(self, mode: str = 'PASSIVE') -> Dict[str, Any]:
+        mode = mode.upper()
+        if mode not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f"Unknown checkpoint mode '{mode}'")
+        async with self.writer() as db:
+            started = time.perf_counter()
+            async with db.execute(f'PRAGMA wal_checkpoint({mode})') as cursor:
+                row = await cursor.fetchone()
+            duration_ms = (time.perf_counter() - started) * 1000
+        busy, log_pages, checkpointed = (row[0], row[1], row[2]) if row else (0, 0, 0)
+        self._maintenance['checkpoints'] += 1
+        self._maintenance['last_checkpoint_mode'] = mode
+        self._maintenance['last_checkpoint_ms'] = duration_ms
+        self._maintenance['last_checkpoint_pages'] = checkpointed
+        self._maintenance['last_checkpoint_busy'] = bool(busy)
+        return {'mode': mode, 'busy': bool(busy), 'log_pages': log_pages,
+                'checkpointed': checkpointed, 'duration_ms': duration_ms}
+
+    async def optimize(self) -> float:
+        async with self.writer() as db:
+            started = time.perf_counter()
+            await db.execute('PRAGMA optimize')
+            duration_ms = (time.perf_counter() - started) * 1000
+        self._maintenance['last_optimize_ms'] = duration_ms
+        return duration_ms
+
+    def start_maintenance(self) -> None:
+        if self.pragmas.get('journal_mode') != 'WAL':
+            return
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def stop_maintenance(self) -> None:
+        task = self._maintenance_task
+        self._maintenance_task = None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _maintenance_loop(self) -> None:
+        last_optimize = time.monotonic()
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            try:
+                # PASSIVE never waits on readers; only pay for TRUNCATE once the
+                # WAL has grown large enough to be worth shrinking.
+                mode = 'TRUNCATE' if self.wal_size() >= self.wal_truncate_bytes else 'PASSIVE'
+                result = await self.checkpoint(mode)
+                logger.debug(f"WAL checkpoint ({mode}): {result['checkpointed']} pages "
+                             f"in {result['duration_ms']:.1f}ms")
+                if time.monotonic() - last_optimize >= self.optimize_interval:
+                    await self.optimize()
+                    last_optimize = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Database maintenance failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            'open': self.is_open,
+            'readers': self.readers,
+            'readers_idle': self._reader_queue.qsize() if self._reader_queue else 0,
+            'writer_busy': self._writer_lock.locked(),
+            'journal_mode': self.pragmas.get('journal_mode'),
+            'wal_bytes': self.wal_size(),
+        }
+        result.update(self._maintenance)
+        for kind, stats in self._stats.items():
+            checkouts = int(stats['checkouts'])
+            result[f'{kind}_checkouts'] = checkouts
+            result[f'{kind}_wait_avg_ms'] = (stats['wait_total'] / checkouts * 1000) if checkouts else 0.0
+            result[f'{kind}_wait_max_ms'] = stats['wait_max'] * 1000
+        return result
+
+
+db_pool = ConnectionPool()
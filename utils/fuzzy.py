@@ -1,4 +1,5 @@
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Dict, Set, Hashable, Callable
+from bisect import bisect_right
 from Levenshtein import distance as levenshtein_distance
 
 class FuzzyMatcher:
@@ -54,4 +55,151 @@ class FuzzyMatcher:
         return [m[0] for m in matches]
 
 
+
+class BKTree:
+    """Burkhard-Keller tree over normalized strings.
+
+    Children are keyed by their edit distance to the parent, so by the triangle
+    inequality a query only has to descend into edges within max_distance of
+    its own distance to the node.
+    """
+    
+    def __init__(self):
+        self._root: Optional[list] = None
+        self.size = 0
+    
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = [word, {}]
+            self.size = 1
+            return
+        node = self._root
+        while True:
+            dist = levenshtein_distance(word, node[0])
+            if dist == 0:
+                return
+            child = node[1].get(dist)
+            if child is None:
+                node[1][dist] = [word, {}]
+                self.size += 1
+                return
+            node = child
+    
+    def search(self, word: str, max_distance: int) -> List[Tuple[str, int]]:
+        if self._root is None:
+            return []
+        results = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            dist = levenshtein_distance(word, node[0])
+            if dist <= max_distance:
+                results.append((node[0], dist))
+            low, high = dist - max_distance, dist + max_distance
+            for edge, child in node[1].items():
+                if low <= edge <= high:
+                    stack.append(child)
+        return results
+
+
+class FuzzyIndex:
+    """Prebuilt fuzzy lookup over a changing set of keyed strings.
+
+    Keys (item ids, or the strings themselves) are grouped by normalized text.
+    Exact hits are a dict lookup, substring hits a single str.find pass over
+    one joined buffer, and edit-distance hits a BK-tree search. Removed texts
+    stay in the tree but no longer map to any key, so they are skipped.
+    """
+    
+    SEPARATOR = '\n'
+    
+    def __init__(self, normalize: Callable[[str], str]):
+        self.normalize = normalize
+        self._keys: Dict[str, Set[Hashable]] = {}
+        self._text: Dict[Hashable, str] = {}
+        self._norm: Dict[Hashable, str] = {}
+        self._tree = BKTree()
+        self._buffer: Optional[str] = None
+        self._offsets: List[int] = []
+        self._buffer_norms: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self._text)
+    
+    def add(self, key: Hashable, text: str) -> None:
+        if key in self._text:
+            self.remove(key)
+        norm = self.normalize(text)
+        self._text[key] = text
+        self._norm[key] = norm
+        if norm not in self._keys:
+            self._keys[norm] = set()
+            self._tree.add(norm)
+            self._buffer = None
+        self._keys[norm].add(key)
+    
+    def remove(self, key: Hashable) -> None:
+        self._text.pop(key, None)
+        norm = self._norm.pop(key, None)
+        if norm is None:
+            return
+        keys = self._keys.get(norm)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys[norm]
+                self._buffer = None
+    
+    def text(self, key: Hashable) -> str:
+        return self._text[key]
+    
+    def exact(self, norm: str) -> Set[Hashable]:
+        return set(self._keys.get(norm, ()))
+    
+    def containing(self, norm: str) -> Set[Hashable]:
+        """Keys whose normalized text contains norm."""
+        if self._buffer is None:
+            self._buffer_norms = list(self._keys)
+            self._offsets = []
+            position = 0
+            for text in self._buffer_norms:
+                self._offsets.append(position)
+                position += len(text) + 1
+            self._buffer = self.SEPARATOR.join(self._buffer_norms)
+        if not norm:
+            return set(self._text)
+        found: Set[Hashable] = set()
+        if self.SEPARATOR in norm:
+            return found
+        buffer, offsets, norms = self._buffer, self._offsets, self._buffer_norms
+        start = buffer.find(norm)
+        while start != -1:
+            slot = bisect_right(offsets, start) - 1
+            found.update(self._keys.get(norms[slot], ()))
+            # Jump to the next entry; one hit per text is enough.
+            next_start = offsets[slot + 1] if slot + 1 < len(offsets) else len(buffer)
+            start = buffer.find(norm, next_start)
+        return found
+    
+    def within(self, norm: str, max_distance: int) -> Dict[Hashable, int]:
+        found: Dict[Hashable, int] = {}
+        for text, dist in self._tree.search(norm, max_distance):
+            for key in self._keys.get(text, ()):
+                found[key] = dist
+        return found
+    
+    def find_matches(self, query: str, limit: int = 5, max_distance: int = 2) -> List[Tuple[Hashable, int]]:
+        """Same scoring and order as FuzzyMatcher.find_matches, without a full scan."""
+        norm_query = self.normalize(query)
+        scores: Dict[Hashable, int] = {}
+        for key, dist in self.within(norm_query, max_distance).items():
+            scores[key] = dist
+        for key in self.containing(norm_query):
+            scores[key] = 1
+        for key in self.exact(norm_query):
+            scores[key] = 0
+        results = sorted(scores.items(), key=lambda x: (x[1], len(self._text[x[0]])))
+        return results[:limit]
+
+
 fuzzy_matcher = FuzzyMatcher()
@@ -0,0 +1,166 @@
+from typing import Optional, Dict, Any, Iterable
+import logging
+import sys
+import time
+
+from utils.db_pool import db_pool
+from utils.cache import SingleFlight, estimate_size, register_cache
+
+logger = logging.getLogger(__name__)
+
+
+class GuildConfig:
+    """Snapshot of one guild's routing configuration."""
+
+    def __init__(self, guild_id: int):
+        self.guild_id = guild_id
+        self.settings: Optional[Dict] = None
+        self.game_channels: Dict[str, int] = {}
+        self.feed: Optional[Dict] = None
+        # Last measured size, so the cache can keep a running total.
+        self.bytes = 0
+
+    def measure(self) -> int:
+        return (sys.getsizeof(self) + estimate_size(self.settings)
+                + estimate_size(self.game_channels) + estimate_size(self.feed))
+
+    def trade_channel(self) -> Optional[int]:
+        if self.settings and self.settings.get('announcement_enabled'):
+            return self.settings.get('trade_channel_id')
+        return None
+
+    def game_trade_channel(self, game: str) -> Optional[int]:
+        return self.game_channels.get(game) or self.trade_channel()
+
+
+class GuildConfigCache:
+    """In-memory copy of guild_settings, game_trade_channels and
+    trade_feed_settings, keyed by guild.
+
+    Guilds are loaded on first use (or all at once by load_all at startup)
+    and kept current by the setters in utils.database and utils.database_v2,
+    which patch the snapshot after their write commits.
+    """
+
+    def __init__(self):
+        self._guilds: Dict[int, GuildConfig] = {}
+        self._flight = SingleFlight()
+        # Bumped on every patch so a load that raced a write is discarded.
+        self._generation: Dict[int, int] = {}
+        self._bytes = 0
+        self._stats: Dict[str, Any] = {
+            'hits': 0, 'misses': 0, 'evictions': 0, 'loads': 0, 'patches': 0,
+            'last_load_ms': 0.0, 'load_ms_total': 0.0, 'load_ms_max': 0.0,
+        }
+
+    def _store(self, config: GuildConfig) -> None:
+        self._guilds[config.guild_id] = config
+        self._resize(config)
+
+    def _resize(self, config: GuildConfig) -> None:
+        size = config.measure()
+        self._bytes += size - config.bytes
+        config.bytes = size
+
+    async def get(self, guild_id: int) -> GuildConfig:
+        config = self._guilds.get(guild_id)
+        if config is not None:
+            self._stats['hits'] += 1
+            return config
+        self._stats['misses'] += 1
+        return await self._flight.do(guild_id, lambda: self._load_one(guild_id))
+
+    async def _load_one(self, guild_id: int) -> GuildConfig:
+        while True:
+            generation = self._generation.get(guild_id, 0)
+            loaded = (await self._load([guild_id]))[guild_id]
+            if self._generation.get(guild_id, 0) == generation:
+                self._store(loaded)
+                return loaded
+
+    async def _load(self, guild_ids: Iterable[int]) -> Dict[int, GuildConfig]:
+        started = time.perf_counter()
+        configs = {guild_id: GuildConfig(guild_id) for guild_id in guild_ids}
+        placeholders = ', '.join(['?'] * len(configs))
+        params = list(configs)
+        async with db_pool.reader() as db:
+            async with db.execute(f'SELECT * FROM guild_settings WHERE guild_id IN ({placeholders})', params) as cursor:
+                for row in await cursor.fetchall():
+                    configs[row['guild_id']].settings = dict(row)
+            async with db.execute(
+                f'SELECT guild_id, game, channel_id FROM game_trade_channels WHERE guild_id IN ({placeholders})', params
+            ) as cursor:
+                for row in await cursor.fetchall():
+                    configs[row['guild_id']].game_channels[row['game']] = row['channel_id']
+            async with db.execute(f'SELECT * FROM trade_feed_settings WHERE guild_id IN ({placeholders})', params) as cursor:
+                for row in await cursor.fetchall():
+                    configs[row['guild_id']].feed = dict(row)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._stats['loads'] += 1
+        self._stats['last_load_ms'] = elapsed_ms
+        self._stats['load_ms_total'] += elapsed_ms
+        self._stats['load_ms_max'] = max(self._stats['load_ms_max'], elapsed_ms)
+        return configs
+
+    async def load_all(self, guild_ids: Iterable[int]) -> int:
+        """Warm the snapshot for every joined guild in one pass per table."""
+        guild_ids = [guild_id for guild_id in guild_ids if guild_id not in self._guilds]
+        loaded = 0
+        # Chunked to stay under SQLite's bound-parameter limit.
+        for start in range(0, len(guild_ids), 500):
+            chunk = guild_ids[start:start + 500]
+            generations = {guild_id: self._generation.get(guild_id, 0) for guild_id in chunk}
+            for guild_id, config in (await self._load(chunk)).items():
+                if guild_id not in self._guilds and self._generation.get(guild_id, 0) == generations[guild_id]:
+                    self._store(config)
+                    loaded += 1
+        logger.debug(f"Guild config warmed for {loaded} guilds")
+        return loaded
+
+    def _patch(self, guild_id: int) -> Optional[GuildConfig]:
+        self._generation[guild_id] = self._generation.get(guild_id, 0) + 1
+        self._stats['patches'] += 1
+        return self._guilds.get(guild_id)
+
+    def patch_settings(self, guild_id: int, row: Optional[Dict]) -> None:
+        """Apply a committed guild_settings write."""
+        config = self._patch(guild_id)
+        if config is not None:
+            config.settings = row
+            self._resize(config)
+
+    def patch_game_channel(self, guild_id: int, game: str, channel_id: Optional[int]) -> None:
+        """Apply a committed game_trade_channels write; None means removed."""
+        config = self._patch(guild_id)
+        if config is None:
+            return
+        if channel_id:
+            config.game_channels[game] = channel_id
+        else:
+            config.game_channels.pop(game, None)
+        self._resize(config)
+
+    def patch_feed(self, guild_id: int, row: Optional[Dict]) -> None:
+        """Apply a committed trade_feed_settings write."""
+        config = self._patch(guild_id)
+        if config is not None:
+            config.feed = row
+            self._resize(config)
+
+    def forget(self, guild_id: int) -> None:
+        self._generation[guild_id] = self._generation.get(guild_id, 0) + 1
+        config = self._guilds.pop(guild_id, None)
+        if config is not None:
+            self._bytes -= config.bytes
+            self._stats['evictions'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        result = dict(self._stats)
+        result['guilds'] = result['entries'] = len(self._guilds)
+        result['bytes'] = self._bytes
+        result['load_ms_avg'] = self._stats['load_ms_total'] / self._stats['loads'] if self._stats['loads'] else 0.0
+        return result
+
+
+guild_config = GuildConfigCache()
+register_cache('guild_config', guild_config.stats)
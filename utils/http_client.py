@@ -0,0 +1,190 @@
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+import asyncio
+import logging
+import os
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClient:
+    """One process-wide aiohttp session for every outbound request.
+
+    The adapters, WebScraper and ProfileCog all share a single tuned
+    TCPConnector, so keep-alive connections and cached DNS answers are reused
+    across refreshes and commands instead of paying a TCP+TLS handshake per
+    session. Per-host counters are collected through an aiohttp TraceConfig.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 8, keepalive_timeout: float = 30,
+                 dns_ttl: int = 300, timeout: float = 30):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._hosts: Dict[str, Dict[str, float]] = {}
+
+    def _host_stats(self, host: str) -> Dict[str, float]:
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = self._hosts[host] = {
+                'requests': 0, 'errors': 0, 'connections_created': 0,
+                'connections_reused': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            }
+        return stats
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            ctx.host = params.url.host or ''
+            ctx.started = time.perf_counter()
+            self._host_stats(ctx.host)['requests'] += 1
+
+        async def on_request_end(session, ctx, params):
+            elapsed_ms = (time.perf_counter() - ctx.started) * 1000
+            stats = self._host_stats(ctx.host)
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+        async def on_request_exception(session, ctx, params):
+            self._host_stats(ctx.host)['errors'] += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self._host_stats(ctx.host)['connections_created'] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self._host_stats(ctx.host)['connections_reused'] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    async def session(self) -> aiohttp.ClientSession:
+        if self._session is not None and not self._session.closed:
+            return self._session
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_ttl,
+                    enable_cleanup_closed=True,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                    trace_configs=[self._trace_config()],
+                )
+        return self._session
+
+    async def close(self) -> None:
+        session = self._session
+        self._session = None
+        if session is not None and not session.closed:
+            await session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        hosts = {}
+        for host, stats in self._hosts.items():
+            result: Dict[str, Any] = dict(stats)
+            completed = stats['requests'] - stats['errors']
+            result['avg_ms'] = stats['total_ms'] / completed if completed > 0 else 0.0
+            hosts[host] = result
+        return {
+            'open': self._session is not None and not self._session.closed,
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+            'hosts': hosts,
+        }
+
+
+class Revalidator:
+    """ETag / Last-Modified validators and the last parsed body per URL.
+
+    Callers add headers(url) to a GET; on 200 they store() the parsed result
+    with the response's validators, and on 304 not_modified() hands back that
+    result without downloading or parsing the body again. Only responses that
+    carried a validator are kept, least recently used first out.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._stats: Dict[str, float] = {
+            'requests': 0, 'not_modified': 0, 'bytes': 0, 'bytes_saved': 0,
+            'parse_ms': 0.0, 'parse_ms_saved': 0.0,
+        }
+        # Wall-clock time of the last 200 or 304, for health reporting.
+        self.last_success: Optional[float] = None
+
+    def headers(self, url: str) -> Dict[str, str]:
+        self._stats['requests'] += 1
+        entry = self._entries.get(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, response_headers: Mapping[str, str], value: Any,
+              size: int, parse_ms: float) -> None:
+        self._stats['bytes'] += size
+        self._stats['parse_ms'] += parse_ms
+        self.last_success = time.time()
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if not etag and not last_modified:
+            self._entries.pop(url, None)
+            return
+        self._entries[url] = {
+            'etag': etag, 'last_modified': last_modified,
+            'value': value, 'size': size, 'parse_ms': parse_ms,
+        }
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def not_modified(self, url: str, response_headers: Mapping[str, str]) -> Optional[Any]:
+        """Return the stored result for a 304, or None if it was evicted."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        self._entries.move_to_end(url)
+        # A 304 may carry fresher validators than the original 200.
+        entry['etag'] = response_headers.get('ETag') or entry['etag']
+        entry['last_modified'] = response_headers.get('Last-Modified') or entry['last_modified']
+        self.last_success = time.time()
+        self._stats['not_modified'] += 1
+        self._stats['bytes_saved'] += entry['size']
+        self._stats['parse_ms_saved'] += entry['parse_ms']
+        return entry['value']
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(self._stats)
+        result['entries'] = len(self._entries)
+        return result
+
+
+http_client = HTTPClient(
+    limit=int(os.getenv('HTTP_POOL_LIMIT', 100)),
+    limit_per_host=int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', 8)),
+    keepalive_timeout=float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', 30)),
+    dns_ttl=int(os.getenv('HTTP_DNS_TTL', 300)),
+    timeout=float(os.getenv('HTTP_TIMEOUT', 30)),
+)
@@ -0,0 +1,480 @@
+from typing import List, Tuple, Callable, Awaitable, Dict, Any
+import aiosqlite
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+Migration = Callable[[aiosqlite.Connection], Awaitable[None]]
+
+
+async def _add_column(db: aiosqlite.Connection, table: str, column: str, definition: str) -> None:
+    async with db.execute(f'PRAGMA table_info({table})') as cursor:
+        columns = {row[1] for row in await cursor.fetchall()}
+    if column not in columns:
+        await db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+async def _001_base_schema(db: aiosqlite.Connection) -> None:
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            discord_id INTEGER PRIMARY KEY,
+            roblox_username TEXT,
+            roblox_id INTEGER,
+            roblox_account_age INTEGER,
+            discord_account_created TEXT,
+            trust_score REAL DEFAULT 50.0,
+            trust_tier TEXT DEFAULT 'Bronze',
+            reliability REAL DEFAULT 50.0,
+            fairness REAL DEFAULT 50.0,
+            responsiveness REAL DEFAULT 50.0,
+            proof_compliance REAL DEFAULT 50.0,
+            total_trades INTEGER DEFAULT 0,
+            successful_trades INTEGER DEFAULT 0,
+            disputed_trades INTEGER DEFAULT 0,
+            cancelled_trades INTEGER DEFAULT 0,
+            total_value_traded REAL DEFAULT 0.0,
+            is_banned INTEGER DEFAULT 0,
+            ban_reason TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            normalized_name TEXT NOT NULL,
+            rarity TEXT,
+            icon_url TEXT,
+            value REAL,
+            tradeable INTEGER DEFAULT 1,
+            source TEXT,
+            metadata TEXT,
+            last_verified TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(game, item_id)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS item_aliases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            alias TEXT NOT NULL,
+            UNIQUE(game, alias)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS trades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            trade_hash TEXT UNIQUE,
+            requester_id INTEGER NOT NULL,
+            target_id INTEGER,
+            game TEXT NOT NULL,
+            status TEXT DEFAULT 'draft',
+            risk_level TEXT DEFAULT 'unknown',
+            requester_items TEXT,
+            target_items TEXT,
+            offering_gems INTEGER DEFAULT 0,
+            requesting_gems INTEGER DEFAULT 0,
+            requester_confirmed INTEGER DEFAULT 0,
+            target_confirmed INTEGER DEFAULT 0,
+            proof_url TEXT,
+            receipt_hash TEXT,
+            moderator_notes TEXT,
+            notes TEXT,
+            counter_offer_data TEXT,
+            expires_at TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            completed_at TEXT,
+            archived_at TEXT
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS trade_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            trade_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            actor_id INTEGER NOT NULL,
+            details TEXT,
+            timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (trade_id) REFERENCES trades(id)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS inventories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            game TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            quantity INTEGER DEFAULT 1,
+            for_trade INTEGER DEFAULT 0,
+            wishlist INTEGER DEFAULT 0,
+            added_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, game, item_id)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reporter_id INTEGER NOT NULL,
+            reported_id INTEGER NOT NULL,
+            trade_id INTEGER,
+            reason TEXT NOT NULL,
+            evidence TEXT,
+            status TEXT DEFAULT 'pending',
+            moderator_id INTEGER,
+            resolution TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            resolved_at TEXT
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS scam_patterns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            pattern_type TEXT NOT NULL,
+            occurrences INTEGER DEFAULT 1,
+            last_occurrence TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, pattern_type)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            action TEXT NOT NULL,
+            actor_id INTEGER,
+            target_id INTEGER,
+            details TEXT,
+            timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS auctions (
+            id TEXT PRIMARY KEY,
+            seller_id INTEGER NOT NULL,
+            game TEXT NOT NULL,
+            item_data TEXT NOT NULL,
+            starting_bid INTEGER NOT NULL,
+            current_bid INTEGER DEFAULT 0,
+            current_bidder INTEGER,
+            status TEXT DEFAULT 'active',
+            channel_id INTEGER,
+            message_id INTEGER,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            ends_at TEXT NOT NULL
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS auction_bids (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            auction_id TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (auction_id) REFERENCES auctions(id)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS game_sources (
+            game TEXT PRIMARY KEY,
+            values_url TEXT NOT NULL,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_by INTEGER
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS guild_settings (
+            guild_id INTEGER PRIMARY KEY,
+            trade_channel_id INTEGER,
+            log_channel_id INTEGER,
+            mod_role_id INTEGER,
+            trade_feed_channel_id INTEGER,
+            announcement_enabled INTEGER DEFAULT 1,
+            trade_feed_enabled INTEGER DEFAULT 1,
+            auto_delete_expired INTEGER DEFAULT 1,
+            require_verification INTEGER DEFAULT 0,
+            min_trust_score REAL DEFAULT 0.0,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS game_trade_channels (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            game TEXT NOT NULL,
+            channel_id INTEGER NOT NULL,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(guild_id, game)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS trade_tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            trade_id INTEGER NOT NULL UNIQUE,
+            thread_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            guild_id INTEGER NOT NULL,
+            requester_id INTEGER NOT NULL,
+            target_id INTEGER NOT NULL,
+            status TEXT DEFAULT 'open',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            closed_at TEXT,
+            FOREIGN KEY (trade_id) REFERENCES trades(id)
+        )
+    ''')
+    
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_game_trade_channels ON game_trade_channels(guild_id, game)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_items_game ON items(game)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_items_normalized ON items(normalized_name)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_trades_users ON trades(requester_id, target_id)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_inventories_user ON inventories(user_id)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_trade_tickets ON trade_tickets(trade_id)')
+
+
+async def _002_enhanced_trading(db: aiosqlite.Connection) -> None:
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS wishlists (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            game TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            item_name TEXT NOT NULL,
+            priority INTEGER DEFAULT 1,
+            max_price REAL,
+            notes TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, game, item_id)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS lf_ft_posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            guild_id INTEGER NOT NULL,
+            game TEXT NOT NULL,
+            post_type TEXT NOT NULL,
+            items TEXT NOT NULL,
+            gems INTEGER DEFAULT 0,
+            notes TEXT,
+            status TEXT DEFAULT 'active',
+            message_id INTEGER,
+            channel_id INTEGER,
+            expires_at TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS trader_reviews (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reviewer_id INTEGER NOT NULL,
+            reviewed_id INTEGER NOT NULL,
+            trade_id INTEGER,
+            rating INTEGER NOT NULL,
+            review_text TEXT,
+            review_type TEXT DEFAULT 'positive',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(reviewer_id, trade_id)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS favorite_traders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            favorite_id INTEGER NOT NULL,
+            notes TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, favorite_id)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS blocked_traders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            blocked_id INTEGER NOT NULL,
+            reason TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, blocked_id)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS trade_templates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            game TEXT NOT NULL,
+            offering_items TEXT,
+            requesting_items TEXT,
+            offering_gems INTEGER DEFAULT 0,
+            requesting_gems INTEGER DEFAULT 0,
+            notes TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, name)
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS trade_notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            trigger_type TEXT NOT NULL,
+            game TEXT,
+            item_id TEXT,
+            min_value REAL,
+            max_value REAL,
+            enabled INTEGER DEFAULT 1,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS trade_feed_settings (
+            guild_id INTEGER PRIMARY KEY,
+            feed_channel_id INTEGER,
+            show_item_images INTEGER DEFAULT 1,
+            show_values INTEGER DEFAULT 1,
+            show_trader_info INTEGER DEFAULT 1,
+            min_trade_value REAL DEFAULT 0,
+            games_filter TEXT,
+            enabled INTEGER DEFAULT 1,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS trade_stats (
+            user_id INTEGER PRIMARY KEY,
+            total_value_given REAL DEFAULT 0,
+            total_value_received REAL DEFAULT 0,
+            total_gems_traded REAL DEFAULT 0,
+            biggest_trade_value REAL DEFAULT 0,
+            favorite_game TEXT,
+            most_traded_item TEXT,
+            trade_streak INTEGER DEFAULT 0,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    await _add_column(db, 'trades', 'offering_gems', 'INTEGER DEFAULT 0')
+    await _add_column(db, 'trades', 'requesting_gems', 'INTEGER DEFAULT 0')
+    await _add_column(db, 'trades', 'notes', 'TEXT')
+    await _add_column(db, 'trades', 'counter_offer_data', 'TEXT')
+    await _add_column(db, 'trades', 'requester_locked', 'INTEGER DEFAULT 0')
+    await _add_column(db, 'trades', 'target_locked', 'INTEGER DEFAULT 0')
+    
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_wishlists_user ON wishlists(user_id)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_lf_ft_posts_guild ON lf_ft_posts(guild_id, status)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_reviews_reviewed ON trader_reviews(reviewed_id)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_notifications_user ON trade_notifications(user_id)')
+
+
+async def _003_hot_query_indexes(db: aiosqlite.Connection) -> None:
+    # Indexes backing the hot lookups flagged by utils.query_audit. Each one
+    # mirrors a WHERE/ORDER BY shape used by a helper or cog.
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_trades_requester_updated ON trades(requester_id, updated_at)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_trades_target_updated ON trades(target_id, updated_at)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_trades_updated ON trades(updated_at)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_trades_open_feed ON trades(game, status, target_id, created_at)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_trades_receipt ON trades(receipt_hash) WHERE receipt_hash IS NOT NULL')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_trade_history_trade ON trade_history(trade_id, timestamp)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_trade_tickets_thread ON trade_tickets(thread_id)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_auctions_status_ends ON auctions(status, ends_at)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_auction_bids_auction ON auction_bids(auction_id, timestamp)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_wishlists_game_item ON wishlists(game, item_id)')
+    # Superseded by the wider index that also covers the expires_at filter.
+    await db.execute('DROP INDEX IF EXISTS idx_lf_ft_posts_guild')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_lf_ft_posts_active ON lf_ft_posts(guild_id, status, expires_at)')
+
+
+async def _004_items_game_index(db: aiosqlite.Connection) -> None:
+    # Per-game item loads filter on game, which this index leads with, so it
+    # covers everything idx_items_game was used for.
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_items_game_normalized ON items(game, normalized_name)')
+    await db.execute('DROP INDEX IF EXISTS idx_items_game')
+
+
+async def _005_trades_created_index(db: aiosqlite.Connection) -> None:
+    # /activity counts today's trades with a range on created_at.
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_trades_created ON trades(created_at)')
+
+
+# Ordered list of (version, name, step). Append new steps at the end; never
+# edit or reorder a step that has shipped. Every step must be idempotent so a
+# database created before versioning existed can be brought up to date.
+MIGRATIONS: List[Tuple[int, str, Migration]] = [
+    (1, 'base_schema', _001_base_schema),
+    (2, 'enhanced_trading', _002_enhanced_trading),
+    (3, 'hot_query_indexes', _003_hot_query_indexes),
+    (4, 'items_game_index', _004_items_game_index),
+    (5, 'trades_created_index', _005_trades_created_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+last_run: Dict[str, Any] = {
+    'version': 0,
+    'applied': [],
+    'duration_ms': 0.0,
+}
+
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    async with db.execute('PRAGMA user_version') as cursor:
+        row = await cursor.fetchone()
+        return row[0] if row else 0
+
+
+async def run_migrations(db: aiosqlite.Connection) -> List[str]:
+    """Bring the schema up to LATEST_VERSION, one transaction per step.
+
+    When the database is already current this is a single PRAGMA read and no
+    DDL is executed. Returns the names of the steps that were applied.
+    """
+    started = time.perf_counter()
+    current = await get_schema_version(db)
+    applied = []
+    
+    for version, name, step in MIGRATIONS:
+        if version <= current:
+            continue
+        await db.execute('BEGIN')
+        try:
+            await step(db)
+            await db.execute(f'PRAGMA user_version = {version}')
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logger.error(f"Migration {version:03d}_{name} failed")
+            raise
+        current = version
+        applied.append(f'{version:03d}_{name}')
+        logger.info(f"Applied migration {version:03d}_{name}")
+    
+    last_run['version'] = current
+    last_run['applied'] = applied
+    last_run['duration_ms'] = (time.perf_counter() - started) * 1000
+    return applied
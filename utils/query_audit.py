@@ -0,0 +1,171 @@
+"""Query-plan audit for every SQL statement in the codebase.
+
+Run with ``python -m utils.query_audit`` before shipping schema or query
+changes. Each statement found in the source tree is prepared against a fresh
+in-memory database built by the migrations and checked with EXPLAIN QUERY
+PLAN. The run fails if any statement does a full-table scan of one of the
+LARGE_TABLES, unless it is listed in ALLOWED_SCANS with a reason.
+"""
+from typing import List, Dict, Tuple, Optional
+import aiosqlite
+import asyncio
+import ast
+import os
+import re
+import sys
+
+from utils.migrations import run_migrations
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKIP_DIRS = {'.git', '.venv', 'venv', '__pycache__', 'attached_assets', 'data', '.pythonlibs'}
+
+# Tables that grow with usage. Small per-guild/per-game config tables are not
+# listed: scanning them is as cheap as an index lookup.
+LARGE_TABLES = {
+    'users', 'items', 'item_aliases', 'trades', 'trade_history', 'inventories',
+    'reports', 'audit_log', 'auctions', 'auction_bids', 'trade_tickets',
+    'wishlists', 'lf_ft_posts', 'trader_reviews', 'favorite_traders',
+    'blocked_traders', 'trade_templates', 'trade_notifications', 'trade_stats',
+}
+
+# Statements that knowingly scan, keyed by a substring of the normalized SQL.
+ALLOWED_SCANS = {
+    'SELECT COUNT(*) FROM trades': '/server_stats all-time total; SQLite keeps no row count, so an exact '
+                                   'count reads one entry per trade from the narrowest index',
+    'SELECT COUNT(DISTINCT requester_id) FROM trades': '/server_stats unique traders must visit every trade; '
+                                                       'idx_trades_users supplies requester_id without table reads',
+    'SELECT game, COUNT(*) as count FROM trades GROUP BY game': '/server_stats per-game breakdown aggregates every '
+                                                                'trade; idx_trades_open_feed leads with game',
+    'SELECT COUNT(*) FROM items': '/owner status total; items is bounded by the five game catalogs, a few '
+                                  'thousand rows',
+    'SELECT DISTINCT game FROM items': 'ItemCatalog.load_all runs once at startup, and the per-game loads it '
+                                      'triggers read every item row anyway',
+    'WHERE is_banned = 0 AND': 'leaderboard ranks by a user-selected metric column',
+    'SELECT user_id, blocked_id FROM blocked_traders': 'BlockIndex warm-up: one lazy load of every block pair '
+                                                       'per process, after which trade gating never queries',
+}
+
+# Stand-ins for f-string fields so dynamic statements can still be prepared.
+FSTRING_FIELDS = {
+    'fields': 'rowid = ?',
+    'field': 'value',
+    'assignments': '',
+    'where': 'id = ?',
+    'placeholders': '?',
+    'order_column': 'total_trades',
+    'metric': 'total_trades',
+    'user_fields': 'trust_score = ?',
+}
+
+
+def _render(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(str(value.value))
+            elif isinstance(value, ast.FormattedValue):
+                name = ast.unparse(value.value)
+                if name not in FSTRING_FIELDS:
+                    return None
+                parts.append(FSTRING_FIELDS[name])
+        return ''.join(parts)
+    return None
+
+
+def _is_sql(text: str) -> bool:
+    # SQL in this codebase is written with uppercase keywords, which keeps
+    # UI strings such as "Select items to remove" out of the audit.
+    head = ' '.join(text.split())
+    return bool(re.match(r'^(SELECT|UPDATE|DELETE|INSERT)\b', head)) and (
+        ' FROM ' in head or ' SET ' in head or ' INTO ' in head
+    )
+
+
+def collect_statements(root: str = ROOT) -> List[Tuple[str, int, str]]:
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for filename in filenames:
+            if not filename.endswith('.py') or filename == 'query_audit.py':
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, encoding='utf-8') as f:
+                tree = ast.parse(f.read(), filename=path)
+            for node in ast.walk(tree):
+                if isinstance(node, ast.JoinedStr):
+                    for value in node.values:
+                        setattr(value, '_in_fstring', True)
+            for node in ast.walk(tree):
+                if getattr(node, '_in_fstring', False):
+                    continue
+                if not isinstance(node, (ast.Constant, ast.JoinedStr)):
+                    continue
+                text = _render(node)
+                if text and _is_sql(text):
+                    found.append((os.path.relpath(path, root), node.lineno, ' '.join(text.split())))
+    return found
+
+
+async def explain(db: aiosqlite.Connection, sql: str) -> List[str]:
+    params = [None] * sql.count('?')
+    async with db.execute(f'EXPLAIN QUERY PLAN {sql}', params) as cursor:
+        return [row[3] for row in await cursor.fetchall()]
+
+
+def full_scans(sql: str, plan: List[str]) -> List[str]:
+    # SCAN walks a whole b-tree, SEARCH seeks into one. Walking an index in
+    # order is fine when a LIMIT stops it early; otherwise it is still a pass
+    # over every row, just over narrower pages.
+    bounded = ' LIMIT ' in f'{sql} '
+    scans = []
+    for detail in plan:
+        match = re.match(r'SCAN (\w+)( USING (COVERING )?INDEX)?', detail)
+        if not match or match.group(1) not in LARGE_TABLES:
+            continue
+        if match.group(2) and bounded:
+            continue
+        scans.append(match.group(1))
+    return scans
+
+
+async def audit(root: str = ROOT) -> Dict[str, List]:
+    report: Dict[str, List] = {'ok': [], 'allowed': [], 'failed': [], 'skipped': []}
+    async with aiosqlite.connect(':memory:') as db:
+        await run_migrations(db)
+        for location, lineno, sql in collect_statements(root):
+            where = f'{location}:{lineno}'
+            try:
+                plan = await explain(db, sql)
+            except Exception as e:
+                report['skipped'].append((where, sql, str(e)))
+                continue
+            scans = full_scans(sql, plan)
+            if not scans:
+                report['ok'].append((where, sql, plan))
+                continue
+            reason = next((r for key, r in ALLOWED_SCANS.items() if key in sql), None)
+            if reason:
+                report['allowed'].append((where, sql, reason))
+            else:
+                report['failed'].append((where, sql, plan))
+    return report
+
+
+def main() -> int:
+    report = asyncio.run(audit())
+    for where, sql, plan in report['failed']:
+        print(f"FULL SCAN  {where}\n  {sql}\n  " + '\n  '.join(plan))
+    for where, sql, reason in report['allowed']:
+        print(f"allowed    {where}  ({reason})")
+    for where, sql, error in report['skipped']:
+        print(f"skipped    {where}  ({error})")
+    print(f"\n{len(report['ok'])} ok, {len(report['allowed'])} allowed, "
+          f"{len(report['failed'])} full scans, {len(report['skipped'])} skipped")
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,104 +1,191 @@
-from typing import Dict, Optional
-from datetime import datetime, timedelta
-import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+import math
+import os
+import time
+
+# (limit, period seconds) pairs; a request must fit every limit of its action.
+Policy = List[Tuple[int, float]]
+
+
+def parse_policies(spec: str) -> Dict[str, Policy]:
+    """Parse "action=limit/period,limit/period;action=..." into policies."""
+    policies: Dict[str, Policy] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(';'))):
+        action, _, limits = entry.partition('=')
+        policies[action.strip()] = [
+            (int(limit), float(period))
+            for limit, period in (pair.split('/') for pair in limits.split(','))
+        ]
+    return policies
+
 
 class RateLimiter:
-    def __init__(self, requests_per_minute: int = 30, requests_per_hour: int = 300):
+    """GCRA (token bucket) limiter with per-action policies.
+
+    Each (action, limit) pair is a shard mapping user_id to one float, the
+    theoretical arrival time of that user's next request. A request is
+    allowed once now reaches TAT - period + period/limit, which allows a burst
+    of `limit` and then one request per period/limit, with no window
+    boundary to game. An entry whose TAT has passed means a full bucket, so
+    idle entries are dropped by a periodic sweep without changing any answer.
+    Nothing awaits, so checks need no lock.
+    """
+    
+    def __init__(self, requests_per_minute: int = 30, requests_per_hour: int = 300,
+                 policies: Optional[Dict[str, Policy]] = None, sweep_interval: float = 60):
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
-        self._minute_buckets: Dict[int, Dict[str, int]] = {}
-        self._hour_buckets: Dict[int, Dict[str, int]] = {}
-        self._lock = asyncio.Lock()
+        self.default_policy: Policy = [(requests_per_minute, 60.0), (requests_per_hour, 3600.0)]
+        self._policies: Dict[str, Policy] = dict(policies or {})
+        self._shards: Dict[Tuple[str, int, float], Dict[int, float]] = {}
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+        self._stats: Dict[str, int] = {'allowed': 0, 'limited': 0, 'evicted': 0}
+    
+    def set_policy(self, action: str, limits: Policy) -> None:
+        self._policies[action] = list(limits)
+        for key in [key for key in self._shards if key[0] == action]:
+            del self._shards[key]
     
-    def _get_minute_key(self) -> int:
-        now = datetime.now()
-        return int(now.timestamp() // 60)
+    def policy(self, action: str) -> Policy:
+        return self._policies.get(action, self.default_policy)
     
-    def _get_hour_key(self) -> int:
-        now = datetime.now()
-        return int(now.timestamp() // 3600)
+    def _shards_for(self, action: str) -> List[Tuple[int, float, Dict[int, float]]]:
+        shards = []
+        for limit, period in self.policy(action):
+            shard = self._shards.get((action, limit, period))
+            if shard is None:
+                shard = self._shards[(action, limit, period)] = {}
+            shards.append((limit, period, shard))
+        return shards
     
     async def check(self, user_id: int, action: str = 'default') -> tuple[bool, Optional[int]]:
-        async with self._lock:
-            key = f"{user_id}:{action}"
-            minute_key = self._get_minute_key()
-            hour_key = self._get_hour_key()
-            
-            if minute_key not in self._minute_buckets:
-                self._minute_buckets = {minute_key: {}}
-            if hour_key not in self._hour_buckets:
-                self._hour_buckets = {hour_key: {}}
-            
-            minute_count = self._minute_buckets[minute_key].get(key, 0)
-            hour_count = self._hour_buckets[hour_key].get(key, 0)
-            
-            if minute_count >= self.requests_per_minute:
-                retry_after = 60 - (datetime.now().second)
-                return False, retry_after
-            
-            if hour_count >= self.requests_per_hour:
-                retry_after = 3600 - (datetime.now().minute * 60 + datetime.now().second)
-                return False, retry_after
-            
-            self._minute_buckets[minute_key][key] = minute_count + 1
-            self._hour_buckets[hour_key][key] = hour_count + 1
-            
-            return True, None
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+        
+        shards = self._shards_for(action)
+        wait = 0.0
+        for limit, period, shard in shards:
+            tat = shard.get(user_id, now)
+            # Earliest time this limit admits another request.
+            wait = max(wait, tat - period + period / limit - now)
+        if wait > 0:
+            self._stats['limited'] += 1
+            return False, max(1, math.ceil(wait))
+        
+        for limit, period, shard in shards:
+            shard[user_id] = max(shard.get(user_id, now), now) + period / limit
+        self._stats['allowed'] += 1
+        return True, None
     
     async def get_remaining(self, user_id: int, action: str = 'default') -> Dict[str, int]:
-        async with self._lock:
-            key = f"{user_id}:{action}"
-            minute_key = self._get_minute_key()
-            hour_key = self._get_hour_key()
-            
-            minute_count = self._minute_buckets.get(minute_key, {}).get(key, 0)
-            hour_count = self._hour_buckets.get(hour_key, {}).get(key, 0)
-            
-            return {
-                'minute_remaining': max(0, self.requests_per_minute - minute_count),
-                'hour_remaining': max(0, self.requests_per_hour - hour_count)
-            }
+        now = time.monotonic()
+        result: Dict[str, int] = {}
+        for limit, period, shard in self._shards_for(action):
+            used = max(0.0, shard.get(user_id, now) - now)
+            remaining = max(0, int((period - used) // (period / limit)))
+            name = {60.0: 'minute_remaining', 3600.0: 'hour_remaining'}.get(period, f'{period:g}s_remaining')
+            result[name] = remaining
+        return result
     
     async def reset(self, user_id: int, action: str = 'default') -> None:
-        async with self._lock:
-            key = f"{user_id}:{action}"
-            for bucket in self._minute_buckets.values():
-                if key in bucket:
-                    del bucket[key]
-            for bucket in self._hour_buckets.values():
-                if key in bucket:
-                    del bucket[key]
+        for _, _, shard in self._shards_for(action):
+            shard.pop(user_id, None)
+    
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop entries whose bucket has refilled; they carry no state."""
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        for shard in self._shards.values():
+            idle = [user_id for user_id, tat in shard.items() if tat <= now]
+            for user_id in idle:
+                del shard[user_id]
+            evicted += len(idle)
+        self._last_sweep = now
+        self._stats['evicted'] += evicted
+        return evicted
+    
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(self._stats)
+        result['entries'] = sum(len(shard) for shard in self._shards.values())
+        result['shards'] = len(self._shards)
+        return result
 
 
 class ActionCooldown:
-    def __init__(self):
-        self._cooldowns: Dict[str, datetime] = {}
-        self._lock = asyncio.Lock()
+    """Per-(user, action) cooldowns that expire on their own.
+
+    Like RateLimiter, each action is a shard mapping user_id to one float,
+    the monotonic deadline, so a cooldown is a single dict entry. Expired
+    entries are dropped when checked and by a periodic sweep run from
+    set_cooldown, so users who never come back are collected too and memory
+    follows active cooldowns without a background task. Nothing awaits, so
+    no lock is needed.
+    """
+    
+    def __init__(self, sweep_interval: float = 60):
+        self._shards: Dict[str, Dict[int, float]] = {}
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+        self._stats: Dict[str, int] = {'set': 0, 'expired': 0}
     
     async def set_cooldown(self, user_id: int, action: str, seconds: int) -> None:
-        async with self._lock:
-            key = f"{user_id}:{action}"
-            self._cooldowns[key] = datetime.now() + timedelta(seconds=seconds)
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+        shard = self._shards.get(action)
+        if shard is None:
+            shard = self._shards[action] = {}
+        shard[user_id] = now + seconds
+        self._stats['set'] += 1
     
     async def check_cooldown(self, user_id: int, action: str) -> tuple[bool, Optional[int]]:
-        async with self._lock:
-            key = f"{user_id}:{action}"
-            if key not in self._cooldowns:
-                return True, None
-            
-            if datetime.now() >= self._cooldowns[key]:
-                del self._cooldowns[key]
-                return True, None
-            
-            remaining = int((self._cooldowns[key] - datetime.now()).total_seconds())
-            return False, remaining
+        shard = self._shards.get(action)
+        deadline = shard.get(user_id) if shard else None
+        if deadline is None:
+            return True, None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            del shard[user_id]
+            self._stats['expired'] += 1
+            return True, None
+        return False, int(remaining)
+    
+    async def get_active_cooldowns(self, user_id: int) -> Dict[str, int]:
+        """Seconds remaining for every active cooldown of the user."""
+        now = time.monotonic()
+        result: Dict[str, int] = {}
+        for action, shard in self._shards.items():
+            deadline = shard.get(user_id)
+            if deadline is not None and deadline > now:
+                result[action] = int(deadline - now)
+        return result
     
     async def clear_cooldown(self, user_id: int, action: str) -> None:
-        async with self._lock:
-            key = f"{user_id}:{action}"
-            if key in self._cooldowns:
-                del self._cooldowns[key]
+        shard = self._shards.get(action)
+        if shard:
+            shard.pop(user_id, None)
+    
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop every cooldown whose deadline has passed."""
+        now = time.monotonic() if now is None else now
+        expired = 0
+        for shard in self._shards.values():
+            done = [user_id for user_id, deadline in shard.items() if deadline <= now]
+            for user_id in done:
+                del shard[user_id]
+            expired += len(done)
+        self._last_sweep = now
+        self._stats['expired'] += expired
+        return expired
+    
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(self._stats)
+        result['active'] = sum(len(shard) for shard in self._shards.values())
+        result['actions'] = len(self._shards)
+        return result
 
 
-rate_limiter = RateLimiter()
+rate_limiter = RateLimiter(policies=parse_policies(os.getenv('RATE_LIMIT_POLICIES', '')))
 action_cooldown = ActionCooldown()
@@ -1,8 +1,11 @@
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Any
+from collections import OrderedDict
 from .fuzzy import fuzzy_matcher
-from .cache import item_cache
-from utils.database import get_item, search_items as db_search_items, get_all_items_for_game
+from .cache import item_cache, estimate_size, register_cache
+from utils.catalog import item_catalog
 import json
+import os
+import time
 
 class ItemResolver:
     GAME_ALIASES = {
@@ -13,8 +16,15 @@ class ItemResolver:
         'sab': ['steal a brainrot', 'stealabrainrot', 'brainrot']
     }
     
-    def __init__(self):
+    def __init__(self, negative_ttl: int = 60, negative_size: int = 5000):
         self._item_aliases: Dict[str, Dict[str, str]] = {}
+        # (game, normalized query) -> (catalog version, expiry). Any catalog
+        # change bumps the version, so a newly added item is never hidden.
+        self._negative: OrderedDict = OrderedDict()
+        self.negative_ttl = negative_ttl
+        self.negative_size = negative_size
+        self._outcomes: Dict[str, int] = {'exact': 0, 'alias': 0, 'fuzzy': 0, 'miss': 0, 'negative_hit': 0}
+        self._negative_stats: Dict[str, int] = {'misses': 0, 'evictions': 0}
     
     def normalize(self, text: str) -> str:
         return text.lower().replace(' ', '').replace('-', '').replace('_', '').replace("'", '')
@@ -29,47 +39,90 @@ class ItemResolver:
         return None
     
     async def resolve_item(self, game: str, query: str) -> Optional[Dict]:
-        cache_key = f"resolve:{game}:{self.normalize(query)}"
-        cached = await item_cache.get(cache_key)
-        if cached:
-            return cached
-        
-        items = await get_all_items_for_game(game, limit=1000)
-        if not items:
-            return None
-        
-        norm_query = self.normalize(query)
+        return (await self.resolve_items(game, [query]))[0]
+    
+    async def resolve_items(self, game: str, queries: List[str]) -> List[Optional[Dict]]:
+        """Resolve a list of item names in one catalog pass, keeping order.
         
-        for item in items:
-            item_norm = item.get('normalized_name', self.normalize(item.get('name', '')))
-            item_id = item.get('item_id', '').lower()
-            if item_norm == norm_query or item_id == norm_query:
-                result = self._format_item(item)
-                await item_cache.set(cache_key, result)
-                return result
+        Entries that cannot be resolved are None.
+        """
+        catalog = await item_catalog.get(game)
+        if not catalog.items:
+            return [None] * len(queries)
         
         game_aliases = self._item_aliases.get(game, {})
-        if norm_query in game_aliases:
-            alias_target = game_aliases[norm_query]
-            for item in items:
-                item_norm = item.get('normalized_name', self.normalize(item.get('name', '')))
-                item_id = item.get('item_id', '').lower()
-                if item_norm == alias_target or item_id == alias_target:
-                    result = self._format_item(item)
-                    await item_cache.set(cache_key, result)
-                    return result
+        results: List[Optional[Dict]] = []
+        misses: Dict[str, List[int]] = {}
+        queries_by_norm: Dict[str, str] = {}
+        now = time.monotonic()
         
-        item_names = [item['name'] for item in items]
-        match = fuzzy_matcher.best_match(query, item_names)
+        for position, query in enumerate(queries):
+            norm_query = self.normalize(query)
+            item = catalog.lookup(norm_query)
+            if item:
+                self._outcomes['exact'] += 1
+            elif norm_query in game_aliases:
+                item = catalog.lookup(game_aliases[norm_query])
+                if item:
+                    self._outcomes['alias'] += 1
+            if not item:
+                if self._is_known_miss(game, norm_query, catalog.version, now):
+                    self._outcomes['negative_hit'] += 1
+                else:
+                    misses.setdefault(norm_query, []).append(position)
+                    queries_by_norm.setdefault(norm_query, query)
+            results.append(self._format_item(item) if item else None)
         
-        if match and match[1] <= 2:
-            for item in items:
-                if item['name'] == match[0]:
-                    result = self._format_item(item)
-                    await item_cache.set(cache_key, result)
-                    return result
+        # Only the fuzzy fallback is worth caching, and only as an item_id so
+        # the value returned always comes from the live catalog.
+        for norm_query, positions in misses.items():
+            cache_key = f"resolve:{game}:{norm_query}"
+            item_id = await item_cache.get(cache_key)
+            if not item_id or item_id not in catalog.items:
+                matches = catalog.fuzzy.find_matches(queries_by_norm[norm_query], limit=1, max_distance=fuzzy_matcher.max_distance)
+                if not matches or matches[0][1] > 2:
+                    self._outcomes['miss'] += len(positions)
+                    self._remember_miss(game, norm_query, catalog.version, now)
+                    continue
+                item_id = matches[0][0]
+                await item_cache.set(cache_key, item_id)
+            self._outcomes['fuzzy'] += len(positions)
+            resolved = self._format_item(catalog.items[item_id])
+            for position in positions:
+                results[position] = resolved
         
-        return None
+        return results
+    
+    def _is_known_miss(self, game: str, norm_query: str, version: int, now: float) -> bool:
+        entry = self._negative.get((game, norm_query))
+        if entry is None:
+            self._negative_stats['misses'] += 1
+            return False
+        if entry[0] != version or entry[1] < now:
+            del self._negative[(game, norm_query)]
+            self._negative_stats['misses'] += 1
+            return False
+        return True
+    
+    def _remember_miss(self, game: str, norm_query: str, version: int, now: float) -> None:
+        key = (game, norm_query)
+        self._negative[key] = (version, now + self.negative_ttl)
+        self._negative.move_to_end(key)
+        while len(self._negative) > self.negative_size:
+            self._negative.popitem(last=False)
+            self._negative_stats['evictions'] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(self._outcomes)
+        result['negative_entries'] = len(self._negative)
+        return result
+    
+    def negative_cache_stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(self._negative_stats)
+        result['hits'] = self._outcomes['negative_hit']
+        result['entries'] = len(self._negative)
+        result['bytes'] = estimate_size(self._negative)
+        return result
     
     def _format_item(self, item: Dict) -> Dict:
         metadata = {}
@@ -95,57 +148,59 @@ class ItemResolver:
         }
     
     async def search_items(self, game: str, query: str, limit: int = 10) -> List[Dict]:
-        items = await get_all_items_for_game(game, limit=1000)
-        if not items:
+        catalog = await item_catalog.get(game)
+        if not catalog.items:
             return []
         
         norm_query = self.normalize(query)
+        index = catalog.fuzzy
         
-        exact_matches = []
-        partial_matches = []
-        fuzzy_matches = []
-        
-        for item in items:
-            item_norm = item.get('normalized_name', self.normalize(item.get('name', '')))
-            if item_norm == norm_query:
-                exact_matches.append((item, 0))
-            elif norm_query in item_norm:
-                partial_matches.append((item, 1))
-            else:
-                dist = fuzzy_matcher.distance(query, item['name'])
-                if dist <= 3:
-                    fuzzy_matches.append((item, dist + 2))
-        
-        all_matches = exact_matches + partial_matches + fuzzy_matches
-        all_matches.sort(key=lambda x: x[1])
+        # exact 0, substring 1, then edit distance <= 3 shifted to 2..5
+        scores = {item_id: dist + 2 for item_id, dist in index.within(norm_query, 3).items()}
+        for item_id in index.containing(norm_query):
+            scores[item_id] = 1
+        for item_id in index.exact(norm_query):
+            scores[item_id] = 0
         
-        return [self._format_item(m[0]) for m in all_matches[:limit]]
+        items = catalog.items
+        ranked = sorted(scores.items(), key=lambda x: (x[1], -float(items[x[0]].get('value') or 0)))
+        return [self._format_item(items[item_id]) for item_id, _ in ranked[:limit]]
     
     async def suggest_items(self, game: str, query: str, limit: int = 3) -> List[Dict]:
         return await self.search_items(game, query, limit)
     
     async def validate_item(self, game: str, item_id: str) -> bool:
-        item = await get_item(game, item_id)
-        return item is not None
+        catalog = await item_catalog.get(game)
+        return item_id in catalog.items
     
     async def get_item_value(self, game: str, item_id: str) -> Optional[float]:
-        item = await get_item(game, item_id)
-        if item:
-            return float(item.get('value', 0))
-        return None
+        return (await self.get_item_values(game, [item_id])).get(item_id)
+    
+    async def get_item_values(self, game: str, item_ids: List[str]) -> Dict[str, float]:
+        """Values for every known item_id in the list; unknown ids are left out."""
+        items = (await item_catalog.get(game)).items
+        return {
+            item_id: float(items[item_id].get('value') or 0)
+            for item_id in item_ids if item_id in items
+        }
     
     def register_alias(self, game: str, alias: str, target: str) -> None:
         if game not in self._item_aliases:
             self._item_aliases[game] = {}
-        self._item_aliases[game][self.normalize(alias)] = self.normalize(target)
+        norm_alias = self.normalize(alias)
+        self._item_aliases[game][norm_alias] = self.normalize(target)
+        # Aliases don't bump the catalog version, so drop a cached miss for
+        # the alias here or it would keep failing until its TTL ran out.
+        if self._negative.pop((game, norm_alias), None) is not None:
+            self._negative_stats['evictions'] += 1
     
     async def calculate_trade_value(self, game: str, items: List[str]) -> float:
-        total = 0.0
-        for item_id in items:
-            value = await self.get_item_value(game, item_id)
-            if value:
-                total += value
-        return total
+        values = await self.get_item_values(game, items)
+        return sum(values.get(item_id, 0.0) for item_id in items)
 
 
-item_resolver = ItemResolver()
+item_resolver = ItemResolver(
+    negative_ttl=int(os.getenv('RESOLVER_NEGATIVE_TTL', 60)),
+    negative_size=int(os.getenv('RESOLVER_NEGATIVE_SIZE', 5000)),
+)
+register_cache('resolver_negative', item_resolver.negative_cache_stats)
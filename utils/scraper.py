@@ -1,11 +1,14 @@
-from typing import List, Dict, Optional, Tuple, Set, Union
+from typing import Any, Callable, List, Dict, Optional, Tuple, Set, Union
 from bs4 import BeautifulSoup
 import aiohttp
 import re
 import logging
 import asyncio
+import time
 from urllib.parse import urlparse, urljoin, parse_qs, urlencode, urlunparse
 
+from utils.http_client import Revalidator, http_client
+
 logger = logging.getLogger(__name__)
 
 class WebScraper:
@@ -216,11 +219,33 @@ class WebScraper:
         return ''
     
     @staticmethod
-    async def fetch_html(session: aiohttp.ClientSession, url: str) -> Optional[str]:
+    async def fetch_html(session: Optional[aiohttp.ClientSession], url: str,
+                         revalidator: Optional[Revalidator] = None,
+                         parse: Optional[Callable[[str], Any]] = None) -> Optional[Any]:
+        """Return the page's HTML, or parse(html) when parse is given.
+        
+        With a revalidator the GET is conditional and a 304 returns the
+        result stored from the last 200, without re-downloading or re-parsing.
+        """
         try:
-            async with session.get(url, headers=WebScraper.HEADERS, timeout=aiohttp.ClientTimeout(total=45)) as response:
+            if session is None:
+                session = await http_client.session()
+            headers = WebScraper.HEADERS
+            if revalidator is not None:
+                headers = {**headers, **revalidator.headers(url)}
+            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=45)) as response:
+                if response.status == 304 and revalidator is not None:
+                    return revalidator.not_modified(url, response.headers)
                 if response.status == 200:
-                    return await response.text()
+                    body = await response.read()
+                    html = await response.text()
+                    started = time.perf_counter()
+                    result = parse(html) if parse is not None else html
+                    if revalidator is not None:
+                        revalidator.store(url, response.headers, result,
+                                          response.content_length or len(body),
+                                          (time.perf_counter() - started) * 1000)
+                    return result
                 else:
                     logger.error(f"HTTP {response.status} when fetching {url}")
                     return None
@@ -586,29 +611,32 @@ class WebScraper:
         return list(pagination_urls)
     
     @staticmethod
-    async def scrape_single_page(session: aiohttp.ClientSession, url: str, 
+    async def scrape_single_page(session: Optional[aiohttp.ClientSession], url: str, 
                                   game_name: str, base_url: str, 
-                                  rarity_list: Optional[List[str]] = None) -> Tuple[List[Dict], List[str]]:
-        html = await WebScraper.fetch_html(session, url)
-        if not html:
-            return [], []
-        
-        items = WebScraper.extract_items_generic(html, base_url, game_name, rarity_list)
-        
-        if not items:
-            items = WebScraper.extract_items_table(html, base_url, game_name, rarity_list)
-        
-        if not items:
-            items = WebScraper.extract_items_list(html, base_url, game_name, rarity_list)
-        
-        pagination_links = WebScraper.detect_pagination_links(html, url, base_url)
+                                  rarity_list: Optional[List[str]] = None,
+                                  revalidator: Optional[Revalidator] = None) -> Tuple[List[Dict], List[str]]:
+        def parse(html: str) -> Tuple[List[Dict], List[str]]:
+            items = WebScraper.extract_items_generic(html, base_url, game_name, rarity_list)
+            
+            if not items:
+                items = WebScraper.extract_items_table(html, base_url, game_name, rarity_list)
+            
+            if not items:
+                items = WebScraper.extract_items_list(html, base_url, game_name, rarity_list)
+            
+            pagination_links = WebScraper.detect_pagination_links(html, url, base_url)
+            
+            return items, pagination_links
         
-        return items, pagination_links
+        page = await WebScraper.fetch_html(session, url, revalidator, parse)
+        if not page:
+            return [], []
+        return page
     
     @staticmethod
-    async def scrape_items(session: aiohttp.ClientSession, url: str, game_name: str, 
+    async def scrape_items(session: Optional[aiohttp.ClientSession], url: str, game_name: str, 
                           rarity_list: Optional[List[str]] = None, base_url: Optional[str] = None,
-                          max_pages: int = 10) -> List[Dict]:
+                          max_pages: int = 10, revalidator: Optional[Revalidator] = None) -> List[Dict]:
         if base_url is None:
             parsed = urlparse(url)
             base_url = f"{parsed.scheme}://{parsed.netloc}"
@@ -631,7 +659,7 @@ class WebScraper:
             visited_urls.add(normalized_url)
             
             items, pagination_links = await WebScraper.scrape_single_page(
-                session, current_url, game_name, base_url, rarity_list
+                session, current_url, game_name, base_url, rarity_list, revalidator
             )
             
             if items:
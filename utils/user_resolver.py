@@ -0,0 +1,69 @@
+from typing import Any, Dict, Iterable, Optional
+import asyncio
+import logging
+import os
+
+from utils.cache import Cache, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class DiscordUserResolver:
+    """Resolve Discord user ids to User objects with as few REST calls as possible.
+
+    Lookups try the gateway cache (client.get_user) first, then a TTL cache of
+    earlier fetches. Whatever is left is fetched concurrently, at most
+    `concurrency` requests at a time, and concurrent requests for the same id
+    share one fetch.
+    """
+
+    def __init__(self, ttl: int = 600, max_entries: int = 5000, concurrency: int = 8):
+        self._cache = Cache(default_ttl=ttl, max_entries=max_entries, name='discord_users')
+        self._flight = SingleFlight()
+        self.concurrency = concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats: Dict[str, int] = {'gateway_hits': 0, 'fetches': 0, 'fetch_errors': 0}
+
+    async def _fetch(self, client, user_id: int) -> Optional[Any]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            self._stats['fetches'] += 1
+            try:
+                user = await client.fetch_user(user_id)
+            except Exception as e:
+                self._stats['fetch_errors'] += 1
+                logger.error(f"Error fetching user {user_id}: {e}")
+                return None
+        await self._cache.set(f"user:{user_id}", user)
+        return user
+
+    async def get(self, client, user_id: int) -> Optional[Any]:
+        user = client.get_user(user_id)
+        if user is not None:
+            self._stats['gateway_hits'] += 1
+            return user
+        user = await self._cache.get(f"user:{user_id}")
+        if user is not None:
+            return user
+        return await self._flight.do(user_id, lambda: self._fetch(client, user_id))
+
+    async def get_many(self, client, user_ids: Iterable[Optional[int]]) -> Dict[int, Any]:
+        """Resolve every distinct non-zero id in one concurrent wave.
+
+        Ids that cannot be resolved are left out of the result.
+        """
+        ids = [user_id for user_id in dict.fromkeys(user_ids) if user_id]
+        users = await asyncio.gather(*(self.get(client, user_id) for user_id in ids))
+        return {user_id: user for user_id, user in zip(ids, users) if user is not None}
+
+    def stats(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(self._stats)
+        result.update(self._cache.stats())
+        return result
+
+
+user_resolver = DiscordUserResolver(
+    ttl=int(os.getenv('DISCORD_USER_CACHE_TTL', 600)),
+    concurrency=int(os.getenv('DISCORD_FETCH_CONCURRENCY', 8)),
+)
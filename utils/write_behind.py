@@ -0,0 +1,163 @@
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime
+import asyncio
+import logging
+import os
+import time
+
+from utils.db_pool import db_pool
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Buffers append-only inserts and writes them in batched transactions.
+
+    audit_log and trade_history rows are never read back on the interaction
+    that produces them, so instead of paying a commit per event they are
+    queued and flushed with executemany every flush interval or batch size,
+    whichever comes first. The queue is bounded: once full, producers wait
+    for the flusher to catch up.
+    """
+
+    STATEMENTS = {
+        'audit_log': 'INSERT INTO audit_log (action, actor_id, target_id, details, timestamp) VALUES (?, ?, ?, ?, ?)',
+        'trade_history': 'INSERT INTO trade_history (trade_id, action, actor_id, details, timestamp) VALUES (?, ?, ?, ?, ?)',
+    }
+
+    def __init__(self, max_size: int = 10000, batch_size: int = 200, flush_interval_ms: int = 50,
+                 max_retries: int = 5, retry_base_ms: int = 100):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_retries = max_retries
+        self.retry_base = retry_base_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats: Dict[str, Any] = {
+            'enqueued': 0,
+            'written': 0,
+            'failed': 0,
+            'retries': 0,
+            'batches': 0,
+            'backpressure_waits': 0,
+            'last_flush_ms': 0.0,
+        }
+
+    @staticmethod
+    def _timestamp() -> str:
+        # Same format and timezone as SQLite's CURRENT_TIMESTAMP, captured when
+        # the event happens rather than when the batch is flushed.
+        return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._queue
+
+    async def put(self, table: str, row: Tuple) -> None:
+        if table not in self.STATEMENTS:
+            raise ValueError(f"Table '{table}' is not write-behind enabled")
+        queue = self._ensure_started()
+        entry = (table, row + (self._timestamp(),))
+        if queue.full():
+            self._stats['backpressure_waits'] += 1
+        await queue.put(entry)
+        self._stats['enqueued'] += 1
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            try:
+                if not queue.full() and queue.qsize() < self.batch_size - 1:
+                    await asyncio.sleep(self.flush_interval)
+                while len(batch) < self.batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                await self._write_with_retry(batch)
+            except asyncio.CancelledError:
+                # These rows are already off the queue; write them before the
+                # task ends rather than marking them done unwritten.
+                await self._write_on_cancel(batch)
+                raise
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write_on_cancel(self, batch: List[Tuple[str, Tuple]]) -> None:
+        try:
+            await self._write(batch)
+        except Exception as e:
+            self._stats['failed'] += len(batch)
+            logger.error(f"Write-behind dropped {len(batch)} rows while stopping: {e}")
+
+    async def _write_with_retry(self, batch: List[Tuple[str, Tuple]]) -> None:
+        # Retried in place: transient errors such as SQLITE_BUSY clear within
+        # a few backoffs, and holding the batch keeps rows in order while the
+        # bounded queue pushes back on producers.
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._write(batch)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self._stats['failed'] += len(batch)
+                    logger.error(f"Write-behind dropped {len(batch)} rows after {attempt + 1} attempts: {e}")
+                    return
+                delay = min(self.retry_base * (2 ** attempt), 5.0)
+                self._stats['retries'] += 1
+                logger.warning(f"Write-behind flush of {len(batch)} rows failed ({e}); retrying in {delay * 1000:.0f}ms")
+                await asyncio.sleep(delay)
+
+    async def _write(self, batch: List[Tuple[str, Tuple]]) -> None:
+        grouped: Dict[str, List[Tuple]] = {}
+        for table, row in batch:
+            grouped.setdefault(table, []).append(row)
+        started = time.perf_counter()
+        async with db_pool.writer() as db:
+            for table, rows in grouped.items():
+                await db.executemany(self.STATEMENTS[table], rows)
+            await db.commit()
+        self._stats['last_flush_ms'] = (time.perf_counter() - started) * 1000
+        self._stats['written'] += len(batch)
+        self._stats['batches'] += 1
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far has been written."""
+        if self._queue is None:
+            return
+        if self._task is None or self._task.done():
+            if self._queue.empty():
+                return
+            logger.warning(f"Write-behind flusher is not running with {self._queue.qsize()} rows queued; restarting it")
+            self._ensure_started()
+        await self._queue.join()
+
+    async def close(self) -> None:
+        await self.flush()
+        task = self._task
+        self._task = None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        result = dict(self._stats)
+        result['pending'] = self._queue.qsize() if self._queue else 0
+        result['max_size'] = self.max_size
+        return result
+
+
+write_behind = WriteBehindQueue(
+    max_size=int(os.getenv('DB_WRITE_QUEUE_SIZE', 10000)),
+    batch_size=int(os.getenv('DB_WRITE_BATCH_SIZE', 200)),
+    flush_interval_ms=int(os.getenv('DB_WRITE_FLUSH_MS', 50)),
+    max_retries=int(os.getenv('DB_WRITE_MAX_RETRIES', 5)),
+)